@@ -0,0 +1,159 @@
+from __future__ import annotations
+from enum import Enum
+from itertools import combinations
+from random import Random
+from typing import List, Iterable
+import numpy as np
+import GameConstants as Consts
+import Topology
+import Moves
+
+"""
+A Module mapping every move of the game to a fixed integer action id, and back.
+an action is a move without its player: (kind, *parameters). free builds and robber placements share the actions of
+paid builds and knights, the game phase tells them apart. the legal moves of a decision are given as a boolean mask
+over all the actions (see GameSession.legal_action_mask), that rollouts and learned policies can sample from
+"""
+
+
+class ActionKind(Enum):
+    """Enum representing the blocks of the action space, in the order their ids are laid out (the order moves are
+    generated in)"""
+    PASS = 0
+    BUY_DEV = 1
+    KNIGHT = 2  # per hex and victim (turn index, or None)
+    MONOPOLY = 3  # per resource
+    YEAR_OF_PLENTY = 4  # per pair of resources
+    ROAD_BUILDING = 5
+    SETTLEMENT = 6  # per node
+    CITY = 7  # per node
+    ROAD = 8  # per edge
+    TRADE = 9  # per ratio, resource given and resource taken
+    THROW = 10  # per resource
+
+    def __str__(self):
+        return self.name
+
+
+TRADE_RATIOS = (Consts.DECK_TRADE_RATIO, Consts.GENERAL_HARBOR_TRADE_RATIO, Consts.RESOURCE_HARBOR_TRADE_RATIO)
+RESOURCE_IDX = {resource: idx for idx, resource in enumerate(Consts.YIELDING_RESOURCES)}
+YOP_PAIRS = list(combinations(Consts.YIELDING_RESOURCES, Consts.YOP_NUM_RESOURCES))
+VICTIMS = [None] + list(range(Consts.MAX_PLAYERS))
+BUILD_KINDS = {Consts.PurchasableType.SETTLEMENT: ActionKind.SETTLEMENT,
+               Consts.PurchasableType.CITY: ActionKind.CITY,
+               Consts.PurchasableType.ROAD: ActionKind.ROAD}
+DEV_KINDS = {Consts.DevType.MONOPOLY: ActionKind.MONOPOLY,
+             Consts.DevType.YEAR_OF_PLENTY: ActionKind.YEAR_OF_PLENTY,
+             Consts.DevType.ROAD_BUILDING: ActionKind.ROAD_BUILDING,
+             Consts.DevType.KNIGHT: ActionKind.KNIGHT}
+
+# the move type of every kind, and the build / dev card type for builds and dev cards #
+KIND_TYPES = {ActionKind.PASS: (Moves.MoveType.PASS, None),
+              ActionKind.BUY_DEV: (Moves.MoveType.BUY_DEV, None),
+              ActionKind.TRADE: (Moves.MoveType.TRADE, None),
+              ActionKind.THROW: (Moves.MoveType.THROW, None)}
+KIND_TYPES.update({kind: (Moves.MoveType.BUILD, build_type) for build_type, kind in BUILD_KINDS.items()})
+KIND_TYPES.update({kind: (Moves.MoveType.USE_DEV, dev_type) for dev_type, kind in DEV_KINDS.items()})
+
+
+def _kind_actions(kind: ActionKind) -> List[tuple]:
+    if kind == ActionKind.MONOPOLY or kind == ActionKind.THROW:
+        return [(kind, resource) for resource in Consts.YIELDING_RESOURCES]
+    if kind == ActionKind.YEAR_OF_PLENTY:
+        return [(kind, pair) for pair in YOP_PAIRS]
+    if kind == ActionKind.KNIGHT:
+        return [(kind, hex_id, victim) for hex_id in range(Topology.NUM_TILES) for victim in VICTIMS]
+    if kind == ActionKind.SETTLEMENT or kind == ActionKind.CITY:
+        return [(kind, node) for node in Topology.NODE_COORDS]
+    if kind == ActionKind.ROAD:
+        return [(kind, edge) for edge in Topology.EDGE_COORDS]
+    if kind == ActionKind.TRADE:
+        return [(kind, ratio, gives, gets) for ratio in TRADE_RATIOS
+                for gives in Consts.YIELDING_RESOURCES for gets in Consts.YIELDING_RESOURCES]
+    return [(kind,)]
+
+
+ACTIONS = [action for kind in ActionKind for action in _kind_actions(kind)]  # action id -> (kind, *parameters)
+ACTION_IDS = {action: action_id for action_id, action in enumerate(ACTIONS)}
+NUM_ACTIONS = len(ACTIONS)
+OFFSETS = {kind: ACTION_IDS[_kind_actions(kind)[0]] for kind in ActionKind}  # the first action id of every kind
+ACTION_KINDS = [action[0] for action in ACTIONS]
+
+# action ids by parameters, for building masks straight from a game state #
+# node and edge actions are laid out by compact index (see Topology), so their id is the kind's offset plus the index
+PASS_ACTION = OFFSETS[ActionKind.PASS]
+BUY_DEV_ACTION = OFFSETS[ActionKind.BUY_DEV]
+ROAD_BUILDING_ACTION = OFFSETS[ActionKind.ROAD_BUILDING]
+MONOPOLY_ACTIONS = [ACTION_IDS[ActionKind.MONOPOLY, resource] for resource in Consts.YIELDING_RESOURCES]
+THROW_ACTIONS = [ACTION_IDS[ActionKind.THROW, resource] for resource in Consts.YIELDING_RESOURCES]
+YOP_ACTIONS = {pair: ACTION_IDS[ActionKind.YEAR_OF_PLENTY, pair] for pair in YOP_PAIRS}
+KNIGHT_ACTIONS = [[ACTION_IDS[ActionKind.KNIGHT, hex_id, victim] for victim in VICTIMS]
+                  for hex_id in range(Topology.NUM_TILES)]  # by hex id, then victim turn index + 1 (0 for None)
+TRADE_ACTIONS = {ratio: [[ACTION_IDS[ActionKind.TRADE, ratio, gives, gets] for gets in Consts.YIELDING_RESOURCES]
+                         for gives in Consts.YIELDING_RESOURCES]
+                 for ratio in TRADE_RATIOS}  # by ratio, then resource index given and resource index taken
+
+# sampling tables: the move type of every action (by index, in the order the types are generated in), and whether
+# the moves of the type are chosen by build / dev card type first #
+MOVE_TYPES = list(dict.fromkeys(KIND_TYPES[kind][0] for kind in ActionKind))
+ACTION_TYPES = [MOVE_TYPES.index(KIND_TYPES[kind][0]) for kind in ACTION_KINDS]
+SUB_TYPED = [move_type in (Moves.MoveType.BUILD, Moves.MoveType.USE_DEV) for move_type in MOVE_TYPES]
+
+
+def action_of(move: Moves.Move) -> tuple:
+    """:returns the action of the given move, (kind, *parameters)"""
+    if isinstance(move, Moves.BuildMove):
+        return BUILD_KINDS[move.builds()], move.at()
+    if isinstance(move, Moves.TradeMove):
+        gives = move.gives()
+        return ActionKind.TRADE, gives.size(), next(iter(gives)), next(iter(move.gets()))
+    if isinstance(move, Moves.UseKnightDevMove):
+        victim = move.take_from()
+        return ActionKind.KNIGHT, move.hex_id(), None if victim is None else victim.turn_idx()
+    if isinstance(move, Moves.UseYopDevMove):
+        return ActionKind.YEAR_OF_PLENTY, tuple(sorted(move.resources(), key=RESOURCE_IDX.get))
+    if isinstance(move, Moves.UseMonopolyDevMove):
+        return ActionKind.MONOPOLY, move.resource()
+    if isinstance(move, Moves.UseDevMove):
+        return (DEV_KINDS[move.uses()],)
+    if isinstance(move, Moves.ThrowMove):
+        return ActionKind.THROW, next(iter(move.throws()))
+    if isinstance(move, Moves.BuyDevMove):
+        return (ActionKind.BUY_DEV,)
+    return (ActionKind.PASS,)
+
+
+def action_id(move: Moves.Move) -> int:
+    """:returns the action id of the given move"""
+    return ACTION_IDS[action_of(move)]
+
+
+def mask_of(action_ids: Iterable[int]) -> np.ndarray:
+    """:returns the boolean mask of the given action ids, read only (masks are shared, e.g. by copies of a game)"""
+    mask = bytearray(NUM_ACTIONS)
+    for action in action_ids:
+        mask[action] = 1
+    return np.frombuffer(bytes(mask), dtype=bool)  # a view of immutable bytes is read only
+
+
+def sample(mask: np.ndarray, rng: Random) -> int:
+    """
+    :returns an action id drawn from the mask the way RandomAgent draws its moves: uniformly between move types,
+    then between build / dev card types (for builds and dev cards), then between the actions of the chosen type
+    """
+    # the legal actions grouped by type and kind, in a single pass (ids ascend, so types are listed in order) #
+    groups = {}
+    for action in mask.nonzero()[0].tolist():
+        kind = ACTION_KINDS[action]
+        group = groups.get(ACTION_TYPES[action])
+        if group is None:
+            group = groups[ACTION_TYPES[action]] = {}
+        if kind in group:
+            group[kind].append(action)
+        else:
+            group[kind] = [action]
+
+    type_idx, group = rng.choice(list(groups.items()))
+    if SUB_TYPED[type_idx]:  # choose a buildable / dev card
+        return rng.choice(rng.choice(list(group.values())))
+    return rng.choice(next(iter(group.values())))
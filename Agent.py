@@ -1,12 +1,19 @@
 from enum import Enum
 import Moves as Moves
 from Hand import Hand
-from typing import List
-from random import choice
+from typing import List, Dict, Union, Generator
+from random import Random, getrandbits
+from math import log, sqrt
+from time import perf_counter
 from Heuristics import *
 import Player
 import GameSession
+import ParallelEvaluator
+import Topology
+import Dice
+import ActionSpace
 from copy import deepcopy
+import numpy as np
 
 
 # import tensorflow as tf
@@ -24,6 +31,8 @@ class AgentType(Enum):
     MONTECARLO = 4
     DQN = 5
     OPTIMIZED = 6
+    UCT = 7
+    ROLLOUT = 8
 
     def __str__(self):
         return self.name
@@ -33,10 +42,13 @@ class Agent:
     """Class representing an AI agent that can choose a move based on a strategy / AI paradigm"""
     ID_GEN = 0
 
-    def __init__(self, agent_type: AgentType):
+    def __init__(self, agent_type: AgentType, rng: Random = None):
+        """rng is the agent's random stream, by default a new stream seeded from the global random module.
+        agents an agent delegates to are given its stream, so that seeding the agent seeds all of its choices"""
         Agent.ID_GEN += 1
         self.__id = Agent.ID_GEN
         self.__type = agent_type
+        self.__rng = Random(getrandbits(64)) if rng is None else rng
 
     def type(self) -> AgentType:
         """:returns the Enum type of this agent"""
@@ -46,10 +58,28 @@ class Agent:
         """:returns the unique id of this agent instance"""
         return self.__id
 
+    def rng(self) -> Random:
+        """:returns the random stream of this agent"""
+        return self.__rng
+
+    def seed(self, seed) -> None:
+        """reseeds the random stream of this agent (and of the agents it delegates to)"""
+        self.__rng.seed(seed)
+
     def choose(self, moves: List[Moves.Move], player: Player, state: GameSession) -> Moves.Move:
         """:returns a chosen move from moves"""
         raise NotImplemented
 
+    def choose_action(self, mask: np.ndarray, player: Player, state: GameSession) -> int:
+        """:returns the action id (see ActionSpace) of a move chosen out of a legal action mask of the state (see
+        GameSession.legal_action_mask), by default the action of the move chosen out of the state's possible moves"""
+        return ActionSpace.action_id(self.choose(state.possible_moves(), player, state))
+
+    def evaluate_tasks(self, state: GameSession, player: Player, moves: List[Moves.Move], tasks: list) -> list:
+        """:returns the results of the given evaluation tasks of a decision (e.g. indices of moves to rate), for
+        agents that hand their evaluations to a ParallelEvaluator"""
+        raise NotImplemented
+
     def __str__(self):
         return str(self.type())
 
@@ -57,26 +87,119 @@ class Agent:
 class RandomAgent(Agent):
     """An agent that makes (uniform) random move choices"""
 
-    def __init__(self):
-        super().__init__(AgentType.RANDOM)
+    def __init__(self, rng: Random = None):
+        super().__init__(AgentType.RANDOM, rng)
 
     def choose(self, moves: List[Moves.Move], player: Player, state: GameSession):
         # choose uniformly between move TYPES first, then uniformly between moves within that type #
-        available_move_types = list(set([m.get_type() for m in moves]))
-        move_type = choice(available_move_types)
-        filtered_moves = [m for m in moves if m.get_type() == move_type]
+        # (types are listed in order of appearance, so a seeded choice does not depend on hashing)
+        # build moves are grouped by buildable and dev card moves by dev card, all in a single pass over the moves
+        groups = {}
+        for m in moves:
+            move_type = m.get_type()
+            group = groups.get(move_type)
+            if group is None:
+                group = groups[move_type] = {}
+            sub_type = m.builds() if move_type is Moves.MoveType.BUILD else \
+                m.uses() if move_type is Moves.MoveType.USE_DEV else None
+            if sub_type in group:
+                group[sub_type].append(m)
+            else:
+                group[sub_type] = [m]
+
+        rng = self.rng()
+        move_type, group = rng.choice(list(groups.items()))
+        if move_type is Moves.MoveType.BUILD or move_type is Moves.MoveType.USE_DEV:  # choose a buildable / dev card
+            return rng.choice(rng.choice(list(group.values())))
+        return rng.choice(group[None])
+
+    def choose_action(self, mask: np.ndarray, player: Player, state: GameSession) -> int:
+        """:returns an action id drawn from the mask the way moves are chosen, without generating the moves"""
+        return ActionSpace.sample(mask, self.rng())
+
+
+class RolloutAgent(Agent):
+    """
+    A cheap agent for playouts. every move is rated straight from the current state - by a priority of its type and
+    a simple delta within the type (production a settlement / city adds, purchases a trade makes affordable, ...),
+    so the state is neither copied nor advanced to rate the moves. ties are broken at random
+    """
+    BUILD_PRIORITIES = {Consts.PurchasableType.CITY: 6, Consts.PurchasableType.SETTLEMENT: 5,
+                        Consts.PurchasableType.ROAD: 2}
+    TYPE_PRIORITIES = {Moves.MoveType.USE_DEV: 4, Moves.MoveType.BUY_DEV: 3, Moves.MoveType.TRADE: 1,
+                       Moves.MoveType.THROW: 0, Moves.MoveType.PASS: 0}
+    USELESS_TRADE = -1  # below passing, so that playouts do not trade back and forth
+
+    def __init__(self, rng: Random = None):
+        super().__init__(AgentType.ROLLOUT, rng)
 
-        if move_type == Moves.MoveType.BUILD:  # from build moves choose uniformly from buildables
-            available_build_types = list(set([m.builds() for m in filtered_moves]))
-            build_type = choice(available_build_types)
-            filtered_moves = [m for m in filtered_moves if m.builds() == build_type]
+    def choose(self, moves: List[Moves.Move], player: Player, state: GameSession) -> Moves.Move:
+        if len(moves) == 1:
+            return moves[0]
+        # the moving player (a thrower may move off turn), as a player of the given state - the moves may have been
+        # made by the game the state was cloned from
+        mover_id = moves[0].player().get_id()
+        player = next(p for p in state.players() if p.get_id() == mover_id)
+        counts = player.resource_hand().counts()
+        affordable = self.__affordable(counts)
+        scores = [self.__score(move, player, state, counts, affordable) for move in moves]
+        max_score = max(scores)
+        return self.rng().choice([move for move, score in zip(moves, scores) if score == max_score])
+
+    def __score(self, move: Moves.Move, player: Player, state: GameSession, counts, affordable) -> float:
+        move_type = move.get_type()
+        if move_type == Moves.MoveType.BUILD:
+            priority = RolloutAgent.BUILD_PRIORITIES[move.builds()]
+            if move.builds() == Consts.PurchasableType.ROAD:
+                return priority
+            return priority + self.__node_production(state, move.at())
+
+        if move_type == Moves.MoveType.TRADE:
+            # only trades that make a purchase affordable, without giving up an affordable one, are worth making
+            new_counts = counts[:]
+            for idx, amount in enumerate(move.gives().counts()):
+                new_counts[idx] -= amount
+            for idx, amount in enumerate(move.gets().counts()):
+                new_counts[idx] += amount
+            new_affordable = self.__affordable(new_counts)
+            if affordable < new_affordable:
+                return RolloutAgent.TYPE_PRIORITIES[move_type]
+            return RolloutAgent.USELESS_TRADE
+
+        if move_type == Moves.MoveType.THROW:
+            # throw the most abundant cards #
+            hand_size = sum(counts)
+            return sum(counts[idx] * amount for idx, amount in enumerate(move.throws().counts())) / hand_size ** 2
+
+        if isinstance(move, Moves.UseKnightDevMove):
+            return RolloutAgent.TYPE_PRIORITIES[move_type] + self.__robber_damage(state, player, move.hex_id())
+
+        return RolloutAgent.TYPE_PRIORITIES[move_type]
 
-        elif move_type == Moves.MoveType.USE_DEV:  # same for dev cards
-            available_dev_types = list(set([m.uses() for m in filtered_moves]))
-            dev_type = choice(available_dev_types)
-            filtered_moves = [m for m in filtered_moves if m.uses() == dev_type]
+    @staticmethod
+    def __affordable(counts) -> set:
+        """:returns the purchasable types the given resource count vector pays for"""
+        return {ptype for ptype, cost in Consts.COSTS.items()
+                if all(counts[idx] >= amount for idx, amount in enumerate(cost.counts()) if amount)}
 
-        return choice(filtered_moves)
+    @staticmethod
+    def __node_production(state: GameSession, node: int) -> float:
+        """:returns the probability that a roll yields resources at the given node (below 1)"""
+        board = state.board()
+        return sum(Dice.PROBABILITIES[board.hexes()[hex_id].token()] for hex_id in board.get_adj_tile_ids_to_node(node)
+                   if not board.has_robber(hex_id))
+
+    @staticmethod
+    def __robber_damage(state: GameSession, player: Player, hex_id: int) -> float:
+        """:returns the production the robber takes from the opponents minus the player's at the given hex (below 1)"""
+        board = state.board()
+        damage = 0
+        for node in Topology.TILE_NODES[hex_id]:
+            owner = board.node_owner(Topology.NODE_COORDS[node])
+            if owner is not None:
+                buildings = 2 if board.node_type(Topology.NODE_COORDS[node]) == Consts.PurchasableType.CITY else 1
+                damage += buildings if owner.turn_idx() != player.turn_idx() else -buildings
+        return damage * Dice.PROBABILITIES[board.hexes()[hex_id].token()] / 4
 
 
 class HumanAgent(Agent):
@@ -116,23 +239,32 @@ class OneMoveHeuristicAgent(Agent):
     """An agent that gets a heuristic, chooses a move that maximizes that heuristic value"""
 
     # Open the tree only one move forward and apply the given heuristic on it
-    def __init__(self, heuristic):
-        super().__init__(AgentType.ONE_MOVE)
+    def __init__(self, heuristic, rng: Random = None, evaluator: ParallelEvaluator.ParallelEvaluator = None,
+                 use_deltas: bool = True):
+        super().__init__(AgentType.ONE_MOVE, rng)
         self.__h = heuristic
-        self.__randy = RandomAgent()
+        self.__randy = RandomAgent(self.rng())
+        self.__evaluator = ParallelEvaluator.SERIAL if evaluator is None else evaluator
+        self.__use_deltas = use_deltas
 
     def choose(self, moves: List[Moves.Move], player: Player, state: GameSession) -> Moves.Move:
-        move_values = []
-        for move in moves:
-            new_state = deepcopy(state)
-            new_state.simulate_game(move)
-            curr_p = move.player()
-            for p in new_state.players():
-                if p == move.player():
-                    curr_p = p
-            hval = self.__h.value(new_state, curr_p)
-            move_values.append(hval)
-            del new_state
+        move_features = [None] * len(moves)
+        if self.__use_deltas:
+            # moves the heuristic can tell the change of are scored without making them #
+            ctx = FeatureContext(state, player)
+            features = None
+            for m_idx, move in enumerate(moves):
+                deltas = self.__h.feature_deltas(ctx, move)
+                if deltas is not None:
+                    if features is None:
+                        features = np.array(self.__h.evaluate_features(ctx), dtype=float)
+                    move_features[m_idx] = features + deltas
+
+        # the rest of the candidate states' features are gathered, and all of them evaluated as a batch #
+        simulated = [m_idx for m_idx, features in enumerate(move_features) if features is None]
+        for m_idx, features in zip(simulated, self.__evaluator.map(self, state, player, moves, simulated)):
+            move_features[m_idx] = features
+        move_values = self.__h.combine(np.array(move_features, dtype=float)).tolist()
 
         max_val = max(move_values)
         argmax_vals_indices = [i for i, val in enumerate(move_values) if val == max_val]
@@ -140,13 +272,27 @@ class OneMoveHeuristicAgent(Agent):
         move = self.__randy.choose(moves, player, state)
         return move
 
+    def evaluate_tasks(self, state: GameSession, player: Player, moves: List[Moves.Move], tasks: list) -> list:
+        """:returns the features of the states the given moves (by index) lead to, visited one at a time"""
+        move_features = []
+        for m_idx in tasks:
+            move = moves[m_idx]
+            state.make_move(move)
+            curr_p = move.player()
+            for p in state.players():
+                if p == move.player():
+                    curr_p = p
+            move_features.append(self.__h.features(state, curr_p))
+            state.unmake_move()
+        return move_features
+
 
 class ProbabilityAgent(Agent):
     """An agent that chooses a move that maximizes the probability heuristic"""
 
     def __init__(self):
         super().__init__(AgentType.PROBABILITY)
-        self.__harry = OneMoveHeuristicAgent(Probability())
+        self.__harry = OneMoveHeuristicAgent(Probability(), self.rng())
 
     def choose(self, moves: List[Moves.Move], player: Player, state: GameSession) -> Moves.Move:
         return self.__harry.choose(moves, player, state)
@@ -156,38 +302,44 @@ class OptimizedHeuristicAgent(Agent):
     """A heuristic agent that implements helper functions that score move types as well as states"""
 
     # using the one move heuristic method
-    def __init__(self, heuristic):
+    def __init__(self, heuristic, evaluator: ParallelEvaluator.ParallelEvaluator = None):
         super().__init__(AgentType.OPTIMIZED)
         self.__h = heuristic
-        self.__randy = RandomAgent()
+        self.__randy = RandomAgent(self.rng())
+        self.__evaluator = ParallelEvaluator.SERIAL if evaluator is None else evaluator
 
     def choose(self, moves: List[Moves.Move], player: Player, state: GameSession) -> Moves.Move:
+        move_values = self.__evaluator.map(self, state, player, moves, list(range(len(moves))))
+
+        max_val = max(move_values)
+        argmax_vals_indices = [i for i, val in enumerate(move_values) if val == max_val]
+        moves = [moves[i] for i in argmax_vals_indices]
+        move = self.__randy.choose(moves, player, state)
+        return move
+
+    def evaluate_tasks(self, state: GameSession, player: Player, moves: List[Moves.Move], tasks: list) -> list:
+        """:returns the values of the given moves (by index)"""
         h_val = 0
         move_values = []
-        for move in moves:
+        for m_idx in tasks:
+            move = moves[m_idx]
             # improve choice of monopoly dev card before simulating new state:
             if isinstance(move, Moves.UseMonopolyDevMove):
-                h_val += self.optimize_monopoly_choice(state, player, deepcopy(move))
-            new_state = deepcopy(state)
-            new_state.simulate_game(move)
+                h_val += self.optimize_monopoly_choice(state, player, move)
+            state.make_move(move)
             curr_p = move.player()
-            for p in new_state.players():
+            for p in state.players():
                 if p == move.player():
                     curr_p = p
 
-            h_val = self.__h.value(new_state, curr_p)
+            h_val = self.__h.value(state, curr_p)
             # improve trading abilities:
             if move.get_type() == Moves.MoveType.TRADE:
-                h_val += self.optimized_trading_choice(new_state, curr_p, deepcopy(move)) / 2
+                h_val += self.optimized_trading_choice(state, curr_p, move) / 2
 
             move_values.append(h_val)
-            del new_state
-
-        max_val = max(move_values)
-        argmax_vals_indices = [i for i, val in enumerate(move_values) if val == max_val]
-        moves = [moves[i] for i in argmax_vals_indices]
-        move = self.__randy.choose(moves, player, state)
-        return move
+            state.unmake_move()
+        return move_values
 
     @staticmethod
     def optimize_monopoly_choice(session: GameSession, player: Player, move: Moves):
@@ -239,17 +391,30 @@ class OptimizedHeuristicAgent(Agent):
 
 class MonteCarloAgent(Agent):
     """An agent that uses a limited depth variant of Monte Carlo (game) tree search with heavy playouts
-    (heuristic based). Tree traversal ends with current player's End-of-Turn."""
-
-    def __init__(self, heuristic, depth: int = 0, iters: int = 1):
+    (heuristic based). Tree traversal ends with current player's End-of-Turn.
+    with a time budget (seconds per decision), moves are sampled in rounds until it is spent instead of iters times
+    each, and the move with the best average so far is chosen (see sample_schedule).
+    the agent's own moves in a playout are chosen by the rollout policy, by default a one move heuristic agent
+    (a RolloutAgent is much cheaper)"""
+
+    def __init__(self, heuristic, depth: int = 0, iters: int = 1, time_budget: float = None,
+                 evaluator: ParallelEvaluator.ParallelEvaluator = None, rollout_policy: Agent = None):
         super().__init__(AgentType.MONTECARLO)
         self.__depth = depth
         self.__iterations = iters
+        self.__time_budget = time_budget
         self.__h = heuristic
-        self.__harry = OneMoveHeuristicAgent(heuristic)
-        self.__randy = RandomAgent()
+        self.__harry = OneMoveHeuristicAgent(heuristic, self.rng())
+        self.__rollout_policy = self.__harry if rollout_policy is None else rollout_policy
+        self.__randy = RandomAgent(self.rng())
+        self.__evaluator = ParallelEvaluator.SERIAL if evaluator is None else evaluator
         self.__curr_depth = 2
 
+    def seed(self, seed) -> None:
+        super().seed(seed)
+        if self.__rollout_policy.rng() is not self.rng():  # a rollout policy with a stream of its own
+            self.__rollout_policy.seed(f'{seed}/rollout')
+
     def choose(self, moves: List[Moves.Move], player: Player, state: GameSession) -> Moves.Move:
         for p in state.players():
             if p == player:
@@ -258,24 +423,25 @@ class MonteCarloAgent(Agent):
 
         self.__curr_depth -= 1
         max_moves = moves
-        all_move_values = []
-        move_expected_vals = []
 
-        # simulate each move until end of my turn and add final state evaluation to move_expected_vals
-        for move_idx, move in enumerate(max_moves):
-            all_move_values.append([])
-            for _i in range(self.__iterations):
-                move_state = deepcopy(state)
-                move_state.simulate_game(move)
-                self.sim_me(move_state, player)
-                for _d in range(self.__depth):
-                    self.sim_me(move_state, player)
-                    self.sim_opps(move_state, player)
-                value_reached = self.__h.value(move_state, player)
-                all_move_values[move_idx].append(value_reached)
-                del move_state
-            avg_move_val = sum(all_move_values[move_idx]) / self.__iterations
-            move_expected_vals.append(avg_move_val)
+        # simulate each move until end of my turn, the final states are evaluated as one batch.
+        # a fixed number of playouts can be spread over the evaluator's workers, a time budget is spent in process
+        if self.__time_budget is None:
+            sampled_moves = list(sample_schedule(len(max_moves), self.__iterations))
+            final_features = self.__evaluator.map(self, state, player, max_moves, sampled_moves)
+        else:
+            sampled_moves = []
+            final_features = []
+            for m_idx in sample_schedule(len(max_moves), self.__iterations, self.__time_budget, self.rng()):
+                sampled_moves.append(m_idx)
+                final_features.append(self.__playout(state, player, max_moves[m_idx]))
+        values_reached = self.__h.combine(np.array(final_features, dtype=float)).tolist()
+        all_move_values = [[] for _ in max_moves]
+        for m_idx, value_reached in zip(sampled_moves, values_reached):
+            all_move_values[m_idx].append(value_reached)
+        # moves the time budget did not reach are not chosen #
+        move_expected_vals = [sum(move_values) / len(move_values) if move_values else -np.inf
+                              for move_values in all_move_values]
 
         # generate list of all moves tied for best move #
         max_val = max(move_expected_vals)
@@ -290,31 +456,44 @@ class MonteCarloAgent(Agent):
         else:
             return self.__harry.choose(best_moves, player, state)
 
+    def evaluate_tasks(self, state: GameSession, player: Player, moves: List[Moves.Move], tasks: list) -> list:
+        """:returns the features of the final states of playouts of the given moves (by index), one per task"""
+        return [self.__playout(state, player, moves[m_idx]) for m_idx in tasks]
+
+    def __playout(self, state: GameSession, player: Player, move: Moves.Move) -> List[float]:
+        move_state = deepcopy(state)
+        move_state.simulate_game(move)
+        self.sim_me(move_state, player)
+        for _d in range(self.__depth):
+            self.sim_me(move_state, player)
+            self.sim_opps(move_state, player)
+        return self.__h.features(move_state, player)
+
     def sim_me(self, session, my_player):
-        while session.current_player() == my_player and session.possible_moves():
-            session.simulate_game(self.__harry.choose(session.possible_moves(),
-                                                      session.current_player(),
-                                                      session))
+        mask = session.legal_action_mask()
+        while session.current_player() == my_player and mask.any():
+            mask = session.step(self.__rollout_policy.choose_action(mask, session.current_player(), session))
 
     def sim_opps(self, session, my_player):
-        while session.current_player() != my_player and session.possible_moves():
-            move_played = self.__randy.choose(session.possible_moves(),
-                                              session.current_player(),
-                                              session)
-            session.simulate_game(move_played)
+        mask = session.legal_action_mask()
+        while session.current_player() != my_player and mask.any():
+            mask = session.step(self.__randy.choose_action(mask, session.current_player(), session))
 
 
 class LiteMonteCarloAgent(Agent):
     """An agent that uses a limited depth variant of Monte Carlo (game) tree search with heavy playouts
-    (heuristic based). Tree traversal ends with current player's End-of-Turn."""
+    (heuristic based). Tree traversal ends with current player's End-of-Turn.
+    with a time budget (seconds per decision), moves are sampled in rounds until it is spent instead of iters times
+    each (see sample_schedule)"""
 
-    def __init__(self, heuristic, depth: int = 0, iters: int = 10):
+    def __init__(self, heuristic, depth: int = 0, iters: int = 10, time_budget: float = None):
         super().__init__(AgentType.MONTECARLO)
         self.__depth = depth
         self.__iterations = iters
+        self.__time_budget = time_budget
         self.__h = heuristic
-        self.__harry = OneMoveHeuristicAgent(heuristic)
-        self.__randy = RandomAgent()
+        self.__harry = OneMoveHeuristicAgent(heuristic, self.rng())
+        self.__randy = RandomAgent(self.rng())
         self.__curr_depth = 2
 
         # for remembering good randomized paths
@@ -330,36 +509,31 @@ class LiteMonteCarloAgent(Agent):
 
         self.__curr_depth -= 1
         max_moves = moves
-        all_move_values = []
+        all_move_values = [[] for _ in max_moves]
         move_expected_vals = []
-        move_max_vals = []
+        move_max_vals = [None] * len(max_moves)  # moves the time budget did not reach stay None, and are not chosen
 
         curr_best_path = []
         curr_best_hval = 0
 
         # simulate each move until end of my turn and add final state evaluation to move_expected_vals
-        for move_idx, move in enumerate(max_moves):
-            all_move_values.append([])
-            move_max = 0
-            for _i in range(self.__iterations):
-                move_state = deepcopy(state)
-                move_state.simulate_game(move)
-                path_taken = []
-                for _d in range(1):
-                    self.sim_me(move_state, player, path_taken)
-                    self.sim_opps(move_state, player)
-                    self.sim_me_lite(move_state, player)
-                value_reached = self.__h.value(move_state, player)
-                if value_reached > curr_best_hval:
-                    curr_best_hval = value_reached
-                    curr_best_path = path_taken
-                if value_reached > move_max:
-                    move_max = value_reached
-                all_move_values[move_idx].append(value_reached)
-                del move_state
+        for move_idx in sample_schedule(len(max_moves), self.__iterations, self.__time_budget, self.rng()):
+            move_state = deepcopy(state)
+            move_state.simulate_game(max_moves[move_idx])
+            path_taken = []
+            for _d in range(1):
+                self.sim_me(move_state, player, path_taken)
+                self.sim_opps(move_state, player)
+                self.sim_me_lite(move_state, player)
+            value_reached = self.__h.value(move_state, player)
+            if value_reached > curr_best_hval:
+                curr_best_hval = value_reached
+                curr_best_path = path_taken
+            move_max_vals[move_idx] = max(move_max_vals[move_idx] or 0, value_reached)
+            all_move_values[move_idx].append(value_reached)
+            del move_state
             # avg_move_val = sum(all_move_values[move_idx]) / self.__iterations
             # move_expected_vals.append(avg_move_val)
-            move_max_vals.append(move_max)
 
         # generate list of all moves tied for best move #
         # max_val = max(move_expected_vals)
@@ -403,14 +577,150 @@ class LiteMonteCarloAgent(Agent):
 
     def sim_me_lite(self, session, my_player):
         while session.current_player() == my_player and session.possible_moves():
-            session.simulate_game(choice(session.possible_moves()))
+            session.simulate_game(self.rng().choice(session.possible_moves()))
 
     def sim_opps(self, session, my_player):
         while session.current_player() != my_player and session.possible_moves():
             # move_played = self.__randy.choose(session.possible_moves(),
             #                                   session.current_player(),
             #                                   session)
-            session.simulate_game(choice(session.possible_sim_moves(my_player)))
+            session.simulate_game(self.rng().choice(session.possible_sim_moves(my_player)))
+
+
+class DecisionNode:
+    """A node of a UCT search tree where a player chooses one of the moves of a state"""
+
+    def __init__(self, moves: List[Moves.Move], untried: List[int]):
+        self.moves = moves
+        self.mover = moves[0].player().turn_idx() if moves else None  # the choosing player (may throw off turn)
+        self.visits = 0
+        self.children = [None] * len(moves)  # chance node of every tried move, by move index
+        self.untried = untried  # indices of the moves not tried yet, tried from the end
+
+
+class ChanceNode:
+    """
+    A node of a UCT search tree after a move was made, before its random outcome (the dice rolled when a turn ends,
+    a dev card drawn, a card stolen) is known. its children are the states the move led to, keyed by state hash
+    """
+
+    def __init__(self, num_players: int):
+        self.visits = 0
+        self.value_sums = [0.0] * num_players  # sum of the values reached through the move, per player
+        self.outcomes: Dict[int, DecisionNode] = {}
+
+
+class UCTAgent(Agent):
+    """
+    An agent that uses Monte Carlo tree search with UCT (upper confidence bounds applied to trees) selection.
+    the tree is built with GameSession.simulate_game over clones of the state. every move leads to a chance node
+    whose outcomes are the states it was seen leading to (e.g. one per roll of the dice), so random events are
+    sampled rather than assumed. new leaves are evaluated by a rollout: the rollout policy plays on for a number of
+    turns, then the heuristic rates the reached state for every player, and each player's choices in the tree
+    maximize its own value (max^n). after a move is chosen, the subtree it leads to is kept for the agent's next
+    decision in the same turn. with a time budget (seconds per decision), the search runs until it is spent instead
+    of for iters iterations
+    """
+
+    def __init__(self, heuristic, iters: int = 100, exploration: float = sqrt(2), rollout_policy: Agent = None,
+                 rollout_turns: int = 1, time_budget: float = None):
+        super().__init__(AgentType.UCT)
+        self.__h = heuristic
+        self.__iterations = iters
+        self.__time_budget = time_budget
+        self.__exploration = exploration
+        self.__rollout_policy = RandomAgent(self.rng()) if rollout_policy is None else rollout_policy
+        self.__rollout_turns = rollout_turns
+        self.__reusable = None  # (turn, player id, chance node of the last move chosen)
+
+    def seed(self, seed) -> None:
+        super().seed(seed)
+        if self.__rollout_policy.rng() is not self.rng():  # a rollout policy with a stream of its own
+            self.__rollout_policy.seed(f'{seed}/rollout')
+
+    def choose(self, moves: List[Moves.Move], player: Player, state: GameSession) -> Moves.Move:
+        root = self.__reused_root(moves, player, state)
+        if root is None:
+            root = self.__new_node(moves)
+        root.moves = moves  # the tree may have been built with moves of another copy of the state
+
+        if len(moves) > 1:
+            for _i in sample_schedule(1, self.__iterations, self.__time_budget):
+                self.__search(root, state.clone())
+
+        # the most visited move is the most robust choice #
+        best_idx = max(range(len(moves)), key=lambda m_idx: root.children[m_idx].visits if root.children[m_idx] else 0)
+        self.__reusable = (state.num_turns_played(), player.get_id(), root.children[best_idx])
+        return moves[best_idx]
+
+    def __reused_root(self, moves: List[Moves.Move], player: Player, state: GameSession) -> Union[DecisionNode, None]:
+        """:returns the node of the given state in the tree of the last decision, if it was made in this turn"""
+        if self.__reusable is None:
+            return None
+        turn, player_id, chance = self.__reusable
+        self.__reusable = None
+        if chance is None or turn != state.num_turns_played() or player_id != player.get_id():
+            return None
+        root = chance.outcomes.get(state.state_hash())
+        if root is None or len(root.moves) != len(moves):
+            return None
+        return root
+
+    def __new_node(self, moves: List[Moves.Move]) -> DecisionNode:
+        untried = list(range(len(moves)))
+        self.rng().shuffle(untried)
+        return DecisionNode(moves, untried)
+
+    def __search(self, root: DecisionNode, session: GameSession) -> None:
+        """runs a single selection - expansion - rollout - backpropagation iteration on the given copy of the state"""
+        node = root
+        path = []
+        while node.moves:
+            if node.untried:
+                m_idx = node.untried.pop()
+                node.children[m_idx] = ChanceNode(len(session.players()))
+            else:
+                m_idx = self.__select(node)
+            chance = node.children[m_idx]
+            path.append((node, chance))
+            session.simulate_game(node.moves[m_idx])
+
+            state_hash = session.state_hash()
+            child = chance.outcomes.get(state_hash)
+            if child is None:  # expand the first unseen state and evaluate it
+                chance.outcomes[state_hash] = self.__new_node(session.possible_moves())
+                break
+            node = child
+
+        values = self.__rollout(session)
+        for node, chance in path:
+            node.visits += 1
+            chance.visits += 1
+            for p_idx, value in enumerate(values):
+                chance.value_sums[p_idx] += value
+
+    def __select(self, node: DecisionNode) -> int:
+        """:returns the index of the move maximizing the UCB1 score of the choosing player, values are scaled to
+        [0, 1] among the node's moves as heuristic values have no fixed range"""
+        mean_values = [chance.value_sums[node.mover] / chance.visits for chance in node.children]
+        low, high = min(mean_values), max(mean_values)
+        scale = high - low or 1
+        log_visits = log(node.visits)
+        scores = [(mean_value - low) / scale + self.__exploration * sqrt(log_visits / chance.visits)
+                  for mean_value, chance in zip(mean_values, node.children)]
+        return scores.index(max(scores))
+
+    def __rollout(self, session: GameSession) -> List[float]:
+        """plays the rollout policy until the given number of turns ended (or the game did)
+        :returns the heuristic values of every player in the reached state"""
+        turns_ended = 0
+        mask = session.legal_action_mask()
+        while mask.any() and turns_ended < self.__rollout_turns:
+            action = self.__rollout_policy.choose_action(mask, session.current_player(), session)
+            turns_ended += action == ActionSpace.PASS_ACTION
+            mask = session.step(action)
+        ctx = FeatureContext(session, session.current_player())  # the players' contexts share their primitives
+        return [self.__h.evaluate(ctx.of(p)) for p in session.players()]
 
 
 # class DQNAgent(Agent):
@@ -426,6 +736,32 @@ class LiteMonteCarloAgent(Agent):
 #         return moves[chosen_move_index]
 
 
+def sample_schedule(num_moves: int, iters: int, time_budget: float = None,
+                    rng: Random = None) -> Generator[int, None, None]:
+    """
+    yields the indices of the moves a sampling agent should simulate, one per sample
+    :param iters: without a time budget, every move is sampled iters times, move after move
+    :param time_budget: seconds the samples may take - the moves are sampled in rounds (in an order shuffled with rng)
+    until the time is spent, so an expired budget leaves every move with about the same number of samples.
+    the first sample is always taken
+    """
+    if time_budget is None:
+        for m_idx in range(num_moves):
+            for _i in range(iters):
+                yield m_idx
+        return
+
+    deadline = perf_counter() + time_budget
+    order = list(range(num_moves))
+    if rng is not None:
+        rng.shuffle(order)
+    while True:
+        for m_idx in order:
+            yield m_idx
+            if perf_counter() >= deadline:
+                return
+
+
 def find_sim_player(session: GameSession, player: Player) -> Player:
     # find the player's turn for the current session simulation
     for sim_player in session.players():
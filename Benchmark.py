@@ -0,0 +1,253 @@
+import GameSession
+from typing import List, Dict, Callable
+from copy import deepcopy
+import Player
+import Agent
+import Moves
+import Heuristics
+import TranspositionTable
+import argparse
+import inspect
+import json
+import platform
+import time
+
+"""
+A Module benchmarking the engine and the agents on a fixed set of seeded positions.
+every run appends its results as a line of JSON to the results file, so that runs can be compared over time
+"""
+
+DEFAULT_RESULTS_PATH = 'benchmarks.jsonl'
+DEFAULT_NUM_POSITION_GAMES = 4
+DEFAULT_NUM_PLAYERS = 3
+DEFAULT_POSITIONS_EVERY = 5  # keep every n-th main phase decision of the position games
+DEFAULT_MIN_TIME = 1.0  # seconds each throughput benchmark runs for, at least
+DEFAULT_NUM_GAMES = 10
+DEFAULT_NUM_DECISIONS = 10
+BASE_SEED = 1000
+DECISION_AGENTS = {
+    'onemove': lambda: Agent.OneMoveHeuristicAgent(Heuristics.Everything()),
+    'monte': lambda: Agent.MonteCarloAgent(Heuristics.Everything()),
+    'litemonte': lambda: Agent.LiteMonteCarloAgent(Heuristics.Everything()),
+    'monte_cached': lambda: Agent.MonteCarloAgent(
+        Heuristics.CachedHeuristic(Heuristics.Everything(), TranspositionTable.TranspositionTable())),
+    'monte_rollout': lambda: Agent.MonteCarloAgent(Heuristics.Everything(), rollout_policy=Agent.RolloutAgent()),
+    'uct': lambda: Agent.UCTAgent(Heuristics.Everything())
+}
+
+
+class PositionCollector(Agent.RandomAgent):
+    """a random agent that keeps every n-th main phase position it is asked to decide on"""
+
+    def __init__(self, positions: List[GameSession.GameSession], every: int):
+        super().__init__()
+        self.__positions = positions
+        self.__every = every
+        self.__seen = 0
+
+    def choose(self, moves: List[Moves.Move], player: Player, state: GameSession):
+        if any(move.get_type() == Moves.MoveType.PASS for move in moves):  # only the main phase can pass
+            self.__seen += 1
+            if self.__seen % self.__every == 0:
+                self.__positions.append(state.clone())
+        return super().choose(moves, player, state)
+
+
+def collect_positions(num_games: int = DEFAULT_NUM_POSITION_GAMES, num_players: int = DEFAULT_NUM_PLAYERS,
+                      every: int = DEFAULT_POSITIONS_EVERY) -> List[GameSession.GameSession]:
+    """:returns main phase positions of seeded random self-play games, the same ones on every run"""
+    positions = []
+    for game_idx in range(num_games):
+        collector = PositionCollector(positions, every)
+        collector.seed(BASE_SEED + game_idx)
+        players = [Player.Player(collector, name=f'P{p_idx}') for p_idx in range(num_players)]
+        GameSession.GameSession(*players, sinks=[], seed=BASE_SEED + game_idx).run_game()
+    return positions
+
+
+def throughput(action: Callable, items: list, min_time: float) -> float:
+    """
+    calls action on every item, over and over (whole passes over the items) until at least min_time seconds passed
+    :returns the number of calls per second
+    """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for item in items:
+            action(item)
+        calls += len(items)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+
+
+def bench_move_generation(positions: List[GameSession.GameSession], min_time: float) -> Dict[str, float]:
+    generations_per_second = throughput(lambda session: session.generate_moves(), positions, min_time)
+    moves_per_generation = sum(len(session.generate_moves()) for session in positions) / len(positions)
+    return {'generations_per_second': generations_per_second,
+            'moves_per_second': generations_per_second * moves_per_generation}
+
+
+def bench_clones(positions: List[GameSession.GameSession], min_time: float) -> Dict[str, float]:
+    return {'clones_per_second': throughput(deepcopy, positions, min_time)}
+
+
+def heuristic_classes() -> List[type]:
+    """:returns every heuristic class defined in Heuristics that can be built with its defaults (not a base class)"""
+    return [cls for name, cls in inspect.getmembers(Heuristics, inspect.isclass)
+            if issubclass(cls, Heuristics.Heuristic) and cls not in (Heuristics.Heuristic, Heuristics.HandHeuristic)
+            and cls.__module__ == Heuristics.__name__
+            and all(param.default is not param.empty for param in
+                    list(inspect.signature(cls.__init__).parameters.values())[1:])]
+
+
+def bench_heuristics(positions: List[GameSession.GameSession], min_time: float) -> Dict[str, float]:
+    results = {}
+    for cls in heuristic_classes():
+        heuristic = cls()
+        results[cls.__name__] = throughput(lambda session: heuristic.value(session, session.current_player()),
+                                           positions, min_time)
+        if cls.combine is not Heuristics.Heuristic.combine:  # heuristics with a batch evaluation of their own
+            player = positions[0].current_player()
+            results[f'{cls.__name__}.values'] = len(positions) * throughput(
+                lambda batch: heuristic.values(batch, player), [positions], min_time)
+    return results
+
+
+def bench_random_games(num_games: int, num_players: int = DEFAULT_NUM_PLAYERS) -> Dict[str, float]:
+    agent = Agent.RandomAgent()
+    turns = 0
+    start = time.perf_counter()
+    for game_idx in range(num_games):
+        agent.seed(BASE_SEED + game_idx)
+        players = [Player.Player(agent, name=f'P{p_idx}') for p_idx in range(num_players)]
+        session = GameSession.GameSession(*players, sinks=[], seed=BASE_SEED + game_idx)
+        session.run_game()
+        turns += session.num_turns_played()
+    elapsed = time.perf_counter() - start
+    return {'games_per_second': num_games / elapsed, 'turns_per_second': turns / elapsed}
+
+
+def bench_playouts(positions: List[GameSession.GameSession], min_time: float) -> Dict[str, float]:
+    """:returns the decisions per second of random playouts to the end of the turn from the positions, played by move
+    (simulate_game) and by action (step, sampling the legal action masks)"""
+    agent = Agent.RandomAgent()
+
+    def by_move(session: GameSession.GameSession) -> int:
+        player = session.current_player()
+        moves = session.possible_moves()
+        decisions = 0
+        while moves and session.current_player() == player:
+            moves = session.simulate_game(agent.choose(moves, player, session))
+            decisions += 1
+        return decisions
+
+    def by_action(session: GameSession.GameSession) -> int:
+        player = session.current_player()
+        mask = session.legal_action_mask()
+        decisions = 0
+        while mask.any() and session.current_player() == player:
+            mask = session.step(agent.choose_action(mask, player, session))
+            decisions += 1
+        return decisions
+
+    results = {}
+    for name, playout in (('by_move', by_move), ('by_action', by_action)):
+        agent.seed(BASE_SEED)
+        decisions = 0
+        start = time.perf_counter()
+        while True:
+            for session in positions:
+                decisions += playout(session.clone())
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        results[name] = decisions / elapsed
+    return results
+
+
+def bench_decisions(positions: List[GameSession.GameSession], num_decisions: int) -> Dict[str, float]:
+    """:returns the mean seconds per decision of every decision agent, on the first num_decisions positions"""
+    results = {}
+    positions = positions[:num_decisions]
+    for name, make_agent in DECISION_AGENTS.items():
+        agent = make_agent()
+        agent.seed(BASE_SEED)
+        elapsed = 0
+        for session in positions:
+            state = deepcopy(session)
+            start = time.perf_counter()
+            agent.choose(state.possible_moves(), state.current_player(), state)
+            elapsed += time.perf_counter() - start
+        results[name] = elapsed / len(positions)
+    return results
+
+
+def run(label: str = None, min_time: float = DEFAULT_MIN_TIME, num_games: int = DEFAULT_NUM_GAMES,
+        num_decisions: int = DEFAULT_NUM_DECISIONS, only: List[str] = None) -> Dict:
+    """runs the benchmarks (all of them, or the ones named in only), :returns the results of the run"""
+    positions = collect_positions()
+    benchmarks = {
+        'move_generation': lambda: bench_move_generation(positions, min_time),
+        'clones': lambda: bench_clones(positions, min_time),
+        'heuristics_evals_per_second': lambda: bench_heuristics(positions, min_time),
+        'random_self_play': lambda: bench_random_games(num_games),
+        'playout_decisions_per_second': lambda: bench_playouts(positions, min_time),
+        'seconds_per_decision': lambda: bench_decisions(positions, num_decisions)
+    }
+    results = {}
+    for name, benchmark in benchmarks.items():
+        if only and name not in only:
+            continue
+        results[name] = benchmark()
+        print(f'[BENCHMARK] {name}: {json.dumps(results[name], indent=2)}')
+    return {'label': label,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'positions': len(positions),
+            'results': results}
+
+
+def get_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '-label',
+        help='A name for this run, saved with its results'
+    )
+    parser.add_argument(
+        '-out',
+        metavar='RESULTS_PATH',
+        default=DEFAULT_RESULTS_PATH,
+        help='The file the results of the run are appended to, as a line of JSON'
+    )
+    parser.add_argument(
+        '-min_time',
+        type=float,
+        default=DEFAULT_MIN_TIME,
+        help='Minimal number of seconds each throughput benchmark runs for'
+    )
+    parser.add_argument(
+        '-games',
+        type=int,
+        default=DEFAULT_NUM_GAMES,
+        help='Number of random self-play games to time'
+    )
+    parser.add_argument(
+        '-decisions',
+        type=int,
+        default=DEFAULT_NUM_DECISIONS,
+        help='Number of positions each decision agent is timed on'
+    )
+    parser.add_argument(
+        '-only',
+        nargs='+',
+        help='Names of the benchmarks to run - if not specified, all of them are run'
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = get_args()
+    run_results = run(args.label, args.min_time, args.games, args.decisions, args.only)
+    with open(args.out, 'a') as results_file:
+        results_file.write(json.dumps(run_results) + '\n')
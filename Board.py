@@ -1,9 +1,10 @@
 from __future__ import annotations
-import hexgrid
 import GameConstants as Consts
-from random import shuffle
-from typing import List, Dict
+from random import Random
+from typing import List, Dict, Union
 import HexTile
+import GameState
+import Topology
 import Player
 import Hand
 import Buildable
@@ -11,6 +12,10 @@ from Dice import PROBABILITIES
 
 
 class Board:
+    """
+    Class representing the game board. The hex layout is static and shared between clones of a game,
+    while the occupancy of nodes / edges and the robber position are read from the game's GameState buffers
+    """
     COLORS = {
         'TEAL': '\033[96m',
         'YELLOW': '\033[93m',
@@ -19,51 +24,119 @@ class Board:
         'END': '\033[0m'
     }
 
-    def __init__(self, *players: Player):
-        self.__init_hexes()
-        self.__players = players
-        self.__nodes = dict()
-        self.__edges = dict()
+    def __init__(self, state: GameState.GameState, rng: Random):
+        self.__state = state
+        self.__init_hexes(rng)
         self.__player_colors = list(Board.COLORS.values())
         self.__players = []
 
-    def __init_hexes(self) -> None:
+    def __init_hexes(self, rng: Random) -> None:
         deck = Consts.HEX_DECK.copy()
-        shuffle(deck)
+        rng.shuffle(deck)
         # use id that is 1 less than the pic @ https://github.com/rosshamish/hexgrid/, 0-indexing.
         self.__hexes = []
+        self.__token_hexes = {}  # dice sum -> ids of the yielding hexes with that token
         curr_token_id = 0
         robber_placed = False  # this is added for cases where multiple deserts exist, place robber in first only
         for hex_id in range(Consts.NUM_HEXES):
             resource = deck[hex_id]
             if resource == Consts.ResourceType.DESERT and not robber_placed:  # desert hex
                 token = 0
-                has_robber = True
+                self.__state.robber_hex = hex_id
                 robber_placed = True
             else:
                 token = Consts.TOKEN_ORDER[curr_token_id]
-                has_robber = False
                 curr_token_id += 1
 
-            self.__hexes.append(HexTile.HexTile(hex_id, resource, token, has_robber))
+            self.__hexes.append(HexTile.HexTile(hex_id, resource, token))
+            if resource in Consts.YIELDING_RESOURCES:
+                self.__token_hexes.setdefault(token, []).append(hex_id)
+        self.__layout_hash = hash(tuple((hex_tile.resource().value, hex_tile.token()) for hex_tile in self.__hexes)) & \
+            GameState.HASH_MASK
+
+    def bound_to(self, state: GameState.GameState, players: List[Player.Player]) -> Board:
+        """:returns a view of this board over another game state, sharing the (static) hex layout"""
+        board = Board.__new__(Board)
+        board.__state = state
+        board.__hexes = self.__hexes
+        board.__token_hexes = self.__token_hexes
+        board.__layout_hash = self.__layout_hash
+        board.__player_colors = self.__player_colors
+        board.__players = players
+        return board
+
+    def set_players(self, players: List[Player.Player]) -> None:
+        """sets the players of the game, in turn order (owners in the state buffers are indices to this list)"""
+        self.__players = players
+
+    def layout_hash(self) -> int:
+        """:returns a 64 bit hash of the (static) hex layout, telling boards of different games apart"""
+        return self.__layout_hash
 
     def hexes(self) -> List[HexTile.HexTile]:
         return self.__hexes
 
     def nodes(self) -> Dict[int, Buildable.Buildable]:
-        return self.__nodes
+        """:returns a {node coord: buildable} dictionary of all buildables on nodes, built from the state buffers"""
+        state = self.__state
+        return {coord: Buildable.Buildable(self.__players[state.node_owner[idx]], coord,
+                                           Consts.PurchasableType(state.node_type[idx]))
+                for idx, coord in enumerate(Topology.NODE_COORDS) if state.node_owner[idx] != GameState.NO_PLAYER}
 
     def edges(self) -> Dict[int, Buildable.Buildable]:
-        return self.__edges
+        """:returns a {edge coord: buildable} dictionary of all roads, built from the state buffers"""
+        state = self.__state
+        return {coord: Buildable.Buildable(self.__players[state.edge_owner[idx]], coord,
+                                           Consts.PurchasableType.ROAD)
+                for idx, coord in enumerate(Topology.EDGE_COORDS) if state.edge_owner[idx] != GameState.NO_PLAYER}
+
+    def node_owner(self, coord: int) -> Union[Player.Player, None]:
+        """:returns the player that has a buildable on the given node, None if the node is unoccupied"""
+        owner = self.__state.node_owner[Topology.NODE_IDX[coord]]
+        return self.__players[owner] if owner != GameState.NO_PLAYER else None
+
+    def node_type(self, coord: int) -> Union[Consts.PurchasableType, None]:
+        """:returns the type of buildable on the given node, None if the node is unoccupied"""
+        btype = self.__state.node_type[Topology.NODE_IDX[coord]]
+        return Consts.PurchasableType(btype) if btype != GameState.EMPTY else None
+
+    def edge_owner(self, coord: int) -> Union[Player.Player, None]:
+        """:returns the player that has a road on the given edge, None if the edge is unoccupied"""
+        owner = self.__state.edge_owner[Topology.EDGE_IDX[coord]]
+        return self.__players[owner] if owner != GameState.NO_PLAYER else None
 
     def robber_hex(self) -> HexTile.HexTile:
-        for hex_tile in self.hexes():
-            if hex_tile.has_robber():
-                return hex_tile
+        return self.__hexes[self.__state.robber_hex]
+
+    def has_robber(self, hex_id: int) -> bool:
+        """:returns True iff the robber is placed on the given hex"""
+        return self.__state.robber_hex == hex_id
 
     def move_robber_to(self, hex_id: int) -> None:
-        self.robber_hex().set_robber(False)
-        self.hexes()[hex_id].set_robber(True)
+        old_hex_id = self.__state.robber_hex
+        self.__state.robber_hex = hex_id
+        self.__update_production(self.__hexes[old_hex_id].token())
+        self.__update_production(self.__hexes[hex_id].token())
+
+    def __update_production(self, dice_sum: int) -> None:
+        """rebuilds the production index row of the given dice sum from the hexes with that token"""
+        if dice_sum not in self.__token_hexes:
+            return
+        state = self.__state
+        row = [GameState.zero_counts() for _ in range(state.num_players)]
+        for hex_id in self.__token_hexes[dice_sum]:
+            if hex_id == state.robber_hex:
+                continue
+            card_idx = Consts.CARD_INDEX[self.__hexes[hex_id].resource()]
+            for node in Topology.TILE_NODES[hex_id]:
+                owner = state.node_owner[node]
+                if owner != GameState.NO_PLAYER:
+                    if state.node_type[node] == Consts.PurchasableType.CITY.value:
+                        row[owner][card_idx] += Consts.NUM_RESOURCES_PER_CITY
+                    else:
+                        row[owner][card_idx] += Consts.NUM_RESOURCES_PER_SETTLEMENT
+        state.record(state.production, dice_sum)
+        state.production[dice_sum] = row
 
     def resource_distributions_by_node(self, coord: int) -> Hand.Hand:
         return Hand.Hand(*(self.hexes()[h].resource() for h in self.get_adj_tile_ids_to_node(coord)
@@ -84,57 +157,56 @@ class Board:
         return types
 
     def resource_distributions(self, dice_sum: int) -> Dict[Player.Player, Hand.Hand]:
-        dist = {}
-        for hex_tile in self.hexes():
-            if hex_tile.token() == dice_sum and not hex_tile.has_robber():  # hex that distributes
-                adj_nodes = hexgrid.nodes_touching_tile(hex_tile.id() + 1)  # he uses 1 indexing
-                for node in adj_nodes:
-                    if self.nodes().get(node):  # node has buildable on it
-                        player = self.nodes().get(node).player()  # belongs to player_id
-                        if player not in dist:
-                            dist[player] = Hand.Hand()
-                        dist[player].insert(Hand.Hand(hex_tile.resource()))  # add hex's resource to distributed hand
-        return dist
+        """:returns the cards each player is yielded by the given dice roll, read from the production index"""
+        row = self.__state.production[dice_sum]
+        return {self.__players[idx]: Hand.Hand.wrap(counts[:]) for idx, counts in enumerate(row) if any(counts)}
 
     @staticmethod
     def get_adj_nodes_to_node(location: int) -> List[int]:
-        if location % 2 == 1:
-            locs = [location - 0x11, location + 0x11, location + 0xf]
-        else:
-            locs = [location - 0x11, location + 0x11, location - 0xf]
-        return [loc for loc in locs if loc in hexgrid.legal_node_coords()]
+        """:returns the coords of the nodes adjacent to the given node (a shared list, do not modify)"""
+        return Topology.NODE_NODES_BY_COORD[location]
 
     @staticmethod
     def get_adj_edges_to_node(location: int) -> List[int]:
-        if location % 2 == 1:
-            locs = [location, location - 0x11, location - 0x1]
-        else:
-            locs = [location - 0x10, location - 0x11, location]
-        return [loc for loc in locs if loc in hexgrid.legal_edge_coords()]
+        """:returns the coords of the edges touching the given node (a shared list, do not modify)"""
+        return Topology.NODE_EDGES_BY_COORD[location]
 
     @staticmethod
     def get_adj_tile_ids_to_node(location: int) -> List[int]:
-        if location not in hexgrid.legal_node_coords():
+        """:returns the ids of the hexes touching the given node (a shared list, do not modify)"""
+        if location not in Topology.NODE_TILES_BY_COORD:
             raise ValueError(f'tried to access node {location}')
-        if location % 2 == 0:
-            tile_coords = [location - 0x1, location + 0x1, location - 0x21]
-        else:
-            tile_coords = [location + 0x10, location - 0x10, location - 0x12]
-        return [hexgrid.tile_id_from_coord(coord) - 1 for coord in tile_coords if coord in hexgrid.legal_tile_coords()]
+        return Topology.NODE_TILES_BY_COORD[location]
 
     def build(self, buildable: Buildable.Buildable) -> None:
-        player = buildable.player()
-        if player not in self.__players:
-            self.__players.append(player)
-        coords = self.nodes()
+        state = self.__state
+        owner = buildable.player().turn_idx()
         if buildable.type() == Consts.PurchasableType.ROAD:
-            coords = self.edges()
-        coords[buildable.coord()] = buildable
+            edge_idx = Topology.EDGE_IDX[buildable.coord()]
+            state.set_edge_owner(edge_idx, owner)
+            self.__update_road_frontiers(owner, edge_idx)
+            # a new road never shortens a road, only the roads connected to it need searching
+            self.__set_road_len(owner, max(state.road_lengths[owner], self.__longest_road(owner, edge_idx)))
+        else:
+            node_idx = Topology.NODE_IDX[buildable.coord()]
+            state.set_node(node_idx, owner, buildable.type().value)
+            state.blocked_nodes |= Topology.NODE_BLOCK_MASK[node_idx]
+            for hex_id in Topology.NODE_TILES[node_idx]:
+                state.record(state.hex_owners, hex_id)
+                state.hex_owners[hex_id] |= 1 << owner
+            for dice_sum in {self.__hexes[hex_id].token() for hex_id in Topology.NODE_TILES[node_idx]}:
+                self.__update_production(dice_sum)
+            if buildable.type() == Consts.PurchasableType.SETTLEMENT:
+                # the settlement breaks opponents' roads passing through its node
+                edge_owners = [state.edge_owner[edge] for edge in Topology.NODE_EDGES[node_idx]]
+                for opp in set(edge_owners):
+                    if opp != owner and opp != GameState.NO_PLAYER and edge_owners.count(opp) > 1:
+                        self.__set_road_len(opp, self.__longest_road(opp))
 
     def info(self) -> str:
         ret_val = ['\n[BOARD] Hexes']
         for h in self.hexes():
-            ret_val.append(h.info())
+            ret_val.append(h.info() + f', robber ? {self.has_robber(h.id())}')
         ret_val.append('\n[BOARD] Buildables')
         for n, buildable in self.nodes().items():
             ret_val.append(buildable.info())
@@ -142,96 +214,80 @@ class Board:
             ret_val.append(buildable.info())
         return '\n'.join(ret_val)
 
-    # def __dfs_roads_recursive(self, player, graph, stack, visited, path):
-    #     max_path = len(path)
-    #     while stack:
-    #         curr = stack.pop()
-    #         # print('stack popped', curr)
-    #         visited.add(curr)
-    #
-    #         for neighbor in graph[curr]:
-    #             if neighbor in self.nodes() and self.nodes().get(neighbor).player() != player:  # someone built here, streak ends
-    #                 # print('neighbor', neighbor, 'in built opp')
-    #                 continue
-    #             if neighbor not in visited:
-    #                 stack.append(neighbor)
-    #                 path_len = self.__dfs_roads_recursive(player, graph, stack, visited, path + [neighbor])
-    #                 if path_len > max_path:
-    #                     max_path = path_len
-    #     return max_path
-
-    def dfs(self, player, last, visited, graph, node, path, max_len):
-        if node not in visited:
-            # print('curr node', node)
-            # print('curr path', path)
-            if node in self.nodes() and self.nodes().get(node).player().get_id() != player.get_id():
-                # print('node has opp')
-                return
-            visited.add(node)
-            # print('visited', visited)
-            for neighbour in graph[node]:
-                # print('neighbor', neighbour)
-                if neighbour != last:
-                    max_len[0] = max(max_len[0], len(path) + 1)
-                else:
-                    continue
-                # print('max', max_len[0])
-                self.dfs(player, node, visited, graph, neighbour, path + [neighbour], max_len)
-
-    def __calc_road_len(self, player, graph):
-        max_len = 0
-        for start in graph:
-            visited = set()
-            path = []
-            start_len = [0]
-            self.dfs(player, None, visited, graph, start, path, start_len)
-            if start_len[0] > max_len:
-                max_len = start_len[0]
-        return max_len
+    def __update_road_frontiers(self, owner: int, edge: int) -> None:
+        """updates the players' road frontiers (free edges touching their roads) after a road is built on edge"""
+        state = self.__state
+        edge_bit = 1 << edge
+        for player_idx, frontier in enumerate(state.road_frontier):
+            if frontier & edge_bit:
+                state.record(state.road_frontier, player_idx)
+                state.road_frontier[player_idx] = frontier & ~edge_bit
+        frontier = state.road_frontier[owner]
+        for node in Topology.EDGE_NODES[edge]:
+            for adj_edge in Topology.NODE_EDGES[node]:
+                if state.edge_owner[adj_edge] == GameState.NO_PLAYER:
+                    frontier |= 1 << adj_edge
+        state.record(state.road_frontier, owner)
+        state.record(state.road_nodes, owner)
+        state.road_frontier[owner] = frontier
+        node1, node2 = Topology.EDGE_NODES[edge]
+        state.road_nodes[owner] |= (1 << node1) | (1 << node2)
 
     def road_len(self, player: Player) -> int:
-        graph = {}
-        for edge in player.road_edges():
-            node1, node2 = hexgrid.nodes_touching_edge(edge)
-            if node1 not in graph:
-                graph[node1] = set()
-            if node2 not in graph:
-                graph[node2] = set()
-            graph[node1].add(node2)
-            graph[node2].add(node1)
-        # print(player)
-        # for n, vals in graph.items():
-        #     print(hex(n), [hex(v) for v in vals])
-        # print('NODES')
-        # for n, vals in self.nodes().items():
-        #     print(hex(n), vals.player())
-
-        return self.__calc_road_len(player, graph)
-
-        # max_len = 0
-        # for start in graph:
-        #     curr_len = 0
-        #     max_curr_len = 0
-        #     visited = set()
-        #     stack = [start]
-        #     while stack:
-        #         curr = stack.pop()
-        #         curr_len += 1
-        #         visited.add(curr)
-        #         added = False
-        #         for neighbor in graph[curr]:
-        #             if self.nodes().get(neighbor) is not None and self.nodes().get(neighbor).player() != player:    # someone built here, streak ends
-        #                 continue
-        #             if neighbor not in visited:
-        #                 stack.append(neighbor)
-        #                 added = True
-        #         if not added:
-        #             curr_len -= 1
-        #             if max_curr_len < curr_len:
-        #                 max_curr_len = curr_len
-        #     if max_len < max_curr_len:
-        #         max_len = max_curr_len
-        # return max_len
+        """:returns the length of the player's longest road, kept up to date by build()"""
+        return self.__state.road_lengths[player.turn_idx()]
+
+    def __set_road_len(self, player_idx: int, length: int) -> None:
+        self.__state.record(self.__state.road_lengths, player_idx)
+        self.__state.road_lengths[player_idx] = length
+
+    def __longest_road(self, player_idx: int, from_edge: int = None) -> int:
+        """
+        finds the player's longest trail of roads (no road used twice), a road cannot continue through a node
+        with an opponent's buildable on it
+        :param player_idx: the player's index in the turn order
+        :param from_edge: if given, only the roads connected to this edge index are searched
+        :return: the length of the longest trail found
+        """
+        node_owner = self.__state.node_owner
+        adj = {}
+        for edge, owner in enumerate(self.__state.edge_owner):
+            if owner == player_idx:
+                node1, node2 = Topology.EDGE_NODES[edge]
+                adj.setdefault(node1, []).append((edge, node2))
+                adj.setdefault(node2, []).append((edge, node1))
+
+        def passable(node):
+            return node_owner[node] == GameState.NO_PLAYER or node_owner[node] == player_idx
+
+        if from_edge is None:
+            start_nodes = adj
+        else:
+            start_nodes = set(Topology.EDGE_NODES[from_edge])
+            frontier = [node for node in start_nodes if passable(node)]
+            while frontier:
+                for _, other in adj[frontier.pop()]:
+                    if other not in start_nodes:
+                        start_nodes.add(other)
+                        if passable(other):
+                            frontier.append(other)
+
+        longest = 0
+
+        def walk(node, used, length):
+            nonlocal longest
+            if length > longest:
+                longest = length
+            if length and not passable(node):
+                return
+            for edge, other in adj[node]:
+                if not used & (1 << edge):
+                    walk(other, used | (1 << edge), length + 1)
+
+        for start in start_nodes:
+            walk(start, 0, 0)
+        return longest
+
     def probability_score(self, player: Player, exclude_robber=False) -> float:
         """
         :return: player's probability of getting any resource/s in a given turn, based on settlements / cities
@@ -239,7 +295,7 @@ class Board:
         rolls = set()
         for loc in player.settlement_nodes() + player.city_nodes():
             for hex_tile in self.get_adj_tile_ids_to_node(loc):
-                if exclude_robber or not self.hexes()[hex_tile].has_robber():
+                if exclude_robber or not self.has_robber(hex_tile):
                     rolls.add(self.hexes()[hex_tile].token())
 
         prob = sum(PROBABILITIES.get(roll, 0) for roll in rolls)
@@ -263,18 +319,19 @@ class Board:
 
     def edges_map(self) -> str:
         def player_color(player):
-            return self.__player_colors[self.__players.index(player)]
+            return self.__player_colors[player.turn_idx()]
 
         def get_color(edge, is_edge=True):
-            coords = self.edges() if is_edge else self.nodes()
-            if coords.get(edge) is not None:
-                return self.__player_colors[self.__players.index(coords.get(edge).player())]
+            owner = self.edge_owner(edge) if is_edge else self.node_owner(edge)
+            if owner is not None:
+                return self.__player_colors[owner.turn_idx()]
             else:
                 return Board.COLORS['END']
 
         def get_node_str(node):
-            if self.nodes().get(node) is not None:
-                if self.nodes().get(node).type() == Consts.PurchasableType.SETTLEMENT:
+            node_type = self.node_type(node)
+            if node_type is not None:
+                if node_type == Consts.PurchasableType.SETTLEMENT:
                     return 's'
                 else:
                     return 'C'
@@ -284,13 +341,13 @@ class Board:
         dh = {f'h{i}': str(h) for i, h in enumerate(self.hexes())}
         dht = {f'h{i}t': h.token() for i, h in enumerate(self.hexes())}
         x = 'x'
-        dr = {f'r{hex(edge).split(x)[1]}': hex(edge).split(x)[1] for edge in hexgrid.legal_edge_coords()}
+        dr = {f'r{hex(edge).split(x)[1]}': hex(edge).split(x)[1] for edge in Topology.EDGE_COORDS}
         legend = ' '.join('{}{}{}'.format(player_color(player), player, Board.COLORS['END'])
                           for player in self.__players)
         detc = {'e': Board.COLORS['END'], 'legend': legend}
         dn = {f'n{hex(node).split(x)[1]}': '{}{}{}'.format(get_color(node, is_edge=False), get_node_str(node),
-                                                           Board.COLORS['END']) for node in hexgrid.legal_node_coords()}
-        dy = {f'y{i}': 'R' if h.has_robber() else ' ' for i, h in enumerate(self.hexes())}
+                                                           Board.COLORS['END']) for node in Topology.NODE_COORDS}
+        dy = {f'y{i}': 'R' if self.has_robber(i) else ' ' for i in range(len(self.hexes()))}
         d = dict()
         for other_dict in (dh, dht, dr, dn, dy, detc):
             for key, value in other_dict.items():
@@ -325,24 +382,24 @@ class Board:
 
     def nodes_map(self) -> str:
         def player_color(player):
-            return self.__player_colors[self.__players.index(player)]
+            return self.__player_colors[player.turn_idx()]
 
         def get_color(edge, is_edge=True):
-            coords = self.edges() if is_edge else self.nodes()
-            if coords.get(edge) is not None:
-                return self.__player_colors[self.__players.index(coords.get(edge).player())]
+            owner = self.edge_owner(edge) if is_edge else self.node_owner(edge)
+            if owner is not None:
+                return self.__player_colors[owner.turn_idx()]
             else:
                 return Board.COLORS['END']
         dh = {f'h{i}': str(h) for i, h in enumerate(self.hexes())}
         dht = {f'h{i}t': h.token() for i, h in enumerate(self.hexes())}
         x = 'x'
-        dr = {f'r{hex(edge).split(x)[1]}': get_color(edge) for edge in hexgrid.legal_edge_coords()}
+        dr = {f'r{hex(edge).split(x)[1]}': get_color(edge) for edge in Topology.EDGE_COORDS}
         legend = ' '.join('{}{}{}'.format(player_color(player), player, Board.COLORS['END'])
                           for player in self.__players)
         detc = {'e': Board.COLORS['END'], 'legend': legend}
         dn = {f'n{hex(node).split(x)[1]}': '{}{}{}'.format(get_color(node, is_edge=False), hex(node).split(x)[1],
-                                                           Board.COLORS['END']) for node in hexgrid.legal_node_coords()}
-        dy = {f'y{i}': 'R' if h.has_robber() else ' ' for i, h in enumerate(self.hexes())}
+                                                           Board.COLORS['END']) for node in Topology.NODE_COORDS}
+        dy = {f'y{i}': 'R' if self.has_robber(i) else ' ' for i in range(len(self.hexes()))}
         d = dict()
         for other_dict in (dh, dht, dr, dn, dy, detc):
             for key, value in other_dict.items():
@@ -376,18 +433,19 @@ class Board:
 
     def __str__(self) -> str:
         def player_color(player):
-            return self.__player_colors[self.__players.index(player)]
+            return self.__player_colors[player.turn_idx()]
 
         def get_color(edge, is_edge=True):
-            coords = self.edges() if is_edge else self.nodes()
-            if coords.get(edge) is not None:
-                return self.__player_colors[self.__players.index(coords.get(edge).player())]
+            owner = self.edge_owner(edge) if is_edge else self.node_owner(edge)
+            if owner is not None:
+                return self.__player_colors[owner.turn_idx()]
             else:
                 return Board.COLORS['END']
 
         def get_node_str(node):
-            if self.nodes().get(node) is not None:
-                if self.nodes().get(node).type() == Consts.PurchasableType.SETTLEMENT:
+            node_type = self.node_type(node)
+            if node_type is not None:
+                if node_type == Consts.PurchasableType.SETTLEMENT:
                     return 's'
                 else:
                     return 'C'
@@ -397,13 +455,13 @@ class Board:
         dh = {f'h{i}': str(h) for i, h in enumerate(self.hexes())}
         dht = {f'h{i}t': h.token() for i, h in enumerate(self.hexes())}
         x = 'x'
-        dr = {f'r{hex(edge).split(x)[1]}': get_color(edge) for edge in hexgrid.legal_edge_coords()}
+        dr = {f'r{hex(edge).split(x)[1]}': get_color(edge) for edge in Topology.EDGE_COORDS}
         legend = ' '.join('{}{}{}'.format(player_color(player), player, Board.COLORS['END'])
                           for player in self.__players)
         detc = {'e': Board.COLORS['END'], 'legend': legend}
         dn = {f'n{hex(node).split(x)[1]}': '{}{}{}'.format(get_color(node, is_edge=False), get_node_str(node),
-                                                           Board.COLORS['END']) for node in hexgrid.legal_node_coords()}
-        dy = {f'y{i}': 'R' if h.has_robber() else ' ' for i, h in enumerate(self.hexes())}
+                                                           Board.COLORS['END']) for node in Topology.NODE_COORDS}
+        dy = {f'y{i}': 'R' if self.has_robber(i) else ' ' for i in range(len(self.hexes()))}
         d = dict()
         for other_dict in (dh, dht, dr, dn, dy, detc):
             for key, value in other_dict.items():
@@ -1,5 +1,7 @@
+from __future__ import annotations
 from typing import Tuple
-from random import randint
+from random import Random
+from copy import copy
 
 PROBABILITIES = {
     0:  0,
@@ -18,17 +20,24 @@ PROBABILITIES = {
 
 
 class Dice:
-    """Class representing a fair pair of dice"""
-    def __init__(self):
+    """Class representing a fair pair of dice, rolled from the given random stream"""
+    def __init__(self, rng: Random):
+        self.__rng = rng
         self.__last_roll = self.roll()
         self.__sum = sum(self.__last_roll)
 
     def roll(self) -> Tuple[int, int]:
         """roll the dice, returns result"""
-        self.__last_roll = randint(1, 6), randint(1, 6)
+        self.__last_roll = self.__rng.randint(1, 6), self.__rng.randint(1, 6)
         self.__sum = sum(self.__last_roll)
         return self.__last_roll
 
+    def bound_to(self, rng: Random) -> Dice:
+        """:returns a copy of these dice (same last roll) that rolls from another random stream"""
+        dice = copy(self)
+        dice.__rng = rng
+        return dice
+
     def get_last_roll(self) -> Tuple[int, int]:
         """:returns the last dice roll"""
         return self.__last_roll
@@ -0,0 +1,296 @@
+from __future__ import annotations
+from enum import Enum
+from typing import List, Dict, Tuple, Union, TYPE_CHECKING
+import Hand
+import Moves
+import Player
+if TYPE_CHECKING:
+    import GameSession
+
+"""A Module containing the typed events a running game emits, and the sinks that consume them"""
+
+
+class EventType(Enum):
+    """Enum representing the types of game events"""
+    TURN_ORDER = 0
+    GAME_START = 1
+    PRE_GAME_PLACEMENT = 2
+    TURN_START = 3
+    ROLL = 4
+    DISTRIBUTION = 5
+    THROW = 6
+    ROBBER = 7
+    MOVE = 8
+    TURN_END = 9
+    GAME_OVER = 10
+
+    def __str__(self):
+        return self.name
+
+
+class Event:
+    """Class representing something that happened in a game, at a given turn"""
+
+    def __init__(self, event_type: EventType, turn: int):
+        self.__type = event_type
+        self.__turn = turn
+
+    def get_type(self) -> EventType:
+        """:returns the type of this event"""
+        return self.__type
+
+    def turn(self) -> int:
+        """:returns the number of turns played when this event happened"""
+        return self.__turn
+
+    def info(self) -> str:
+        """:returns an informative string about this event"""
+        return f'[EVENT] turn = {self.__turn}, type = {self.__type}'
+
+    def __str__(self) -> str:
+        return self.info()
+
+
+class TurnOrderEvent(Event):
+    """the players rolled the dice to establish the turn order"""
+
+    def __init__(self, rolls: List[Tuple[Player.Player, Tuple[int, int]]], turn_order: List[Player.Player]):
+        super().__init__(EventType.TURN_ORDER, 0)
+        self.__rolls = rolls
+        self.__turn_order = turn_order
+
+    def rolls(self) -> List[Tuple[Player.Player, Tuple[int, int]]]:
+        """:returns the (player, dice roll) pairs, in the order the players rolled"""
+        return self.__rolls
+
+    def turn_order(self) -> List[Player.Player]:
+        return self.__turn_order
+
+    def info(self) -> str:
+        return '[CATAN] turn order will be:\n' + '\n'.join(f'Player.Player {player}' for player in self.__turn_order)
+
+
+class GameStartEvent(Event):
+    """the game started, the pre game placements follow"""
+
+    def __init__(self):
+        super().__init__(EventType.GAME_START, 0)
+
+    def info(self) -> str:
+        return '[CATAN] Pre-Game started'
+
+
+class PreGamePlacementEvent(Event):
+    """a player placed a starting settlement and the road next to it"""
+
+    def __init__(self, player: Player.Player, settlement_node: int, road_edge: int, starting_resources: Hand.Hand):
+        super().__init__(EventType.PRE_GAME_PLACEMENT, 0)
+        self.__player = player
+        self.__settlement_node = settlement_node
+        self.__road_edge = road_edge
+        self.__starting_resources = starting_resources
+
+    def player(self) -> Player.Player:
+        return self.__player
+
+    def settlement_node(self) -> int:
+        return self.__settlement_node
+
+    def road_edge(self) -> int:
+        return self.__road_edge
+
+    def starting_resources(self) -> Hand.Hand:
+        """:returns the resources the settlement yielded (empty in the first round)"""
+        return self.__starting_resources
+
+    def info(self) -> str:
+        return f'[PRE GAME] player {self.__player} placed settlement at {hex(self.__settlement_node)}, ' \
+               f'road at {hex(self.__road_edge)}'
+
+
+class TurnStartEvent(Event):
+    """a player's turn started"""
+
+    def __init__(self, turn: int, player: Player.Player):
+        super().__init__(EventType.TURN_START, turn)
+        self.__player = player
+
+    def player(self) -> Player.Player:
+        return self.__player
+
+    def info(self) -> str:
+        return f'[EVENT] turn {self.turn()} started, {self.__player} is playing'
+
+
+class RollEvent(Event):
+    """the current player rolled the dice"""
+
+    def __init__(self, turn: int, player: Player.Player, dice_sum: int):
+        super().__init__(EventType.ROLL, turn)
+        self.__player = player
+        self.__dice_sum = dice_sum
+
+    def player(self) -> Player.Player:
+        return self.__player
+
+    def dice_sum(self) -> int:
+        return self.__dice_sum
+
+    def info(self) -> str:
+        return f'[RUN GAME] Rolling dice... {self.__dice_sum} rolled'
+
+
+class DistributionEvent(Event):
+    """resources were handed out for a roll"""
+
+    def __init__(self, turn: int, received: Dict[Player.Player, Hand.Hand]):
+        super().__init__(EventType.DISTRIBUTION, turn)
+        self.__received = received
+
+    def received(self) -> Dict[Player.Player, Hand.Hand]:
+        """:returns the cards each player actually received (the bank may have run short)"""
+        return self.__received
+
+    def info(self) -> str:
+        return '\n'.join(f'[RUN GAME] player {player} received {hand}' for player, hand in self.__received.items())
+
+
+class ThrowEvent(Event):
+    """a player with an oversized hand threw cards when the robber was activated"""
+
+    def __init__(self, turn: int, player: Player.Player, cards: Hand.Hand):
+        super().__init__(EventType.THROW, turn)
+        self.__player = player
+        self.__cards = cards
+
+    def player(self) -> Player.Player:
+        return self.__player
+
+    def cards(self) -> Hand.Hand:
+        return self.__cards
+
+    def info(self) -> str:
+        return f'[RUN GAME] player {self.__player} threw {self.__cards}'
+
+
+class RobberEvent(Event):
+    """the robber was placed after a roll of the robber dice value"""
+
+    def __init__(self, turn: int, player: Player.Player, hex_id: int, victim: Union[Player.Player, None],
+                 stolen: Union[Hand.Hand, None]):
+        super().__init__(EventType.ROBBER, turn)
+        self.__player = player
+        self.__hex_id = hex_id
+        self.__victim = victim
+        self.__stolen = stolen
+
+    def player(self) -> Player.Player:
+        return self.__player
+
+    def hex_id(self) -> int:
+        return self.__hex_id
+
+    def victim(self) -> Union[Player.Player, None]:
+        return self.__victim
+
+    def stolen(self) -> Union[Hand.Hand, None]:
+        """:returns the stolen card, None if nothing was stolen"""
+        return self.__stolen
+
+    def info(self) -> str:
+        return f'[ROBBER PROTOCOL] player {self.__player} placed robber at hex id {self.__hex_id}, ' \
+               f'took {self.__stolen} from player {self.__victim}'
+
+
+class MoveEvent(Event):
+    """a player played a move"""
+
+    def __init__(self, turn: int, player: Player.Player, move: Moves.Move):
+        super().__init__(EventType.MOVE, turn)
+        self.__player = player
+        self.__move = move
+
+    def player(self) -> Player.Player:
+        return self.__player
+
+    def move(self) -> Moves.Move:
+        return self.__move
+
+    def info(self) -> str:
+        return f'[RUN GAME] player {self.__player} is playing: {self.__move.info()}'
+
+
+class TurnEndEvent(Event):
+    """a player's turn ended"""
+
+    def __init__(self, turn: int, player: Player.Player):
+        super().__init__(EventType.TURN_END, turn)
+        self.__player = player
+
+    def player(self) -> Player.Player:
+        return self.__player
+
+
+class GameOverEvent(Event):
+    """the game ended"""
+
+    def __init__(self, turn: int, winner: Player.Player):
+        super().__init__(EventType.GAME_OVER, turn)
+        self.__winner = winner
+
+    def winner(self) -> Player.Player:
+        return self.__winner
+
+    def info(self) -> str:
+        return f'\n\n\nGAME OVER - {self.__winner} won!!!\nGame Ended After {self.turn()} Turns'
+
+
+class EventSink:
+    """Class representing a consumer of game events, a game with no sinks runs headless"""
+
+    def handle(self, event: Event, session: GameSession.GameSession) -> None:
+        """consumes an event of the given game"""
+        raise NotImplemented
+
+
+class ConsoleSink(EventSink):
+    """renders the game to the console: turn banners, rolls, moves, and the board and status table every turn"""
+
+    def handle(self, event: Event, session: GameSession.GameSession) -> None:
+        event_type = event.get_type()
+        if event_type == EventType.TURN_ORDER:
+            print('[CATAN] Catan game started, players rolling dice to establish turn order')
+            for player, roll in event.rolls():
+                print(f'[CATAN] agent {player} rolled {roll} = {sum(roll)}')
+            print(event.info())
+        elif event_type in (EventType.GAME_START, EventType.PRE_GAME_PLACEMENT):
+            print(event.info())
+            print(session.board())
+        elif event_type == EventType.ROLL:
+            print('\n\n' + '*' * 100)
+            print('*' * 45, 'NEXT TURN {:>3}'.format(event.turn()), '*' * 40)
+            print('*' * 100 + '\n')
+            print(event.info())
+        elif event_type == EventType.MOVE:
+            print(event.info())
+        elif event_type == EventType.TURN_END:
+            print(session.board())
+            print(session.status_table())
+        elif event_type == EventType.GAME_OVER:
+            print(event.info())
+
+
+class RecorderSink(EventSink):
+    """keeps every event it is given, e.g. for collecting statistics over batch runs"""
+
+    def __init__(self):
+        self.__events = []
+
+    def handle(self, event: Event, session: GameSession.GameSession) -> None:
+        self.__events.append(event)
+
+    def events(self, event_type: EventType = None) -> List[Event]:
+        """:returns the recorded events, only those of the given type if one is given"""
+        if event_type is None:
+            return self.__events
+        return [event for event in self.__events if event.get_type() == event_type]
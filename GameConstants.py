@@ -1,5 +1,4 @@
 from enum import Enum
-from Hand import Hand
 from typing import Union
 
 """A Module containing all constants in the Settlers of Catan game"""
@@ -150,22 +149,30 @@ BUILDABLES = [PurchasableType.SETTLEMENT,
 
 CardType = Union[DevType, ResourceType]
 
+# every card type gets a fixed slot, so a hand of cards can be held as a flat count vector #
+CARD_TYPES = list(ResourceType) + list(DevType)
+CARD_INDEX = {card: idx for idx, card in enumerate(CARD_TYPES)}
+NUM_CARD_TYPES = len(CARD_TYPES)
+CARD_CLASS_SLOTS = {ResourceType: (0, len(ResourceType)), DevType: (len(ResourceType), NUM_CARD_TYPES)}
+
+from Hand import Hand  # Hand relies on the card slots above, import only once they exist
+
 COSTS = {
-    PurchasableType.DEV_CARD: Hand(ResourceType.ORE,
-                                   ResourceType.SHEEP,
-                                   ResourceType.WHEAT),
-
-    PurchasableType.SETTLEMENT: Hand(ResourceType.WHEAT,
-                                     ResourceType.SHEEP,
-                                     ResourceType.FOREST,
-                                     ResourceType.BRICK),
-
-    PurchasableType.CITY: Hand(ResourceType.WHEAT,
-                               ResourceType.WHEAT,
-                               ResourceType.ORE,
-                               ResourceType.ORE,
-                               ResourceType.ORE),
-
-    PurchasableType.ROAD: Hand(ResourceType.BRICK,
-                               ResourceType.FOREST)
+    PurchasableType.DEV_CARD: Hand.frozen(ResourceType.ORE,
+                                          ResourceType.SHEEP,
+                                          ResourceType.WHEAT),
+
+    PurchasableType.SETTLEMENT: Hand.frozen(ResourceType.WHEAT,
+                                            ResourceType.SHEEP,
+                                            ResourceType.FOREST,
+                                            ResourceType.BRICK),
+
+    PurchasableType.CITY: Hand.frozen(ResourceType.WHEAT,
+                                      ResourceType.WHEAT,
+                                      ResourceType.ORE,
+                                      ResourceType.ORE,
+                                      ResourceType.ORE),
+
+    PurchasableType.ROAD: Hand.frozen(ResourceType.BRICK,
+                                      ResourceType.FOREST)
 }
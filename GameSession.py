@@ -1,8 +1,10 @@
 from __future__ import annotations
-from typing import Generator, Union, List
+from typing import Generator, Union, List, Dict, Tuple
 from itertools import combinations
 from enum import Enum
 from copy import deepcopy
+from random import Random, getrandbits
+from time import perf_counter
 import GameConstants as Consts
 import Board
 import Dice
@@ -10,9 +12,30 @@ import Player
 import Hand
 import Moves
 import Buildable
-import hexgrid
+import GameState
+import Topology
+import Events
+import Profiler
+import MovePruner
+import ActionSpace
+import numpy as np
 
 DEBUG = False
+VERIFY_HASH = DEBUG  # recompute the state hash from scratch on every make / unmake and hash query, to check it
+
+
+# constant hands offered in trades and throws, shared by all such moves #
+TRADE_HANDS = {(resource, size): Hand.Hand.frozen(*[resource] * size)
+               for resource in Consts.YIELDING_RESOURCES
+               for size in (1, Consts.RESOURCE_HARBOR_TRADE_RATIO, Consts.GENERAL_HARBOR_TRADE_RATIO,
+                            Consts.DECK_TRADE_RATIO)}
+YOP_HANDS = {pair: Hand.Hand.frozen(*pair) for pair in ActionSpace.YOP_PAIRS}
+
+# the build / dev card type of the action kinds of builds and dev cards (see ActionSpace) #
+BUILD_TYPES = {kind: build_type for build_type, kind in ActionSpace.BUILD_KINDS.items()}
+DEV_TYPES = {kind: dev_type for dev_type, kind in ActionSpace.DEV_KINDS.items()}
+# the count vector slots of the yielding resources, by resource index (see ActionSpace.RESOURCE_IDX) #
+RESOURCE_SLOTS = [Consts.CARD_INDEX[resource] for resource in Consts.YIELDING_RESOURCES]
 
 
 class GamePhase(Enum):  # used for self reference when agent wants to continue simulation from point left off
@@ -27,138 +50,224 @@ class GamePhase(Enum):  # used for self reference when agent wants to continue s
 
 class GameSession:
     """Class representing a Catan game instance, handles game flow, rule adherence, and logic of the game."""
-    def __init__(self, *players: Player.Player):
+    def __init__(self, *players: Player.Player, sinks: List[Events.EventSink] = None, seed=None,
+                 profile: bool = False, prune: bool = False):
+        """sinks are the consumers of the game's events, by default the game is rendered to the console.
+        a game with no sinks runs headless, and builds no events at all.
+        seed determines the board layout, the dice and the cards drawn at random (drawn from the global random module
+        if not given). the dice roll from a stream of their own, so games with the same seed share a dice sequence
+        whatever their players choose.
+        a profiled game times its phases, see stats().
+        a pruning game removes the equivalent and dominated moves of the main phase and of the robber placement
+        before its players choose, see pruner()"""
         assert Consts.MIN_PLAYERS <= len(players) <= Consts.MAX_PLAYERS
+        self.__sinks = [Events.ConsoleSink()] if sinks is None else list(sinks)
+        self.__stats = Profiler.PhaseStats() if profile else None
+        self.__pruner = MovePruner.MovePruner() if prune else None
+        self.__moves = {}  # the moves made so far, see __move
 
-        # winning stats
-        self.__winning_player = None
+        # random streams #
+        self.__seed = getrandbits(64) if seed is None else seed
+        self.__num_substreams = 0
+        self.__rng = Random(self.__seed)
+
+        # game state buffers, everything mutable about the game lives here #
+        self.__state = GameState.GameState(sum(1 for player in players if player is not None))
 
         # game board & dice #
-        self.__board = Board.Board()
-        self.__dice = Dice.Dice()
+        self.__board = Board.Board(self.__state, self.__rng)
+        self.__dice = Dice.Dice(Random(f'{self.__seed}/dice'))
 
         # players #
         self.__turn_order = self.__init_turn_order(*players)
         self.__num_players = len(self.__turn_order)
-        self.__player_colors = ()
-        self.__player_vp_histories = {str(p): [] for p in self.players()}
+        for idx, player in enumerate(self.__turn_order):
+            player.bind(self.__state, idx)
+        self.__board.set_players(self.__turn_order)
 
         # resources deck #
-        self.__res_deck = Hand.Hand(*Consts.RES_DECK)
+        self.__res_deck = Hand.Hand.wrap(self.__state.res_deck, self.__state, GameState.RES_DECK_KEYS)
+        self.__res_deck.insert(Hand.Hand(*Consts.RES_DECK))
 
         # development cards deck #
-        self.__dev_deck = Hand.Hand(*Consts.DEV_DECK)
+        self.__dev_deck = Hand.Hand.wrap(self.__state.dev_deck, self.__state, GameState.DEV_DECK_KEYS)
+        self.__dev_deck.insert(Hand.Hand(*Consts.DEV_DECK))
 
         # phase misc #
-        self.__dev_cards_bought_this_turn = Hand.Hand()
-        self.__curr_turn_idx = 0
-        self.__num_turns_played = 0
-        self.__phase = GamePhase.START
-        self.__curr_player_sim = self.__turn_order[0]
-        self.__pre_game_round = 1
-        self.__pre_game_settlement_node = None
-        self.__throw_player = None
-        self.__throw_player_hand_size = None
-        self.__vp_earned_this_phase = 0
-        self.__possible_moves_this_phase = []
-        self.__dev_used_this_turn = False
-        self.__yields = {p: 0 for p in self.players()}
-        self.__prob_turn_history = {p: [(0, 0)] for p in self.players()}
+        self.__dev_cards_bought_this_turn = Hand.Hand.wrap(self.__state.devs_bought_this_turn, self.__state)
+        self.__state.phase = GamePhase.START
+
+    def clone(self) -> GameSession:
+        """:returns an independent copy of this game, made by copying its state buffers. the static board layout
+        and the players' agents are shared with the copy"""
+        clone = GameSession.__new__(GameSession)
+        clone.__seed = self.__spawn_seed()
+        clone.__num_substreams = 0
+        clone.__rng = Random(clone.__seed)
+        clone.__state = self.__state.copy()
+        clone.__turn_order = [player.bound_to(clone.__state) for player in self.__turn_order]
+        clone.__num_players = self.__num_players
+        clone.__board = self.__board.bound_to(clone.__state, clone.__turn_order)
+        clone.__dice = self.__dice.bound_to(Random(f'{clone.__seed}/dice'))
+        clone.__res_deck = Hand.Hand.wrap(clone.__state.res_deck, clone.__state, GameState.RES_DECK_KEYS)
+        clone.__dev_deck = Hand.Hand.wrap(clone.__state.dev_deck, clone.__state, GameState.DEV_DECK_KEYS)
+        clone.__dev_cards_bought_this_turn = Hand.Hand.wrap(clone.__state.devs_bought_this_turn, clone.__state)
+        clone.__sinks = []  # simulations are silent
+        clone.__stats = None  # and are not profiled
+        clone.__pruner = self.__pruner  # simulations are pruned (and counted) as the game is
+        clone.__moves = {}  # the clone's moves are made with the clone's players
+        return clone
+
+    def __deepcopy__(self, memo) -> GameSession:
+        return self.clone()
+
+    def __getstate__(self) -> dict:
+        """pickled games (e.g. sent to worker processes) leave the moves made so far behind, they are made anew"""
+        state = self.__dict__.copy()
+        state['_GameSession__moves'] = {}
+        return state
+
+    def seed(self):
+        """:returns the seed of this game's random streams"""
+        return self.__seed
+
+    def reseed(self, seed) -> None:
+        """restarts this game's random streams (cards, dice and the substreams of its future clones) from the given
+        seed, e.g. so that copies of a game sent to different processes do not roll the same dice"""
+        self.__seed = seed
+        self.__num_substreams = 0
+        self.__rng = Random(seed)
+        self.__dice = self.__dice.bound_to(Random(f'{seed}/dice'))
+
+    def state_hash(self) -> int:
+        """:returns the 64 bit zobrist hash of the current position (see GameState) on this game's board, kept up to
+        date with every change of the state"""
+        if VERIFY_HASH:
+            self.__verify_hash()
+        return self.__state.zobrist ^ self.__board.layout_hash()
+
+    def __verify_hash(self) -> None:
+        computed = self.__state.compute_hash()
+        assert self.__state.zobrist == computed, \
+            f'incremental state hash {self.__state.zobrist:#x} != hash computed from scratch {computed:#x}'
+
+    def stats(self) -> Union[Profiler.PhaseStats, None]:
+        """:returns the phase timings of a profiled game, None if the game is not profiled"""
+        return self.__stats
+
+    def pruner(self) -> Union[MovePruner.MovePruner, None]:
+        """:returns the move pruner of a pruning game (counting the moves it removed), None if the game does not
+        prune"""
+        return self.__pruner
+
+    def add_sink(self, sink: Events.EventSink) -> None:
+        """adds a consumer of this game's events"""
+        self.__sinks.append(sink)
 
     def run_game(self) -> None:
         """Initiates the main game loop, returns when game ends."""
+        if self.__sinks:
+            self.__emit(Events.GameStartEvent())
         self.__run_pre_game()
 
         for curr_player in self.__turn_generator(self.__num_players):
-            self.__dev_used_this_turn = False
-            self.__vp_earned_this_phase = 0
-            self.__curr_player_sim = curr_player
-            self.__dev_cards_bought_this_turn = Hand.Hand()  # to know if player can use a dev card
-            if self.__num_turns_played % 10 == 0:
-                dprint(self.__num_turns_played, self.__curr_player_sim, 'playing...')
-            dprint(*('{} = {}  '.format(p, p.vp()) for p in self.players()))
-
-            self.__dice.roll()
-            print('\n\n' + '*' * 100)
-            print('*' * 45, 'NEXT TURN {:>3}'.format(self.__num_turns_played), '*' * 40)
-            print('*' * 100 + '\n')
-            print(f'[RUN GAME] Rolling dice... {self.__dice.sum()} rolled')
-            if self.__dice.sum() == Consts.ROBBER_DICE_VALUE:  # robber activated
+            self.__state.dev_used_this_turn = False
+            self.__state.vp_earned_this_phase = 0
+            self.__state.curr_player = curr_player.turn_idx()
+            self.__dev_cards_bought_this_turn.clear()  # to know if player can use a dev card
+            if DEBUG:
+                if self.__state.num_turns_played % 10 == 0:
+                    dprint(self.__state.num_turns_played, self.current_player(), 'playing...')
+                dprint(*('{} = {}  '.format(p, p.vp()) for p in self.players()))
+            if self.__sinks:
+                self.__emit(Events.TurnStartEvent(self.__state.num_turns_played, curr_player))
+
+            self.__roll_dice()
+            if self.__sinks:
+                self.__emit(Events.RollEvent(self.__state.num_turns_played, curr_player, self.__state.dice_sum))
+            if self.__state.dice_sum == Consts.ROBBER_DICE_VALUE:  # robber activated
                 dprint('[RUN GAME] Robber Activated! Checking for oversized hands...')
 
                 # remove cards from oversized hands
-                self.__phase = GamePhase.ROBBER_THROW
+                self.__state.phase = GamePhase.ROBBER_THROW
                 for player in self.players():
                     player_hand_size = player.resource_hand_size()
                     if player_hand_size > Consts.MAX_CARDS_IN_HAND:
-                        self.__throw_player = player
-                        self.__throw_player_hand_size = player_hand_size - (player_hand_size // 2)
+                        self.__state.throw_player = player.turn_idx()
+                        self.__state.throw_player_hand_size = player_hand_size - (player_hand_size // 2)
                         for _ in range(player_hand_size // 2):
-                            self.__possible_moves_this_phase = self.__get_possible_throw_moves(player)
-                            throw_move = player.choose(self.__possible_moves_this_phase, deepcopy(self))
+                            throw_moves = self.__offer(self.__profiled(Profiler.ProfiledPhase.MOVE_GENERATION,
+                                                                       self.__get_possible_throw_moves, player))
+                            throw_move = self.__choose(player, throw_moves)
                             cards_thrown = throw_move.throws()
-                            dprint(f'[RUN GAME] player {player} had too many cards ({player_hand_size}), '
-                                   f'he threw {cards_thrown}')
+                            if DEBUG:
+                                dprint(f'[RUN GAME] player {player} had too many cards ({player_hand_size}), '
+                                       f'he threw {cards_thrown}')
                             player.throw_cards(cards_thrown)
                             self.__res_deck.insert(cards_thrown)
+                            if self.__sinks:
+                                self.__emit(Events.ThrowEvent(self.__state.num_turns_played, player, cards_thrown))
 
                 # move robber
-                self.__phase = GamePhase.ROBBER_PLACE
-                self.__possible_moves_this_phase = self.__get_possible_knight_moves(curr_player, robber=True)
-                knight_move = curr_player.choose(self.__possible_moves_this_phase, deepcopy(self))
+                self.__state.phase = GamePhase.ROBBER_PLACE
+                knight_moves = self.__offer(self.__profiled(Profiler.ProfiledPhase.MOVE_GENERATION,
+                                                            self.__get_possible_knight_moves, curr_player, True))
+                knight_move = self.__choose(curr_player, knight_moves)
 
                 assert isinstance(knight_move, Moves.UseKnightDevMove)
                 robber_hex = knight_move.hex_id()
                 opp = knight_move.take_from()
-                self.__robber_protocol(curr_player, robber_hex, opp)
+                stolen = self.__robber_protocol(curr_player, robber_hex, opp)
+                if self.__sinks:
+                    self.__emit(Events.RobberEvent(self.__state.num_turns_played, curr_player, robber_hex,
+                                                   opp, stolen))
 
             else:  # not robber
                 # distribute resources
                 dprint(f'[RUN GAME] distributing resources...')
-                dist = self.__board.resource_distributions(self.__dice.sum())
-                for player, hand in dist.items():
-                    self.__yields[player] += 1
-                    removed = self.__res_deck.remove_as_much(hand)
-                    player.receive_cards(removed)
-                    dprint(f'[RUN GAME] player {player} received {removed}, '
-                           f'now has {player.resource_hand()}')
+                received = self.__profiled(Profiler.ProfiledPhase.DISTRIBUTION, self.__distribute_resources)
+                if self.__sinks:
+                    self.__emit(Events.DistributionEvent(self.__state.num_turns_played, received))
 
             # query player for move #
-            self.__phase = GamePhase.MAKE_MOVE
-            self.__possible_moves_this_phase = self.__get_possible_moves(curr_player)
-            moves_available = self.__possible_moves_this_phase
-            dprint(f'[RUN GAME] player {curr_player} can play:\n')
-            dprint('\n'.join(m.info() for m in moves_available) + '\n')
-            move_to_play = curr_player.choose(moves_available, deepcopy(self))
-
-            print(f'[RUN GAME] player {curr_player} is playing: {move_to_play.info()}')
+            self.__state.phase = GamePhase.MAKE_MOVE
+            moves_available = self.__offer(self.__profiled(Profiler.ProfiledPhase.MOVE_GENERATION,
+                                                           self.__get_possible_moves, curr_player))
+            if DEBUG:
+                dprint(f'[RUN GAME] player {curr_player} can play:\n')
+                dprint('\n'.join(m.info() for m in moves_available) + '\n')
+            move_to_play = self.__choose(curr_player, moves_available)
+            if self.__sinks:
+                self.__emit(Events.MoveEvent(self.__state.num_turns_played, curr_player, move_to_play))
 
             vp_before = curr_player.vp()
-            self.__apply_move(move_to_play)
+            self.__profiled(Profiler.ProfiledPhase.APPLY_MOVE, self.__apply_move, move_to_play)
             vp_after = curr_player.vp()
-            self.__vp_earned_this_phase = vp_after - vp_before
+            self.__state.vp_earned_this_phase = vp_after - vp_before
 
             while move_to_play.get_type() != Moves.MoveType.PASS:
-                self.__possible_moves_this_phase = self.__get_possible_moves(curr_player)
-                moves_available = self.__possible_moves_this_phase
-                dprint(f'[RUN GAME] player {curr_player} can play:\n')
-                dprint('\n'.join(m.info() for m in moves_available) + '\n')
-                move_to_play = curr_player.choose(moves_available, deepcopy(self))
-                print(f'[RUN GAME] player {curr_player} is playing: {move_to_play.info()}')
+                moves_available = self.__offer(self.__profiled(Profiler.ProfiledPhase.MOVE_GENERATION,
+                                                               self.__get_possible_moves, curr_player))
+                if DEBUG:
+                    dprint(f'[RUN GAME] player {curr_player} can play:\n')
+                    dprint('\n'.join(m.info() for m in moves_available) + '\n')
+                move_to_play = self.__choose(curr_player, moves_available)
+                if self.__sinks:
+                    self.__emit(Events.MoveEvent(self.__state.num_turns_played, curr_player, move_to_play))
 
                 vp_before = curr_player.vp()
-                self.__apply_move(move_to_play)
+                self.__profiled(Profiler.ProfiledPhase.APPLY_MOVE, self.__apply_move, move_to_play)
                 vp_after = curr_player.vp()
-                self.__vp_earned_this_phase = vp_after - vp_before
+                self.__state.vp_earned_this_phase = vp_after - vp_before
 
-            print(self.board())
-            print(self.status_table())
+            if self.__sinks:
+                self.__emit(Events.TurnEndEvent(self.__state.num_turns_played, curr_player))
             self.__update_vp_histories()
             if self.is_game_over():
-                self.__phase = GamePhase.GAME_OVER
-                self.__possible_moves_this_phase = []
-                print(f'\n\n\nGAME OVER - {curr_player} won!!!')
-                print("Game Ended After", self.__num_turns_played, "Turns")
+                self.__state.phase = GamePhase.GAME_OVER
+                self.__offer([])
+                if self.__sinks:
+                    self.__emit(Events.GameOverEvent(self.__state.num_turns_played, curr_player))
                 break
 
     def largest_army_player(self) -> Union[Player.Player, None]:
@@ -200,57 +309,73 @@ class GameSession:
 
     def num_turns_played(self) -> int:
         """:returns the number of turns played so far"""
-        return self.__num_turns_played
+        return self.__state.num_turns_played
 
     def vp_history(self):
         """:returns a {player: history} dictionary that maps players to lists of their VP per turn"""
-        return self.__player_vp_histories
+        return {str(p): self.__state.vp_histories[p.turn_idx()] for p in self.players()}
 
     def current_player(self) -> Player.Player:
         """:returns the player whose turn it is"""
-        return self.__curr_player_sim
+        return self.__turn_order[self.__state.curr_player]
 
     def vp_earned_this_phase(self) -> int:
         """:returns the number of VP earned in the current game phase (choice making phase)"""
-        return self.__vp_earned_this_phase
+        return self.__state.vp_earned_this_phase
 
     def simulate_game(self, move_to_play: Moves.Move = None) -> List[Moves.Move]:
         """simulates a move to play, returns list of valid moves to play next"""
-        if self.__phase == GamePhase.START:
-            return self.__start_sim()
+        phase = self.__state.phase
+        if phase == GamePhase.START:
+            self.__start_sim()
 
-        if self.__phase == GamePhase.PRE_GAME_SETTLEMENT:
+        elif phase == GamePhase.PRE_GAME_SETTLEMENT:
             assert isinstance(move_to_play, Moves.BuildMove)
-            return self.__pre_game_settlement_sim(move_to_play)
+            self.__pre_game_settlement_sim(move_to_play.at())
 
-        elif self.__phase == GamePhase.PRE_GAME_ROAD:
+        elif phase == GamePhase.PRE_GAME_ROAD:
             assert isinstance(move_to_play, Moves.BuildMove)
-            return self.__pre_game_road_sim(move_to_play)
+            self.__pre_game_road_sim(move_to_play.at())
 
-        elif self.__phase == GamePhase.ROBBER_THROW:
+        elif phase == GamePhase.ROBBER_THROW:
             assert isinstance(move_to_play, Moves.ThrowMove)
-            return self.__robber_throw_sim(move_to_play)
+            self.__robber_throw_sim(move_to_play.throws())
 
-        elif self.__phase == GamePhase.ROBBER_PLACE:
+        elif phase == GamePhase.ROBBER_PLACE:
             assert isinstance(move_to_play, Moves.UseKnightDevMove)
-            return self.__robber_place_sim(move_to_play)
-
-        elif self.__phase == GamePhase.MAKE_MOVE:
-            return self.__make_move_sim(move_to_play)
+            self.__robber_place_sim(move_to_play.hex_id(), move_to_play.take_from())
+
+        elif phase == GamePhase.MAKE_MOVE:
+            # the free roads of a road building card are simulated as moves of the main phase too #
+            self.__make_move_sim(ActionSpace.action_of(move_to_play), *self.__move_flags(move_to_play))
+
+        return self.__offer(self.__phase_moves())
+
+    def make_move(self, move_to_play: Moves.Move = None) -> List[Moves.Move]:
+        """
+        simulates a move like simulate_game, while recording every change it makes in the state's undo journal.
+        make_move calls may be nested, each one is reverted by a matching unmake_move
+        :param move_to_play: the move to simulate
+        :return: list of valid moves to play next
+        """
+        self.__state.push_undo_mark()
+        moves = self.simulate_game(move_to_play)
+        if VERIFY_HASH:
+            self.__verify_hash()
+        return moves
 
-        elif self.__phase == GamePhase.GAME_OVER:
-            self.__possible_moves_this_phase = []
-            return self.__possible_moves_this_phase
+    def unmake_move(self) -> None:
+        """reverts the game to where it was before the last make_move (the dice are not re-rolled back)"""
+        self.__state.pop_undo_mark()
+        if VERIFY_HASH:
+            self.__verify_hash()
 
     def simulate_move(self, move: Moves.Move) -> GameSession:
         """legacy version of simulate_game that simulates without resuming the game flow"""
-        state = deepcopy(self)
+        state = self.clone()
         for p in state.players():
             if p.get_id() == move.player().get_id():
-                new_player_obj = p
-                new_move = deepcopy(move)
-                new_move.set_player(new_player_obj)
-                state.__apply_move(new_move, printout=False, mock=True)
+                state.__apply_move(move, printout=False, mock=True)  # the move's player is found by id
                 return state
 
         else:
@@ -258,10 +383,62 @@ class GameSession:
 
     def possible_moves(self) -> List[Moves.Move]:
         """:returns list of possible moves to currently play"""
-        return self.__possible_moves_this_phase
+        moves = self.__state.possible_moves
+        if moves is None:  # a decision reached by step, its moves are generated once asked for
+            moves = self.__state.possible_moves = self.__phase_moves()
+        return moves
+
+    def legal_action_mask(self) -> np.ndarray:
+        """:returns the boolean mask over all the action ids (see ActionSpace) of the moves possible to play now, made
+        once per decision. unless the game prunes its moves, the mask is made straight from the state's frontiers and
+        card counts, without generating the moves"""
+        mask = self.__state.legal_mask
+        if mask is None:
+            action_ids = self.__legal_action_ids() if self.__pruner is None else \
+                [ActionSpace.action_id(move) for move in self.possible_moves()]
+            mask = self.__state.legal_mask = ActionSpace.mask_of(action_ids)
+        return mask
+
+    def action_move(self, action_id: int) -> Moves.Move:
+        """:returns the possible move of the given action id"""
+        for move in self.possible_moves():
+            if ActionSpace.action_id(move) == action_id:
+                return move
+        raise ValueError(f'action {action_id} {ActionSpace.ACTIONS[action_id]} cannot be played now')
+
+    def step(self, action_id: int) -> np.ndarray:
+        """
+        plays the action of the given id like simulate_game plays a move (use make_move(action_move(action_id)) to
+        be able to revert it). the action is decoded and applied to the state as is, and the next decision's moves
+        are not generated unless asked for (see possible_moves). the roads of a road building card are still chosen
+        as moves, by the player's agent. a game that has not started has no legal actions, start it with
+        simulate_game()
+        :returns the legal action mask of the next decision
+        """
+        if not self.legal_action_mask()[action_id]:
+            raise ValueError(f'action {action_id} {ActionSpace.ACTIONS[action_id]} cannot be played now')
+        action = ActionSpace.ACTIONS[action_id]
+        phase = self.__state.phase
+        if phase == GamePhase.PRE_GAME_SETTLEMENT:
+            self.__pre_game_settlement_sim(action[1])
+        elif phase == GamePhase.PRE_GAME_ROAD:
+            self.__pre_game_road_sim(action[1])
+        elif phase == GamePhase.ROBBER_THROW:
+            self.__robber_throw_sim(TRADE_HANDS[action[1], 1])
+        elif phase == GamePhase.ROBBER_PLACE:
+            self.__robber_place_sim(action[1], self.__victim(action[2]))
+        else:
+            self.__make_move_sim(action)
+        self.__offer(None)
+        return self.legal_action_mask()
+
+    def generate_moves(self) -> List[Moves.Move]:
+        """:returns the main phase moves of the current player, generated anew (possible_moves() returns the moves
+        cached for the current phase)"""
+        return self.__get_possible_moves(self.current_player())
 
     def possible_sim_moves(self, simulating_player):
-        if self.__curr_player_sim == simulating_player:
+        if self.current_player() == simulating_player:
             return self.possible_moves()
 
         return [m for m in self.possible_moves() if not isinstance(m, Moves.UseDevMove) or (
@@ -272,14 +449,14 @@ class GameSession:
         def get_player_nodes(p):
             all_nodes = []
             for edge in p.road_edges():
-                all_nodes.extend(hexgrid.nodes_touching_edge(edge))
+                all_nodes.extend(Topology.EDGE_NODES[Topology.EDGE_IDX[edge]])
             return all_nodes
 
         def get_almost_buildable_nodes(p):
             player_nodes = get_player_nodes(p)
             adj_to_player_nodes = set()
             for player_node in player_nodes:
-                for adj_node in self.board().get_adj_nodes_to_node(player_node):
+                for adj_node in Topology.NODE_NODES[player_node]:
                     if self.__is_distant_node(adj_node) and adj_node not in player_nodes:
                         adj_to_player_nodes.add(adj_node)
             return list(adj_to_player_nodes)
@@ -299,7 +476,7 @@ class GameSession:
 
         hex_ids = []
         for node in almost_buildable_nodes:
-            hex_ids.extend(self.board().get_adj_tile_ids_to_node(node))
+            hex_ids.extend(Topology.NODE_TILES[node])
         for token in [self.board().hexes()[h_id].token() for h_id in hex_ids]:
             if token > 0:
                 prob_score += almost_buildable_coeff * Dice.PROBABILITIES[token]
@@ -309,7 +486,7 @@ class GameSession:
     def players_luck(self):
         luck = []
         for p in self.players():
-            hist = self.__prob_turn_history[p]
+            hist = self.__state.prob_turn_history[p.turn_idx()]
             hist.append((self.board().probability_score(p, exclude_robber=True), self.num_turns_played()))
             expected_yields = 0
             last_prob, last_turn = hist[0]
@@ -317,7 +494,7 @@ class GameSession:
                 expected_yields += (turn - last_turn) * last_prob
                 last_turn = turn
                 last_prob = prob
-            actual_yields = self.__yields[p]
+            actual_yields = self.__state.yields[p.turn_idx()]
             print(p, 'actual yields', actual_yields)
             print(hist)
             print('calculated expected yields', expected_yields, '--> luck =', actual_yields / expected_yields)
@@ -390,7 +567,7 @@ class GameSession:
 
         sep = '|' + '-' * (sum(max_widths) + 3 * (len(max_widths) - 1) + 2) + '|'
         string_table = '\n' + sep + '\n| {:{}} |'.format('Status Table', len(sep) - 4) + \
-                       '\n| {:{}} |'.format(f'{self.__num_turns_played} Turns Played', len(sep) - 4) + '\n'
+                       '\n| {:{}} |'.format(f'{self.__state.num_turns_played} Turns Played', len(sep) - 4) + '\n'
         for line in table:
             if line[0]:
                 string_table += sep + '\n'
@@ -402,57 +579,104 @@ class GameSession:
         return string_table
 
     def __init_turn_order(self, *players: Player.Player) -> List[Player.Player]:
-        print('[CATAN] Catan game started, players rolling dice to establish turn order')
         rolls = []
+        dice_rolls = []
         for player in players:
             if player is None:
                 continue
-            print(f'[CATAN] agent {player} rolled {self.__dice.roll()} = {self.__dice.sum()}')
+            dice_rolls.append((player, self.__dice.roll()))
             rolls.append((self.__dice.sum(), player))
 
         rolls.sort(key=lambda x: x[0], reverse=True)  # from highest sum to lowest
-        print('[CATAN] turn order will be:\n' + '\n'.join(f'Player.Player {player}' for roll, player in rolls))
-        return [player for roll, player in rolls]
+        turn_order = [player for roll, player in rolls]
+        if self.__sinks:
+            self.__emit(Events.TurnOrderEvent(dice_rolls, turn_order))
+        return turn_order
+
+    def __choose(self, player: Player.Player, moves: List[Moves.Move]) -> Moves.Move:
+        """:returns the move the player chooses out of moves, the player decides on a copy of the game"""
+        stats = self.__stats
+        if stats is None:
+            return player.choose(moves, deepcopy(self))
+        start = perf_counter()
+        session = deepcopy(self)
+        cloned = perf_counter()
+        move = player.choose(moves, session)
+        stats.add(Profiler.ProfiledPhase.CLONE, cloned - start)
+        stats.add(Profiler.ProfiledPhase.DECISION, perf_counter() - cloned, player)
+        return move
+
+    def __profiled(self, phase: Profiler.ProfiledPhase, action, *args):
+        """calls action(*args), timed as the given phase if the game is profiled"""
+        stats = self.__stats
+        if stats is None:
+            return action(*args)
+        start = perf_counter()
+        result = action(*args)
+        stats.add(phase, perf_counter() - start)
+        return result
+
+    def __distribute_resources(self) -> Dict[Player.Player, Hand.Hand]:
+        """hands out the resources yielded by the current dice roll, as far as the deck allows
+        :returns the cards each player received"""
+        received = {}
+        for player, hand in self.__board.resource_distributions(self.__state.dice_sum).items():
+            self.__state.yields[player.turn_idx()] += 1
+            removed = self.__res_deck.remove_as_much(hand)
+            player.resource_hand().insert(removed)
+            received[player] = removed
+            if DEBUG:
+                dprint(f'[RUN GAME] player {player} received {removed}, '
+                       f'now has {player.resource_hand()}')
+        return received
 
-    def __restore(self, saved_self: GameSession) -> None:
-        self.__board = saved_self.__board
-        self.__dice = saved_self.__dice
-        self.__turn_order = saved_self.__turn_order
-        self.__res_deck = saved_self.__res_deck
-        self.__dev_deck = saved_self.__dev_deck
-        self.__num_players = saved_self.__num_players
+    def __spawn_seed(self) -> str:
+        """:returns the seed of a new substream of this game, for a clone. substreams are derived from the game's
+        seed and their number, they do not draw from the game's own streams"""
+        self.__num_substreams += 1
+        return f'{self.__seed}/{self.__num_substreams}'
+
+    def __emit(self, event: Events.Event) -> None:
+        for sink in self.__sinks:
+            sink.handle(event, self)
+
+    def __throw_player(self) -> Player.Player:
+        return self.__turn_order[self.__state.throw_player]
+
+    def __roll_dice(self) -> None:
+        self.__dice.roll()
+        self.__state.dice_sum = self.__dice.sum()
 
     def __turn_generator(self, num_players: int) -> Generator[Player.Player]:
         while True:
-            self.__num_turns_played += 1
-            yield self.players()[self.__curr_turn_idx]
-            self.__curr_turn_idx = (self.__curr_turn_idx + 1) % num_players
+            self.__state.num_turns_played += 1
+            yield self.players()[self.__state.curr_turn_idx]
+            self.__state.curr_turn_idx = (self.__state.curr_turn_idx + 1) % num_players
 
     def __run_pre_game(self) -> None:
-        print('[CATAN] Pre-Game started')
-        print(self.board())
         for _round in (1, 2):
-            self.__pre_game_round = _round
+            self.__state.pre_game_round = _round
             turn_gen = ((player for player in self.players())  # 0, 1, 2, 3
                         if _round == 1 else
                         (player for player in reversed(self.players())))  # 3, 2, 1, 0
             for curr_player in turn_gen:
-                self.__curr_player_sim = curr_player
+                self.__state.curr_player = curr_player.turn_idx()
                 # get player's choice of settlement
-                self.__phase = GamePhase.PRE_GAME_SETTLEMENT
-                self.__possible_moves_this_phase = self.__get_possible_build_settlement_moves(curr_player,
-                                                                                              pre_game=True)
-                build_settlement_move = curr_player.choose(self.__possible_moves_this_phase, deepcopy(self))
+                self.__state.phase = GamePhase.PRE_GAME_SETTLEMENT
+                settlement_moves = self.__offer(self.__profiled(Profiler.ProfiledPhase.MOVE_GENERATION,
+                                                                self.__get_possible_build_settlement_moves,
+                                                                curr_player, True))
+                build_settlement_move = self.__choose(curr_player, settlement_moves)
 
                 # add new settlement to game
                 settlement_node = build_settlement_move.at()
 
-                if settlement_node not in hexgrid.legal_node_coords():
+                if settlement_node not in Topology.NODE_IDX:
                     print(build_settlement_move.info())
-                    print('is in possible moves?', build_settlement_move in self.__possible_moves_this_phase)
-                    print(*(m.info() for m in self.__possible_moves_this_phase))
+                    print('is in possible moves?', build_settlement_move in settlement_moves)
+                    print(*(m.info() for m in settlement_moves))
 
-                self.__pre_game_settlement_node = settlement_node
+                self.__state.pre_game_settlement_node = settlement_node
                 settlement = Buildable.Buildable(curr_player, settlement_node, Consts.PurchasableType.SETTLEMENT)
                 curr_player.add_buildable(settlement)
                 self.__board.build(settlement)
@@ -460,13 +684,12 @@ class GameSession:
                 dprint(self.board())
 
                 # get player's choice of road
-                self.__phase = GamePhase.PRE_GAME_ROAD
+                self.__state.phase = GamePhase.PRE_GAME_ROAD
                 adj_edges = self.board().get_adj_edges_to_node(build_settlement_move.at())
-                self.__possible_moves_this_phase = [
-                    Moves.BuildMove(curr_player, Consts.PurchasableType.ROAD, edge, free=True)
-                    for edge in adj_edges]
-                possible_road_moves = self.__possible_moves_this_phase
-                build_adj_road_move = curr_player.choose(possible_road_moves, deepcopy(self))
+                possible_road_moves = self.__offer([
+                    self.__move(Moves.BuildMove, curr_player, Consts.PurchasableType.ROAD, edge, True)
+                    for edge in adj_edges])
+                build_adj_road_move = self.__choose(curr_player, possible_road_moves)
 
                 # add new road to game
                 road_edge = build_adj_road_move.at()
@@ -474,32 +697,36 @@ class GameSession:
                 curr_player.add_buildable(road)
                 self.__board.build(road)
 
-                print(f'[PRE GAME] player {curr_player} placed settlement at {hex(settlement_node)}, '
-                       f'road at {hex(road_edge)}')
-
+                starting_resources = Hand.Hand()
                 if _round == 2:  # second round, yield resources from settlement
                     starting_resources = self.__board.resource_distributions_by_node(settlement_node)
                     self.__res_deck.remove(starting_resources)
                     curr_player.receive_cards(starting_resources)
-                    dprint(f'[PRE GAME] player {curr_player} received {starting_resources} '
-                           f'for his 2nd settlement at {hex(settlement_node)}')
-
-                print(self.board())
-                dprint(self.status_table())
+                    if DEBUG:
+                        dprint(f'[PRE GAME] player {curr_player} received {starting_resources} '
+                               f'for his 2nd settlement at {hex(settlement_node)}')
+
+                if self.__sinks:
+                    self.__emit(Events.PreGamePlacementEvent(curr_player, settlement_node, road_edge,
+                                                             starting_resources))
+                if DEBUG:
+                    dprint(self.status_table())
         for p in self.players():
-            self.__prob_turn_history[p].append((self.board().probability_score(p, exclude_robber=True), 0))
+            self.__state.prob_turn_history[p.turn_idx()].append((self.board().probability_score(p, exclude_robber=True), 0))
 
     def __robber_protocol(self, curr_player: Player.Player, robber_hex_id: int, opp: Player.Player,
-                          printout=True) -> None:
+                          printout=True) -> Union[Hand.Hand, None]:
+        """:returns the card taken from the victim, None if no card was taken"""
+        printout = printout and DEBUG
         self.__board.move_robber_to(robber_hex_id)
         if printout:
             dprint(f'[ROBBER PROTOCOL] player {curr_player} placed robber at hex id {robber_hex_id}')
 
         # get all players adj to hex with robber
         possible_players = set()
-        for node in hexgrid.nodes_touching_tile(robber_hex_id + 1):
-            if node in self.__board.nodes():
-                opp = self.__board.nodes().get(node).player()
+        for node in self.__board.hexes()[robber_hex_id].nodes():
+            if self.__board.node_owner(node) is not None:
+                opp = self.__board.node_owner(node)
                 if opp != curr_player:
                     possible_players.add(opp)
 
@@ -507,6 +734,7 @@ class GameSession:
             dprint(f'[ROBBER PROTOCOL] opponent players adjacent to hex: {possible_players}')
 
         # choose victim
+        removed_card = None
         if opp is not None:
 
             if printout:
@@ -515,7 +743,7 @@ class GameSession:
             # take card from player
             opp_hand = opp.resource_hand()
             if opp_hand.size():
-                removed_card = opp_hand.remove_random_card()
+                removed_card = opp_hand.remove_random_card(self.__rng)
                 curr_player.receive_cards(removed_card)
                 if printout:
                     dprint(f'[ROBBER PROTOCOL] player {curr_player} took {removed_card} from player {opp}')
@@ -524,24 +752,38 @@ class GameSession:
                        f'hand is empty')
         elif printout:
             dprint(f'[ROBBER PROTOCOL] no players adjacent to hex {robber_hex_id}')
+        return removed_card
 
     def __apply_move(self, move: Moves.Move, printout=True, mock=False) -> None:
-        if move.get_type() == Moves.MoveType.PASS:
-            return
-
         player = move.player()
         for p in self.players():
             if p == move.player():
                 player = p
+        self.__apply_action(player, ActionSpace.action_of(move), printout, mock, *self.__move_flags(move))
+
+    @staticmethod
+    def __move_flags(move: Moves.Move) -> Tuple[bool, bool]:
+        """:returns whether the move is a free build, and whether it is a robber placement (actions do not tell)"""
+        return (isinstance(move, Moves.BuildMove) and move.is_free(),
+                isinstance(move, Moves.UseKnightDevMove) and move.robber_activated())
+
+    def __apply_action(self, player: Player.Player, action: tuple, printout=True, mock=False, free=False,
+                       robber=False) -> None:
+        """applies an action (see ActionSpace) of the player, free builds are not paid for and robber placements use
+        no knight card"""
+        printout = printout and DEBUG
+        kind = action[0]
+        if kind is ActionSpace.ActionKind.PASS:
+            return
 
         # saved_state = deepcopy(self)
         try:
-            if isinstance(move, Moves.ThrowMove):
-                card = move.throws()
+            if kind is ActionSpace.ActionKind.THROW:
+                card = TRADE_HANDS[action[1], 1]
                 self.__res_deck.insert(card)
                 player.resource_hand().remove(card)
 
-            if isinstance(move, Moves.BuyDevMove):
+            if kind is ActionSpace.ActionKind.BUY_DEV:
                 dev_cost = Consts.COSTS.get(Consts.PurchasableType.DEV_CARD)
                 player.throw_cards(dev_cost)
                 self.__res_deck.insert(dev_cost)
@@ -551,30 +793,29 @@ class GameSession:
                     for p in self.players():
                         used = p.used_dev_hand()
                         temp_deck.remove(used)
-                    card = temp_deck.remove_random_card()
+                    card = temp_deck.remove_random_card(self.__rng)
                     del temp_deck
                 else:
-                    card = self.__dev_deck.remove_random_card()
+                    card = self.__dev_deck.remove_random_card(self.__rng)
                 player.receive_cards(card)
                 self.__dev_cards_bought_this_turn.insert(card)
                 if printout:
                     dprint(f'[APPLY MOVE] player {player} bought dev card, got {card}')
 
-            elif isinstance(move, Moves.BuildMove):
-                if move.builds() == Consts.PurchasableType.CITY:
-                    settlement_node_to_delete = move.at()
-                    del self.board().nodes()[settlement_node_to_delete]
-                    player.remove_settlement(settlement_node_to_delete)
+            elif kind in BUILD_TYPES:
+                builds, at = BUILD_TYPES[kind], action[1]
+                if builds == Consts.PurchasableType.CITY:  # the city replaces the settlement on the board
+                    player.remove_settlement(at)
 
-                buildable_cost = Consts.COSTS.get(move.builds()) if not move.is_free() else Hand.Hand()
+                buildable_cost = Consts.COSTS.get(builds) if not free else Hand.Hand()
                 player.throw_cards(buildable_cost)
                 self.__res_deck.insert(buildable_cost)
 
-                buildable = Buildable.Buildable(player, move.at(), move.builds())
+                buildable = Buildable.Buildable(player, at, builds)
                 player.add_buildable(buildable)
                 self.__board.build(buildable)
                 if printout:
-                    dprint(f'[APPLY MOVE] player {player} built {move.builds()} at {move.at()}')
+                    dprint(f'[APPLY MOVE] player {player} built {builds} at {at}')
 
                 # update longest road player
                 if buildable.type() == Consts.PurchasableType.ROAD:
@@ -589,25 +830,27 @@ class GameSession:
                     elif new_road_len >= Consts.MIN_LONGEST_ROAD_SIZE:
                         player.set_longest_road(True)
 
-                last_p_coeff = self.__prob_turn_history[player][-1][0]
+                prob_turn_history = self.__state.prob_turn_history[player.turn_idx()]
+                last_p_coeff = prob_turn_history[-1][0]
                 curr_p_coeff = self.board().probability_score(player, exclude_robber=True)
                 if curr_p_coeff != last_p_coeff:
-                    self.__prob_turn_history[player].append((curr_p_coeff, self.num_turns_played()))
+                    self.__state.record(prob_turn_history)
+                    prob_turn_history.append((curr_p_coeff, self.num_turns_played()))
 
-            elif isinstance(move, Moves.UseDevMove):
-                dev_used = move.uses()
-                if isinstance(move, Moves.UseKnightDevMove) and move.robber_activated():
+            elif kind in DEV_TYPES:
+                dev_used = DEV_TYPES[kind]
+                if kind is ActionSpace.ActionKind.KNIGHT and robber:
                     pass
                 else:
-                    if self.__dev_used_this_turn:
+                    if self.__state.dev_used_this_turn:
                         print('ERROR, used dev more than once in a turn')
                         exit()
                     player.use_dev(dev_used)  # remove the card
-                    self.__dev_used_this_turn = True
+                    self.__state.dev_used_this_turn = True
                 if printout:
                     dprint(f'[APPLY MOVE] player {player} used {dev_used} dev card')
 
-                if isinstance(move, Moves.UseKnightDevMove):
+                if kind is ActionSpace.ActionKind.KNIGHT:
                     # update largest army
                     new_army_size = player.army_size()
                     largest_army_player = self.largest_army_player()
@@ -620,13 +863,13 @@ class GameSession:
                     elif new_army_size >= Consts.MIN_LARGEST_ARMY_SIZE:
                         player.set_largest_army(True)
 
-                    hex_id = move.hex_id()
-                    opp = move.take_from()
+                    hex_id = action[1]
+                    opp = self.__victim(action[2])
                     self.__robber_protocol(player, hex_id, opp, printout=printout)
 
-                elif isinstance(move, Moves.UseMonopolyDevMove):
+                elif kind is ActionSpace.ActionKind.MONOPOLY:
                     hand_gained = Hand.Hand()
-                    resource_type = move.resource()
+                    resource_type = action[1]
                     if printout:
                         dprint(f'[APPLY MOVE] player {player} chose {resource_type} as monopoly resource')
 
@@ -641,14 +884,13 @@ class GameSession:
                     if printout:
                         dprint(f'[APPLY MOVE] player {player} gained {hand_gained.size()} {resource_type}')
 
-                elif isinstance(move, Moves.UseRoadBuildingDevMove):
+                elif kind is ActionSpace.ActionKind.ROAD_BUILDING:
                     for _ in range(Consts.ROAD_BUILDING_NUM_ROADS):
-                        self.__possible_moves_this_phase = self.__get_possible_build_road_moves(player, free=True)
-                        possible_road_moves = self.__possible_moves_this_phase
+                        possible_road_moves = self.__offer(self.__get_possible_build_road_moves(player, free=True))
                         if not possible_road_moves:
                             break
 
-                        road_move = player.choose(possible_road_moves, deepcopy(self))
+                        road_move = self.__choose(player, possible_road_moves)
 
                         assert isinstance(road_move, Moves.BuildMove)
                         road = Buildable.Buildable(player, road_move.at(), Consts.PurchasableType.ROAD)
@@ -668,19 +910,20 @@ class GameSession:
                         elif new_road_len >= Consts.MIN_LONGEST_ROAD_SIZE:
                             player.set_longest_road(True)
 
-                elif isinstance(move, Moves.UseYopDevMove):
-                    resources = move.resources()
+                elif kind is ActionSpace.ActionKind.YEAR_OF_PLENTY:
+                    resources = YOP_HANDS[action[1]]
                     self.__res_deck.remove(resources)
                     player.receive_cards(resources)
                     if printout:
                         dprint(f'[APPLY MOVE] player {player} chose {resources} as YOP resources')
 
-            elif isinstance(move, Moves.TradeMove):
-                cards_received = move.gets()
+            elif kind is ActionSpace.ActionKind.TRADE:
+                _, ratio, gives, gets = action
+                cards_received = TRADE_HANDS[gets, 1]
                 player.receive_cards(cards_received)
                 self.__res_deck.remove(cards_received)
 
-                cards_given = move.gives()
+                cards_given = TRADE_HANDS[gives, ratio]
                 player.throw_cards(cards_given)
                 self.__res_deck.insert(cards_given)
 
@@ -688,7 +931,7 @@ class GameSession:
                     dprint(f'[APPLY MOVE] player {player} traded {cards_given} for {cards_received}')
 
         except ValueError as e:
-            dprint(f'player {player} tried to do move {move.get_type().name}, got error: \n{e}')
+            dprint(f'player {player} tried to do move {kind.name}, got error: \n{e}')
             # if DEBUG:
             exit()
             # self.__restore(saved_state)
@@ -701,6 +944,13 @@ class GameSession:
         retval = players_hand.contains(item_cost)
         return retval
 
+    def __can_use_dev(self, player: Player.Player, dev_type: Consts.DevType) -> bool:
+        """:returns whether the player has a dev card of the type that was not bought this turn"""
+        # if has it, and if wasnt bought this turn or had at least 1 more from before this turn
+        return dev_type in player.dev_hand() and (dev_type not in self.__dev_cards_bought_this_turn or
+                                                  player.dev_hand().count(dev_type) >
+                                                  self.__dev_cards_bought_this_turn.count(dev_type))
+
     @staticmethod
     def __has_remaining_settlements(player: Player.Player) -> bool:
         return player.num_settlements() < Consts.MAX_SETTLEMENTS_PER_PLAYER
@@ -719,213 +969,300 @@ class GameSession:
 
     @staticmethod
     def __homogeneous_hands_of_size(player: Player.Player, sz: int) -> List[Hand.Hand]:
-        hands = []
         players_hand = player.resource_hand()
-        for resource in Consts.ResourceType:
-            homogeneous_hand = Hand.Hand(*(resource for _ in range(sz)))
-            if players_hand.contains(homogeneous_hand):
-                hands.append(homogeneous_hand)
-        return hands
+        return [TRADE_HANDS[resource, sz] for resource in Consts.YIELDING_RESOURCES if players_hand.count(resource) >= sz]
 
-    @staticmethod
-    def __get_possible_throw_moves(player: Player.Player) -> List[Moves.ThrowMove]:
-        players_cards = list(set([card for card in player.resource_hand() if card in Consts.YIELDING_RESOURCES]))
-        throw_moves = [Moves.ThrowMove(player, Hand.Hand(card)) for card in players_cards]
-        return throw_moves
+    def __get_possible_throw_moves(self, player: Player.Player) -> List[Moves.ThrowMove]:
+        players_hand = player.resource_hand()
+        return [self.__move(Moves.ThrowMove, player, TRADE_HANDS[resource, 1])
+                for resource in Consts.YIELDING_RESOURCES if players_hand.count(resource)]
 
     def __get_possible_knight_moves(self, player: Player.Player, robber: bool = False) -> List[Moves.UseKnightDevMove]:
         moves = []
         dev_type = Consts.DevType.KNIGHT
-        if robber or player.dev_hand().contains(Hand.Hand(dev_type)):  # if has it
-            # if wasnt bought this turn or had at least 1 more from before this turn
-            if robber or (dev_type not in self.__dev_cards_bought_this_turn or
-                          player.dev_hand().cards_of_type(dev_type).size() >
-                          self.__dev_cards_bought_this_turn.cards_of_type(dev_type).size()):
-                robber_hex = self.board().robber_hex()
-                for hex_tile in self.board().hexes():  # get hex, cant place at same place or back at desert
-                    if hex_tile is not robber_hex and hex_tile.resource() != Consts.ResourceType.DESERT:
-                        opponents_on_hex = []  # finding opponents with buildables around hex
-                        for node in hex_tile.nodes():  # get node around hex that is occupied
-                            if self.board().nodes().get(node) is not None:
-                                opp = self.board().nodes().get(node).player()
-                                if opp != player and opp not in opponents_on_hex:  # if its not occupied by you...
-                                    opponents_on_hex.append(opp)  # then its an opponent
-                        if opponents_on_hex:
-                            for opp in opponents_on_hex:
-                                moves.append(
-                                    Moves.UseKnightDevMove(player, hex_tile.id(), opp, robber_activated=robber))
-                        else:  # no opponents, make move without opp id
-                            moves.append(Moves.UseKnightDevMove(player, hex_tile.id(), None, robber_activated=robber))
+        if robber or self.__can_use_dev(player, dev_type):
+            moves = self.__knight_moves(player, robber)
+        return self.__pruned(moves, player)
+
+    def __move(self, move_class: type, player: Player.Player, *params) -> Moves.Move:
+        """
+        :returns the move move_class(player, *params), made once per game (every clone makes its own moves, so
+        that their players are the clone's players). moves are immutable, so every move list of the game is built
+        of the same move objects, interned by the class, player id and parameters given (which must be hashable,
+        e.g. frozen hands)
+        """
+        key = (move_class, player.get_id()) + params
+        move = self.__moves.get(key)
+        if move is None:
+            move = self.__moves[key] = move_class(player, *params)
+        return move
+
+    def __victim(self, victim_idx: Union[int, None]) -> Union[Player.Player, None]:
+        """:returns the player of the given turn index (None for no player)"""
+        return None if victim_idx is None else self.__turn_order[victim_idx]
+
+    def __legal_action_ids(self) -> List[int]:
+        """:returns the action ids of the moves possible to play now (unpruned), made straight from the state's
+        frontiers and card counts, as __phase_moves would generate them"""
+        state = self.__state
+        phase = state.phase
+        curr_player = self.current_player()
+        if phase == GamePhase.MAKE_MOVE:
+            return self.__main_action_ids(curr_player)
+        if phase == GamePhase.ROBBER_THROW:
+            counts = state.res_hands[state.throw_player]
+            return [ActionSpace.THROW_ACTIONS[r_idx] for r_idx, slot in enumerate(RESOURCE_SLOTS) if counts[slot]]
+        if phase == GamePhase.ROBBER_PLACE:
+            return self.__knight_action_ids(curr_player)
+        if phase == GamePhase.PRE_GAME_SETTLEMENT:
+            offset = ActionSpace.OFFSETS[ActionSpace.ActionKind.SETTLEMENT]
+            return [offset + node for node in Topology.bits(Topology.ALL_NODES_MASK & ~state.blocked_nodes)]
+        if phase == GamePhase.PRE_GAME_ROAD:
+            offset = ActionSpace.OFFSETS[ActionSpace.ActionKind.ROAD]
+            return [offset + edge for edge in Topology.NODE_EDGES[Topology.NODE_IDX[state.pre_game_settlement_node]]]
+        return []
+
+    def __main_action_ids(self, player: Player.Player) -> List[int]:
+        """:returns the action ids of the player's main phase moves, see __get_possible_moves"""
+        state = self.__state
+        p_idx = player.turn_idx()
+        action_ids = [ActionSpace.PASS_ACTION]
+
+        # BUY #
+        if self.__can_purchase(player, Consts.PurchasableType.DEV_CARD) and self.__dev_deck.size() > 0:
+            action_ids.append(ActionSpace.BUY_DEV_ACTION)
+
+        # USE #
+        deck = state.res_deck
+        available = [r_idx for r_idx, slot in enumerate(RESOURCE_SLOTS) if deck[slot]]
+        if not state.dev_used_this_turn:
+            if self.__can_use_dev(player, Consts.DevType.KNIGHT):
+                action_ids.extend(self.__knight_action_ids(player))
+            if self.__can_use_dev(player, Consts.DevType.MONOPOLY):
+                action_ids.extend(ActionSpace.MONOPOLY_ACTIONS)
+            if self.__can_use_dev(player, Consts.DevType.YEAR_OF_PLENTY):
+                resources = [Consts.YIELDING_RESOURCES[r_idx] for r_idx in available]
+                action_ids.extend(ActionSpace.YOP_ACTIONS[pair]
+                                  for pair in combinations(resources, Consts.YOP_NUM_RESOURCES))
+            if self.__can_use_dev(player, Consts.DevType.ROAD_BUILDING):
+                action_ids.append(ActionSpace.ROAD_BUILDING_ACTION)
+
+        # BUILD #
+        if (self.__can_purchase(player, Consts.PurchasableType.SETTLEMENT) and
+                self.__has_remaining_settlements(player)):
+            offset = ActionSpace.OFFSETS[ActionSpace.ActionKind.SETTLEMENT]
+            action_ids.extend(offset + node for node in Topology.bits(state.road_nodes[p_idx] & ~state.blocked_nodes))
+        if self.__can_purchase(player, Consts.PurchasableType.CITY) and self.__has_remaining_cities(player):
+            offset = ActionSpace.OFFSETS[ActionSpace.ActionKind.CITY]
+            action_ids.extend(offset + Topology.NODE_IDX[node] for node in player.settlement_nodes())
+        if self.__can_purchase(player, Consts.PurchasableType.ROAD) and self.__has_remaining_roads(player):
+            offset = ActionSpace.OFFSETS[ActionSpace.ActionKind.ROAD]
+            action_ids.extend(offset + edge for edge in Topology.bits(state.road_frontier[p_idx]))
+
+        # TRADE #
+        counts = state.res_hands[p_idx]
+        deck_trades = ActionSpace.TRADE_ACTIONS[Consts.DECK_TRADE_RATIO]
+        for gives_idx, slot in enumerate(RESOURCE_SLOTS):
+            if counts[slot] >= Consts.DECK_TRADE_RATIO:
+                action_ids.extend(deck_trades[gives_idx][gets_idx] for gets_idx in available if gets_idx != gives_idx)
+        harbor_resources = player.harbor_resources()
+        if Consts.ResourceType.ANY in harbor_resources:
+            general_trades = ActionSpace.TRADE_ACTIONS[Consts.GENERAL_HARBOR_TRADE_RATIO]
+            for gives_idx, slot in enumerate(RESOURCE_SLOTS):
+                if counts[slot] >= Consts.GENERAL_HARBOR_TRADE_RATIO:
+                    action_ids.extend(general_trades[gives_idx][gets_idx] for gets_idx in available)
+        resource_trades = ActionSpace.TRADE_ACTIONS[Consts.RESOURCE_HARBOR_TRADE_RATIO]
+        for resource in harbor_resources:
+            gives_idx = ActionSpace.RESOURCE_IDX.get(resource)
+            if gives_idx is not None and counts[RESOURCE_SLOTS[gives_idx]] >= Consts.RESOURCE_HARBOR_TRADE_RATIO:
+                action_ids.extend(resource_trades[gives_idx][gets_idx] for gets_idx in available)
+        return action_ids
+
+    def __knight_action_ids(self, player: Player.Player) -> List[int]:
+        """:returns the action ids of the player's knight moves, see __knight_moves"""
+        action_ids = []
+        not_player = ~(1 << player.turn_idx())
+        for hex_tile in self.board().hexes():
+            hex_id = hex_tile.id()
+            if hex_id != self.__state.robber_hex and hex_tile.resource() != Consts.ResourceType.DESERT:
+                hex_actions = ActionSpace.KNIGHT_ACTIONS[hex_id]  # by victim turn index + 1
+                opponents_on_hex = self.__state.hex_owners[hex_id] & not_player
+                if opponents_on_hex:
+                    action_ids.extend(hex_actions[opp_idx + 1] for opp_idx in Topology.bits(opponents_on_hex))
+                else:
+                    action_ids.append(hex_actions[0])
+        return action_ids
+
+    def __pruned(self, moves: List[Moves.Move], player: Player.Player) -> List[Moves.Move]:
+        """:returns the generated moves of the player, without the ones the game's pruner (if any) removes"""
+        if self.__pruner is None:
+            return moves
+        return self.__pruner.prune(moves, self, player)
+
+    def __knight_moves(self, player: Player.Player, robber: bool = False) -> List[Moves.UseKnightDevMove]:
+        """:returns a knight move per hex the robber can move to and opponent to take from there (if any)"""
+        moves = []
+        not_player = ~(1 << player.turn_idx())
+        for hex_tile in self.board().hexes():  # get hex, cant place at same place or back at desert
+            hex_id = hex_tile.id()
+            if hex_id != self.__state.robber_hex and hex_tile.resource() != Consts.ResourceType.DESERT:
+                opponents_on_hex = self.__state.hex_owners[hex_id] & not_player
+                if opponents_on_hex:
+                    for opp_idx in Topology.bits(opponents_on_hex):
+                        moves.append(self.__move(Moves.UseKnightDevMove, player, hex_id,
+                                                 self.__turn_order[opp_idx], robber))
+                else:  # no opponents, make move without opp id
+                    moves.append(self.__move(Moves.UseKnightDevMove, player, hex_id, None, robber))
         return moves
 
     def __get_possible_build_road_moves(self, player: Player.Player, free: bool = False) -> List[Moves.BuildMove]:
         moves = []
         if self.__has_remaining_roads(player):
-            moves = [Moves.BuildMove(player, Consts.PurchasableType.ROAD, edge, free=free)
+            moves = [self.__move(Moves.BuildMove, player, Consts.PurchasableType.ROAD, edge, free)
                      for edge in self.__buildable_edges(player)]
         return moves
 
     def __get_possible_build_settlement_moves(self, player: Player.Player,
                                               pre_game: bool = False) -> List[Moves.BuildMove]:
-        moves = [Moves.BuildMove(player, Consts.PurchasableType.SETTLEMENT, node, free=pre_game)
+        moves = [self.__move(Moves.BuildMove, player, Consts.PurchasableType.SETTLEMENT, node, pre_game)
                  for node in self.__buildable_nodes(player, pre_game)]
         return moves
 
     def __get_possible_moves(self, player: Player.Player) -> List[Moves.Move]:
 
         # PASS TURN #
-        moves = [Moves.Move(player, Moves.MoveType.PASS)]
+        moves = [self.__move(Moves.Move, player, Moves.MoveType.PASS)]
 
         # BUY #
         # Buy Dev Move Legality
         if (self.__can_purchase(player, Consts.PurchasableType.DEV_CARD) and
                 self.__dev_deck.size() > 0):
-            moves.append(Moves.BuyDevMove(player))
+            moves.append(self.__move(Moves.BuyDevMove, player))
 
         # USE #
         # Use Dev Card Legality
-        if not self.__dev_used_this_turn:
+        if not self.__state.dev_used_this_turn:
             for dev_type in Consts.DevType:  # get dev card type
                 if dev_type == Consts.DevType.VP:   # not usable
                     continue
-                if player.dev_hand().contains(Hand.Hand(dev_type)):  # if has it
-                    # if wasnt bought this turn or had at least 1 more from before this turn
-                    if (dev_type not in self.__dev_cards_bought_this_turn or
-                            player.dev_hand().cards_of_type(dev_type).size() >
-                            self.__dev_cards_bought_this_turn.cards_of_type(dev_type).size()):
-                        if dev_type == Consts.DevType.MONOPOLY:
-                            for resource in Consts.YIELDING_RESOURCES:
-                                moves.append(Moves.UseMonopolyDevMove(player, resource))
-                        elif dev_type == Consts.DevType.YEAR_OF_PLENTY:
-                            for resource_comb in combinations(Consts.YIELDING_RESOURCES, Consts.YOP_NUM_RESOURCES):
-                                moves.append(Moves.UseYopDevMove(player, *resource_comb))
-                        elif dev_type == Consts.DevType.ROAD_BUILDING:
-                            moves.append(Moves.UseRoadBuildingDevMove(player))
-                        elif dev_type == Consts.DevType.KNIGHT:
-                            robber_hex = self.board().robber_hex()
-                            for hex_tile in self.board().hexes():
-                                if hex_tile is not robber_hex and hex_tile.resource() != Consts.ResourceType.DESERT:
-                                    opponents_on_hex = set()
-                                    for node in hex_tile.nodes():
-                                        if self.board().nodes().get(node) is not None:
-                                            opp = self.board().nodes().get(node).player()
-                                            if opp != player:
-                                                opponents_on_hex.add(opp)
-                                    if opponents_on_hex:
-                                        for opp in opponents_on_hex:
-                                            moves.append(Moves.UseKnightDevMove(player, hex_tile.id(), opp))
-                                    else:
-                                        moves.append(Moves.UseKnightDevMove(player, hex_tile.id(), None))
-
-                        elif dev_type == Consts.DevType.VP:
-                            moves.append(Moves.UseDevMove(player, dev_type))
+                if self.__can_use_dev(player, dev_type):
+                    if dev_type == Consts.DevType.MONOPOLY:
+                        for resource in Consts.YIELDING_RESOURCES:
+                            moves.append(self.__move(Moves.UseMonopolyDevMove, player, resource))
+                    elif dev_type == Consts.DevType.YEAR_OF_PLENTY:
+                        for resource_comb in combinations(self.__available_resources(), Consts.YOP_NUM_RESOURCES):
+                            moves.append(self.__move(Moves.UseYopDevMove, player, *resource_comb))
+                    elif dev_type == Consts.DevType.ROAD_BUILDING:
+                        moves.append(self.__move(Moves.UseRoadBuildingDevMove, player))
+                    elif dev_type == Consts.DevType.KNIGHT:
+                        moves.extend(self.__knight_moves(player))
+
+                    elif dev_type == Consts.DevType.VP:
+                        moves.append(self.__move(Moves.UseDevMove, player, dev_type))
 
         # BUILD #
         # Build settlement legality
         if (self.__can_purchase(player, Consts.PurchasableType.SETTLEMENT) and
                 self.__has_remaining_settlements(player)):
             for node in self.__buildable_nodes(player):
-                moves.append(Moves.BuildMove(player, Consts.PurchasableType.SETTLEMENT, node))
+                moves.append(self.__move(Moves.BuildMove, player, Consts.PurchasableType.SETTLEMENT, node, False))
 
         # build city legality
         if (self.__can_purchase(player, Consts.PurchasableType.CITY) and
                 self.__has_remaining_cities(player)):
             for settlement_node in player.settlement_nodes():
-                moves.append(Moves.BuildMove(player, Consts.PurchasableType.CITY, settlement_node))
+                moves.append(self.__move(Moves.BuildMove, player, Consts.PurchasableType.CITY, settlement_node, False))
 
         # build road legality
         if (self.__can_purchase(player, Consts.PurchasableType.ROAD) and
                 self.__has_remaining_roads(player)):
             for edge_id in self.__buildable_edges(player):
-                moves.append(Moves.BuildMove(player, Consts.PurchasableType.ROAD, edge_id))
+                moves.append(self.__move(Moves.BuildMove, player, Consts.PurchasableType.ROAD, edge_id, False))
 
         # TRADE #
+        available_resources = self.__available_resources()
         # trade legality with deck
         for homogeneous_hand in self.__homogeneous_hands_of_size(player, Consts.DECK_TRADE_RATIO):
-            for available_resource in self.__available_resources():
-                if [card for card in homogeneous_hand][0] != available_resource:
-                    moves.append(Moves.TradeMove(player, homogeneous_hand, Hand.Hand(available_resource)))
+            for available_resource in available_resources:
+                if available_resource not in homogeneous_hand:
+                    moves.append(self.__move(Moves.TradeMove, player, homogeneous_hand,
+                                             TRADE_HANDS[available_resource, 1]))
 
         # trade legality with general harbor
         if self.__has_general_harbor(player):
             for homogeneous_hand in self.__homogeneous_hands_of_size(player, Consts.GENERAL_HARBOR_TRADE_RATIO):
-                for available_resource in self.__available_resources():
-                    moves.append(Moves.TradeMove(player, homogeneous_hand, Hand.Hand(available_resource)))
+                for available_resource in available_resources:
+                    moves.append(self.__move(Moves.TradeMove, player, homogeneous_hand,
+                                             TRADE_HANDS[available_resource, 1]))
 
         # trade legality with resource harbor
         for resource in player.harbor_resources():
-            cards_out = Hand.Hand(*[resource for _ in range(Consts.RESOURCE_HARBOR_TRADE_RATIO)])
-            if player.resource_hand().contains(cards_out):
-                for available_resource in self.__available_resources():
-                    moves.append(Moves.TradeMove(player, cards_out, Hand.Hand(available_resource)))
+            if resource in Consts.YIELDING_RESOURCES and \
+                    player.resource_hand().count(resource) >= Consts.RESOURCE_HARBOR_TRADE_RATIO:
+                cards_out = TRADE_HANDS[resource, Consts.RESOURCE_HARBOR_TRADE_RATIO]
+                for available_resource in available_resources:
+                    moves.append(self.__move(Moves.TradeMove, player, cards_out, TRADE_HANDS[available_resource, 1]))
 
-        return moves
+        return self.__pruned(moves, player)
 
     def __buildable_nodes(self, player: Player.Player, pre_game: bool = False) -> List[int]:
-        player_nodes = set()
-        if pre_game:
-            return [node for node in hexgrid.legal_node_coords() if self.__is_distant_node(node)]
-        else:
-            for edge_id in player.road_edges():
-                for node in hexgrid.nodes_touching_edge(edge_id):
-                    if self.board().nodes().get(node) is None:
-                        player_nodes.add(node)
-            return [node for node in player_nodes if self.__is_distant_node(node)]
+        candidates = Topology.ALL_NODES_MASK if pre_game else self.__state.road_nodes[player.turn_idx()]
+        return [Topology.NODE_COORDS[node] for node in Topology.bits(candidates & ~self.__state.blocked_nodes)]
 
     def __buildable_edges(self, player: Player.Player) -> List[int]:
-        player_nodes = set()
-        for road_edge in player.road_edges():
-            for node in hexgrid.nodes_touching_edge(road_edge):
-                player_nodes.add(node)
-
-        adj_edges = set()
-        for node in player_nodes:
-            for edge_id in self.board().get_adj_edges_to_node(node):
-                adj_edges.add(edge_id)
-
-        for existing_edge in player.road_edges():
-            if existing_edge in adj_edges:
-                adj_edges.remove(existing_edge)
-
-        to_remove = []
-        for edge in adj_edges:
-            if edge not in hexgrid.legal_edge_coords() or self.board().edges().get(edge) is not None:
-                to_remove.append(edge)
+        return [Topology.EDGE_COORDS[edge] for edge in Topology.bits(self.__state.road_frontier[player.turn_idx()])]
 
-        for edge in to_remove:
-            adj_edges.remove(edge)
-
-        return list(adj_edges)
-
-    def __is_distant_node(self, node_id: int) -> bool:
-        adj_nodes = self.__board.get_adj_nodes_to_node(node_id) + [node_id]
-        return all(self.__board.nodes().get(adj) is None for adj in adj_nodes)
+    def __is_distant_node(self, node: int) -> bool:
+        """:param node: compact node index (see Topology)"""
+        return not (self.__state.blocked_nodes >> node) & 1
 
     def __available_resources(self) -> List[Consts.ResourceType]:
-        available = []
-        for resource in Consts.ResourceType:
-            if self.__res_deck.contains(Hand.Hand(resource)):
-                available.append(resource)
-        return available
+        return [resource for resource in Consts.YIELDING_RESOURCES if resource in self.__res_deck]
 
     def __update_vp_histories(self) -> None:
         for p in self.players():
-            self.__player_vp_histories[str(p)].append(p.vp())
+            self.__state.vp_histories[p.turn_idx()].append(p.vp())
 
     # simulation helpers #
-    def __start_sim(self) -> List[Moves.BuildMove]:
-        _round = self.__pre_game_round
-        curr_player = self.__curr_player_sim
-        self.__phase = GamePhase.PRE_GAME_SETTLEMENT
-        self.__possible_moves_this_phase = self.__get_possible_build_settlement_moves(curr_player, pre_game=True)
-        return self.__possible_moves_this_phase
-
-    def __pre_game_settlement_sim(self, move_to_play: Moves.BuildMove) -> List[Moves.Move]:
+    def __offer(self, moves: Union[List[Moves.Move], None]) -> Union[List[Moves.Move], None]:
+        """makes moves the possible moves of the decision at hand (None to generate them on demand, see
+        possible_moves), dropping the legal action mask of the previous one
+        :returns moves"""
+        state = self.__state
+        state.possible_moves = moves
+        if state.legal_mask is not None:
+            state.legal_mask = None
+        return moves
+
+    def __phase_moves(self) -> List[Moves.Move]:
+        """:returns the moves possible to play in the current phase of a simulation"""
+        phase = self.__state.phase
+        curr_player = self.current_player()
+        if phase == GamePhase.MAKE_MOVE:
+            moves_available = self.__get_possible_moves(curr_player)
+            if DEBUG:
+                dprint(f'[RUN GAME] player {curr_player} can play:\n')
+                dprint('\n'.join(m.info() for m in moves_available) + '\n')
+            return moves_available
+        if phase == GamePhase.ROBBER_THROW:
+            return self.__get_possible_throw_moves(self.__throw_player())
+        if phase == GamePhase.ROBBER_PLACE:
+            return self.__get_possible_knight_moves(curr_player, robber=True)
+        if phase == GamePhase.PRE_GAME_SETTLEMENT:
+            return self.__get_possible_build_settlement_moves(curr_player, pre_game=True)
+        if phase == GamePhase.PRE_GAME_ROAD:
+            adj_edges = self.board().get_adj_edges_to_node(self.__state.pre_game_settlement_node)
+            return [self.__move(Moves.BuildMove, curr_player, Consts.PurchasableType.ROAD, edge, True)
+                    for edge in adj_edges]
+        return []
+
+    def __start_sim(self) -> None:
+        self.__state.phase = GamePhase.PRE_GAME_SETTLEMENT
+
+    def __pre_game_settlement_sim(self, settlement_node: int) -> None:
         # add new settlement to game
-        curr_player = self.__curr_player_sim
-        build_settlement_move = move_to_play
-        settlement_node = build_settlement_move.at()
-        self.__pre_game_settlement_node = settlement_node
+        curr_player = self.current_player()
+        self.__state.pre_game_settlement_node = settlement_node
         settlement = Buildable.Buildable(curr_player, settlement_node, Consts.PurchasableType.SETTLEMENT)
         curr_player.add_buildable(settlement)
         self.__board.build(settlement)
@@ -933,21 +1270,14 @@ class GameSession:
         dprint(self.board())
 
         # get player's choice of road
-        self.__phase = GamePhase.PRE_GAME_ROAD
-        adj_edges = self.board().get_adj_edges_to_node(build_settlement_move.at())
-        possible_road_moves = [Moves.BuildMove(curr_player, Consts.PurchasableType.ROAD, edge, free=True)
-                               for edge in adj_edges]
-        self.__possible_moves_this_phase = possible_road_moves
-        return self.__possible_moves_this_phase
-
-    def __pre_game_road_sim(self, move_to_play: Moves.BuildMove) -> List[Moves.Move]:
-        build_adj_road_move = move_to_play
-        curr_player = self.__curr_player_sim
-        _round = self.__pre_game_round
-        settlement_node = self.__pre_game_settlement_node
+        self.__state.phase = GamePhase.PRE_GAME_ROAD
+
+    def __pre_game_road_sim(self, road_edge: int) -> None:
+        curr_player = self.current_player()
+        _round = self.__state.pre_game_round
+        settlement_node = self.__state.pre_game_settlement_node
 
         # add new road to game
-        road_edge = build_adj_road_move.at()
         road = Buildable.Buildable(curr_player, road_edge, Consts.PurchasableType.ROAD)
         curr_player.add_buildable(road)
         self.__board.build(road)
@@ -961,131 +1291,103 @@ class GameSession:
         if _round == 1:
             next_player_idx = (self.players().index(curr_player) + 1) % len(self.players())
             if next_player_idx == 0:  # round ended
-                self.__pre_game_round = 2
-                self.__curr_player_sim = self.players()[-1]
+                self.__state.pre_game_round = 2
+                self.__state.curr_player = len(self.players()) - 1
             else:
-                self.__curr_player_sim = self.players()[next_player_idx]
+                self.__state.curr_player = next_player_idx
         else:  # round 2
             next_player_idx = (self.players().index(curr_player) - 1) % len(self.players())
             if next_player_idx == len(self.players()) - 1:  # 2nd round ended
-                self.__curr_player_sim = self.players()[0]
+                self.__state.curr_player = 0
                 # start main game
-                return self.__main_game_sim()
+                self.__main_game_sim()
+                return
             else:
-                self.__curr_player_sim = self.players()[next_player_idx]
+                self.__state.curr_player = next_player_idx
 
-        self.__phase = GamePhase.PRE_GAME_SETTLEMENT
-        settlement_moves = self.__get_possible_build_settlement_moves(self.__curr_player_sim, pre_game=True)
-        self.__possible_moves_this_phase = settlement_moves
-        return self.__possible_moves_this_phase
+        self.__state.phase = GamePhase.PRE_GAME_SETTLEMENT
 
-    def __main_game_sim(self) -> List[Moves.Move]:
-        curr_player = self.__curr_player_sim
-        self.__dev_used_this_turn = False
-        self.__dev_cards_bought_this_turn = Hand.Hand()  # to know if player can use a dev card
+    def __main_game_sim(self) -> None:
+        self.__state.dev_used_this_turn = False
+        self.__dev_cards_bought_this_turn.clear()  # to know if player can use a dev card
 
-        self.__dice.roll()
-        dprint('\n\n' + '*' * 100)
-        dprint('*' * 45, 'SIM NEXT TURN', '*' * 44)
-        dprint('*' * 100 + '\n')
-
-        dprint(f'[RUN GAME] Rolling dice... {self.__dice.sum()} rolled')
-        if self.__dice.sum() == Consts.ROBBER_DICE_VALUE:  # robber activated
+        self.__roll_dice()
+        if DEBUG:
+            dprint('\n\n' + '*' * 100)
+            dprint('*' * 45, 'SIM NEXT TURN', '*' * 44)
+            dprint('*' * 100 + '\n')
+            dprint(f'[RUN GAME] Rolling dice... {self.__state.dice_sum} rolled')
+        if self.__state.dice_sum == Consts.ROBBER_DICE_VALUE:  # robber activated
             dprint('[RUN GAME] Robber Activated! Checking for oversized hands...')
 
             # remove cards from oversized hands
-            self.__phase = GamePhase.ROBBER_THROW
+            self.__state.phase = GamePhase.ROBBER_THROW
             for player in self.players():
                 player_hand_size = player.resource_hand_size()
                 if player_hand_size > Consts.MAX_CARDS_IN_HAND:
-                    self.__throw_player = player
-                    self.__throw_player_hand_size = player_hand_size - (player_hand_size // 2)
-                    self.__possible_moves_this_phase = self.__get_possible_throw_moves(player)
-                    return self.__possible_moves_this_phase
+                    self.__state.throw_player = player.turn_idx()
+                    self.__state.throw_player_hand_size = player_hand_size - (player_hand_size // 2)
+                    return
 
         else:  # not robber
             # distribute resources
             dprint(f'[RUN GAME] distributing resources...')
-            dist = self.__board.resource_distributions(self.__dice.sum())
+            dist = self.__board.resource_distributions(self.__state.dice_sum)
             for player, hand in dist.items():
                 removed = self.__res_deck.remove_as_much(hand)
-                player.receive_cards(removed)
-                dprint(f'[RUN GAME] player {player} received {removed}, '
-                       f'now has {player.resource_hand()}')
+                player.resource_hand().insert(removed)
+                if DEBUG:
+                    dprint(f'[RUN GAME] player {player} received {removed}, '
+                           f'now has {player.resource_hand()}')
 
         # query player for move #
-        self.__phase = GamePhase.MAKE_MOVE
-        moves_available = self.__get_possible_moves(curr_player)
-        dprint(f'[RUN GAME] player {curr_player} can play:\n')
-        dprint('\n'.join(m.info() for m in moves_available) + '\n')
-        self.__possible_moves_this_phase = moves_available
-        return self.__possible_moves_this_phase
-
-    def __robber_throw_sim(self, move_to_play: Moves.ThrowMove) -> List[Moves.Move]:
-        player = self.__throw_player
-        throw_move = move_to_play
-
-        cards_thrown = throw_move.throws()
+        self.__state.phase = GamePhase.MAKE_MOVE
+
+    def __robber_throw_sim(self, cards_thrown: Hand.Hand) -> None:
+        player = self.__throw_player()
         player.throw_cards(cards_thrown)
         self.__res_deck.insert(cards_thrown)
-        if player.resource_hand().size() > self.__throw_player_hand_size:
-            self.__possible_moves_this_phase = self.__get_possible_throw_moves(player)
-            return self.__possible_moves_this_phase
+        if player.resource_hand().size() > self.__state.throw_player_hand_size:
+            return
         else:
             next_player_idx = self.players().index(player) + 1
             while next_player_idx < len(self.players()):
                 next_player = self.players()[next_player_idx]
                 next_player_hand_size = next_player.resource_hand().size()
                 if next_player_hand_size > Consts.MAX_CARDS_IN_HAND:
-                    self.__throw_player = next_player
-                    self.__throw_player_hand_size = next_player_hand_size - (next_player_hand_size // 2)
-                    self.__possible_moves_this_phase = self.__get_possible_throw_moves(self.__throw_player)
-                    return self.__possible_moves_this_phase
+                    self.__state.throw_player = next_player.turn_idx()
+                    self.__state.throw_player_hand_size = next_player_hand_size - (next_player_hand_size // 2)
+                    return
                 else:
                     next_player_idx += 1
 
         # move robber
-        self.__phase = GamePhase.ROBBER_PLACE
-        knight_moves = self.__get_possible_knight_moves(self.__curr_player_sim, robber=True)
-        self.__possible_moves_this_phase = knight_moves
-        return self.__possible_moves_this_phase
+        self.__state.phase = GamePhase.ROBBER_PLACE
 
-    def __robber_place_sim(self, move: Moves.UseKnightDevMove) -> List[Moves.Move]:
-        knight_move = move
-        curr_player = self.__curr_player_sim
-
-        robber_hex = knight_move.hex_id()
-        opp = knight_move.take_from()
+    def __robber_place_sim(self, robber_hex: int, opp: Union[Player.Player, None]) -> None:
+        curr_player = self.current_player()
         self.__robber_protocol(curr_player, robber_hex, opp, printout=False)
 
         # query player for move #
-        self.__phase = GamePhase.MAKE_MOVE
-        moves_available = self.__get_possible_moves(curr_player)
-        self.__possible_moves_this_phase = moves_available
-        return self.__possible_moves_this_phase
+        self.__state.phase = GamePhase.MAKE_MOVE
 
-    def __make_move_sim(self, move_to_play: Moves.Move) -> List[Moves.Move]:
-        curr_player = self.__curr_player_sim
+    def __make_move_sim(self, action: tuple, free: bool = False, robber: bool = False) -> None:
+        """:param action: the action to play (see ActionSpace), a free build or a robber placement if flagged"""
+        curr_player = self.current_player()
 
         vp_before = curr_player.vp()
-        self.__apply_move(move_to_play, mock=True)
+        self.__apply_action(curr_player, action, mock=True, free=free, robber=robber)
         vp_after = curr_player.vp()
-        self.__vp_earned_this_phase = vp_after - vp_before
+        self.__state.vp_earned_this_phase = vp_after - vp_before
 
-        if move_to_play.get_type() != Moves.MoveType.PASS:
-            moves_available = self.__get_possible_moves(curr_player)
-            self.__possible_moves_this_phase = moves_available
-            return self.__possible_moves_this_phase
-
-        elif self.is_game_over():
-            self.__phase = GamePhase.GAME_OVER
-            dprint(f'\n\n\nGAME OVER - player {curr_player} won!!!')
-            self.__possible_moves_this_phase = []
-            return self.__possible_moves_this_phase
-        else:  # continue to next player
-            next_player_idx = (self.players().index(curr_player) + 1) % len(self.players())
-            self.__curr_player_sim = self.players()[next_player_idx]
-            return self.__main_game_sim()
+        if action[0] is ActionSpace.ActionKind.PASS:
+            if self.is_game_over():
+                self.__state.phase = GamePhase.GAME_OVER
+                dprint(f'\n\n\nGAME OVER - player {curr_player} won!!!')
+            else:  # continue to next player
+                next_player_idx = (self.players().index(curr_player) + 1) % len(self.players())
+                self.__state.curr_player = next_player_idx
+                self.__main_game_sim()
 
 
 def dprint(*args, **kwargs):
@@ -0,0 +1,229 @@
+from __future__ import annotations
+from array import array
+from collections import Counter
+from random import Random
+import GameConstants as Consts
+import Topology
+
+"""A Module containing the flat, array-backed core of a Catan game's mutable state"""
+
+NO_PLAYER = -1  # owner slot value of an unoccupied node / edge, or of an unheld title
+EMPTY = 0  # node type slot value of an unoccupied node (buildables use their PurchasableType value)
+WHOLE = slice(None)  # journal key that saves / restores a whole buffer
+NUM_DICE_SUMS = 13  # production rows are indexed by the dice sum itself (0..12)
+
+
+def zero_counts() -> array:
+    """:returns a new all-zeros card count vector (see Consts.CARD_INDEX)"""
+    return array('h', [0] * Consts.NUM_CARD_TYPES)
+
+
+# zobrist keys #
+# a random 64 bit key per (slot, value) of every hashed part of the state, the hash of a state is the xor of the keys
+# of its current values. owner and flag slots are indexed by value + 1, so that NO_PLAYER (and no phase) get a key too
+ZOBRIST_SEED = 'catan/zobrist'
+MAX_CARD_COUNT = max(Counter(Consts.RES_DECK + Consts.DEV_DECK).values())  # no hand can hold more of a card type
+NUM_PHASES = 7  # see GameSession.GamePhase
+HASH_MASK = (1 << 64) - 1
+
+
+def _keys(rng: Random, *shape: int) -> list:
+    if len(shape) == 1:
+        return [rng.getrandbits(64) for _ in range(shape[0])]
+    return [_keys(rng, *shape[1:]) for _ in range(shape[0])]
+
+
+_rng = Random(ZOBRIST_SEED)
+NODE_OWNER_KEYS = _keys(_rng, Topology.NUM_NODES, Consts.MAX_PLAYERS + 1)
+NODE_TYPE_KEYS = _keys(_rng, Topology.NUM_NODES, len(Consts.PurchasableType) + 1)
+EDGE_OWNER_KEYS = _keys(_rng, Topology.NUM_EDGES, Consts.MAX_PLAYERS + 1)
+# per card count vector, a key per (card type, count) #
+RES_HAND_KEYS = _keys(_rng, Consts.MAX_PLAYERS, Consts.NUM_CARD_TYPES, MAX_CARD_COUNT + 1)
+DEV_HAND_KEYS = _keys(_rng, Consts.MAX_PLAYERS, Consts.NUM_CARD_TYPES, MAX_CARD_COUNT + 1)
+USED_DEVS_KEYS = _keys(_rng, Consts.MAX_PLAYERS, Consts.NUM_CARD_TYPES, MAX_CARD_COUNT + 1)
+RES_DECK_KEYS = _keys(_rng, Consts.NUM_CARD_TYPES, MAX_CARD_COUNT + 1)
+DEV_DECK_KEYS = _keys(_rng, Consts.NUM_CARD_TYPES, MAX_CARD_COUNT + 1)
+# scalar flags, hashed when set (see GameState.__setattr__) #
+SCALAR_KEYS = {'robber_hex': _keys(_rng, Topology.NUM_TILES + 1),
+               'curr_player': _keys(_rng, Consts.MAX_PLAYERS + 1),
+               'throw_player': _keys(_rng, Consts.MAX_PLAYERS + 1),
+               'longest_road_owner': _keys(_rng, Consts.MAX_PLAYERS + 1),
+               'largest_army_owner': _keys(_rng, Consts.MAX_PLAYERS + 1),
+               'phase': _keys(_rng, NUM_PHASES + 1)}
+del _rng
+
+
+def scalar_slot(value) -> int:
+    """:returns the key index of a hashed scalar flag's value (ints and enums by value, offset by one for None / -1)"""
+    if value is None:
+        return 0
+    return (value if type(value) is int else value.value) + 1
+
+
+class GameState:
+    """
+    Holds all mutable data of a game in flat buffers - board occupancy, hands, dev cards, decks and turn flags.
+    Board, Player and Hand objects are thin views over these buffers, so cloning a game is a handful of
+    buffer copies instead of a deep copy of the whole object graph.
+    Players are referred to by their index in the turn order.
+
+    While undo marks are pushed, every change is recorded in an undo journal of (container, key, old value)
+    entries: scalar flags are recorded automatically when set, buffers are recorded by their writers via record().
+
+    The state keeps a zobrist hash of its position (board occupancy, robber, hands, dev cards, bank, titles, current
+    and throwing player and phase) up to date: scalar flags are hashed when set, board slots by set_edge_owner() /
+    set_node() and card counts by the Hands wrapping them. the hash is itself a scalar flag, so undo restores it
+    """
+
+    def __init__(self, num_players: int):
+        object.__setattr__(self, 'journal', None)
+        self.undo_marks = []
+        self.num_players = num_players
+
+        # board occupancy, by compact node / edge index (see Topology) #
+        self.node_owner = array('b', [NO_PLAYER] * Topology.NUM_NODES)
+        self.node_type = array('b', [EMPTY] * Topology.NUM_NODES)
+        self.edge_owner = array('b', [NO_PLAYER] * Topology.NUM_EDGES)
+        self.robber_hex = 0
+        # production index: per dice sum, a card count vector per player of what that roll yields them.
+        # rows are replaced (never modified in place) when a buildable or the robber changes them
+        self.production = [[zero_counts() for _ in range(num_players)] for _ in range(NUM_DICE_SUMS)]
+        # move generation frontiers, bit masks over compact node / edge indices kept up to date by Board #
+        self.blocked_nodes = 0  # occupied nodes and their neighbours (distance rule)
+        self.road_nodes = [0] * num_players  # nodes touched by each player's roads
+        self.road_frontier = [0] * num_players  # free edges touching each player's roads
+        self.hex_owners = [0] * Topology.NUM_TILES  # per hex, bit mask of players with a buildable around it
+
+        # players #
+        self.res_hands = [zero_counts() for _ in range(num_players)]
+        self.dev_hands = [zero_counts() for _ in range(num_players)]
+        self.used_devs = [zero_counts() for _ in range(num_players)]
+        self.settlements = [[] for _ in range(num_players)]
+        self.cities = [[] for _ in range(num_players)]
+        self.roads = [[] for _ in range(num_players)]
+        self.road_lengths = array('b', [0] * num_players)  # longest road of each player, kept up to date by Board
+        self.longest_road_owner = NO_PLAYER
+        self.largest_army_owner = NO_PLAYER
+
+        # decks #
+        self.res_deck = zero_counts()
+        self.dev_deck = zero_counts()
+        self.devs_bought_this_turn = zero_counts()
+
+        # turn & phase flags #
+        self.phase = None
+        self.curr_turn_idx = 0
+        self.num_turns_played = 0
+        self.curr_player = 0
+        self.pre_game_round = 1
+        self.pre_game_settlement_node = None
+        self.throw_player = NO_PLAYER
+        self.throw_player_hand_size = None
+        self.vp_earned_this_phase = 0
+        self.dev_used_this_turn = False
+        self.dice_sum = 0
+        self.possible_moves = []  # None until generated on demand, see GameSession.possible_moves
+        self.legal_mask = None  # the legal action mask of the possible moves, made on demand
+
+        # game statistics #
+        self.yields = array('i', [0] * num_players)
+        self.prob_turn_history = [[(0, 0)] for _ in range(num_players)]
+        self.vp_histories = [[] for _ in range(num_players)]
+
+        self.zobrist = self.compute_hash()  # from here on, changes update the hash incrementally
+
+    def copy(self) -> GameState:
+        """:returns an independent copy of this state, scalar flags are shared as they are immutable"""
+        clone = GameState.__new__(GameState)
+        clone.__dict__.update(self.__dict__)
+        clone.__dict__['journal'] = None
+        clone.__dict__['undo_marks'] = []
+        clone.node_owner = self.node_owner[:]
+        clone.node_type = self.node_type[:]
+        clone.edge_owner = self.edge_owner[:]
+        clone.production = self.production[:]
+        clone.road_nodes = self.road_nodes[:]
+        clone.road_frontier = self.road_frontier[:]
+        clone.hex_owners = self.hex_owners[:]
+        clone.res_hands = [hand[:] for hand in self.res_hands]
+        clone.dev_hands = [hand[:] for hand in self.dev_hands]
+        clone.used_devs = [hand[:] for hand in self.used_devs]
+        clone.settlements = [nodes[:] for nodes in self.settlements]
+        clone.cities = [nodes[:] for nodes in self.cities]
+        clone.roads = [edges[:] for edges in self.roads]
+        clone.road_lengths = self.road_lengths[:]
+        clone.res_deck = self.res_deck[:]
+        clone.dev_deck = self.dev_deck[:]
+        clone.devs_bought_this_turn = self.devs_bought_this_turn[:]
+        clone.yields = self.yields[:]
+        clone.prob_turn_history = [hist[:] for hist in self.prob_turn_history]
+        clone.vp_histories = [hist[:] for hist in self.vp_histories]
+        return clone
+
+    def compute_hash(self) -> int:
+        """:returns the zobrist hash of the position, computed from scratch. turn counters and game statistics are
+        left out, so states reached through different move orders hash the same"""
+        h = 0
+        for idx in range(Topology.NUM_NODES):
+            h ^= NODE_OWNER_KEYS[idx][self.node_owner[idx] + 1] ^ NODE_TYPE_KEYS[idx][self.node_type[idx]]
+        for idx in range(Topology.NUM_EDGES):
+            h ^= EDGE_OWNER_KEYS[idx][self.edge_owner[idx] + 1]
+        hashed_counts = [(self.res_deck, RES_DECK_KEYS), (self.dev_deck, DEV_DECK_KEYS)]
+        for p_idx in range(self.num_players):
+            hashed_counts += [(self.res_hands[p_idx], RES_HAND_KEYS[p_idx]),
+                              (self.dev_hands[p_idx], DEV_HAND_KEYS[p_idx]),
+                              (self.used_devs[p_idx], USED_DEVS_KEYS[p_idx])]
+        for counts, keys in hashed_counts:
+            for idx, count in enumerate(counts):
+                h ^= keys[idx][count]
+        for name, keys in SCALAR_KEYS.items():
+            h ^= keys[scalar_slot(self.__dict__[name])]
+        return h
+
+    def set_edge_owner(self, edge_idx: int, owner: int) -> None:
+        self.record(self.edge_owner, edge_idx)
+        keys = EDGE_OWNER_KEYS[edge_idx]
+        self.zobrist ^= keys[self.edge_owner[edge_idx] + 1] ^ keys[owner + 1]
+        self.edge_owner[edge_idx] = owner
+
+    def set_node(self, node_idx: int, owner: int, node_type: int) -> None:
+        self.record(self.node_owner, node_idx)
+        self.record(self.node_type, node_idx)
+        owner_keys = NODE_OWNER_KEYS[node_idx]
+        type_keys = NODE_TYPE_KEYS[node_idx]
+        self.zobrist ^= (owner_keys[self.node_owner[node_idx] + 1] ^ owner_keys[owner + 1] ^
+                         type_keys[self.node_type[node_idx]] ^ type_keys[node_type])
+        self.node_owner[node_idx] = owner
+        self.node_type[node_idx] = node_type
+
+    def __setattr__(self, name, value) -> None:
+        d = self.__dict__
+        journal = self.journal
+        if journal is not None:
+            journal.append((d, name, d[name]))
+        keys = SCALAR_KEYS.get(name)
+        if keys is not None and 'zobrist' in d:
+            self.zobrist = d['zobrist'] ^ keys[scalar_slot(d[name])] ^ keys[scalar_slot(value)]
+        object.__setattr__(self, name, value)
+
+    def record(self, container, key=WHOLE) -> None:
+        """saves container[key] in the undo journal before it is changed, the default key saves the whole buffer"""
+        journal = self.journal
+        if journal is not None:
+            journal.append((container, key, container[key]))
+
+    def push_undo_mark(self) -> None:
+        """starts a new undo frame, changes made from now on are reverted by the matching pop_undo_mark()"""
+        if self.journal is None:
+            object.__setattr__(self, 'journal', [])
+        self.undo_marks.append(len(self.journal))
+
+    def pop_undo_mark(self) -> None:
+        """reverts every change recorded since the last push_undo_mark()"""
+        journal = self.journal
+        mark = self.undo_marks.pop()
+        while len(journal) > mark:
+            container, key, old = journal.pop()
+            container[key] = old
+        if not self.undo_marks:
+            object.__setattr__(self, 'journal', None)
@@ -1,26 +1,59 @@
 import numpy as np
 from geneticalgorithm import geneticalgorithm as ga
+from multiprocessing import Pool
+from typing import Tuple
 from Heuristics import *
 import GameSession
 import Player
 import Agent
+import os
 
 """This module trains an agent using the Everything Heuristic via Genetic Algorithm"""
 
+FITNESS_GAMES = 16  # games played by every individual
+FITNESS_BASE_SEED = 0  # game i of every individual is played with seed FITNESS_BASE_SEED + i
+NUM_WORKERS = os.cpu_count() or 1
 
-def objective_function(weights):
-    h = Everything(weights=tuple(weights))
-    val = 0
-    a = Agent.OneMoveHeuristicAgent(h)
+_pool = None
+_fitness_cache = {}  # weights -> fitness, individuals with the same weights are evaluated once
+
+
+def fitness_game(game: Tuple[Tuple[float, ...], int]) -> int:
+    """
+    plays a seeded game of an agent with the given weights against two agents with the default ones
+    :returns the VP of the agent minus the VP of its opponents
+    """
+    weights, seed = game
+    a = Agent.OneMoveHeuristicAgent(Everything(weights=weights))
+    a.seed(f'{seed}/candidate')
     a2 = Agent.OneMoveHeuristicAgent(Everything())
-    for i in range(2):
-        p1 = Player.Player(a, 'Roy')
-        p2 = Player.Player(a2, 'Boaz')
-        p3 = Player.Player(a2, 'Amoss')
-        session = GameSession.GameSession(None, p1, p2, p3)
-        session.run_game()
-        val += p1.vp() - p2.vp() - p3.vp()
-    return -val
+    a2.seed(f'{seed}/opponent')
+    p1 = Player.Player(a, 'Roy')
+    p2 = Player.Player(a2, 'Boaz')
+    p3 = Player.Player(a2, 'Amoss')
+    session = GameSession.GameSession(p1, p2, p3, sinks=[], seed=seed)
+    session.run_game()
+    return p1.vp() - p2.vp() - p3.vp()
+
+
+def objective_function(weights):
+    """
+    :returns minus the average VP lead of an agent with the given weights over FITNESS_GAMES games, played over a
+    pool of worker processes. every individual plays the same seeds (the same boards and dice), so that individuals
+    are compared on the same games rather than on their luck
+    """
+    global _pool
+    weights = tuple(float(weight) for weight in weights)
+    if weights not in _fitness_cache:
+        games = [(weights, FITNESS_BASE_SEED + game_idx) for game_idx in range(FITNESS_GAMES)]
+        if NUM_WORKERS > 1:
+            if _pool is None:
+                _pool = Pool(NUM_WORKERS)
+            leads = _pool.map(fitness_game, games)
+        else:
+            leads = [fitness_game(game) for game in games]
+        _fitness_cache[weights] = -sum(leads) / len(leads)
+    return _fitness_cache[weights]
 
 
 if __name__ == '__main__':
@@ -1,69 +1,142 @@
 from __future__ import annotations  # for Hand type hints inside Hand
-from typing import Type, Union
+from typing import Type, Union, TYPE_CHECKING
+from array import array
 import GameConstants as Consts
 from collections import defaultdict
-from random import choice
+from random import Random, randrange
+if TYPE_CHECKING:
+    import GameState
+
+EMPTY_COUNTS = array('h', [0] * Consts.NUM_CARD_TYPES)  # template count vector, copied for every new hand
 
 
 class Hand:
     """
     represents a bundle of resources (or one), and number of operations that
     can be made (adding cards, removing cards, etc.)
+    the cards are held as a flat count vector, one slot per card type (see Consts.CARD_INDEX)
     """
 
     def __init__(self, *cards: Consts.CardType):
-        self.__cards = defaultdict(int)
+        self.__counts = EMPTY_COUNTS[:]
+        self.__state = None
+        self.__keys = None
+        self.__entries = None
         for card in cards:
-            self.__cards[card] += 1
+            self.__counts[Consts.CARD_INDEX[card]] += 1
+
+    @classmethod
+    def wrap(cls, counts: array, state: GameState.GameState = None, keys: list = None) -> Hand:
+        """:returns a Hand that reads and writes the given count vector in place, without copying it.
+        if the vector belongs to a game state, changes are recorded in the state's undo journal, and if it is
+        hashed (keys are its zobrist keys, see GameState) the state's hash is kept up to date"""
+        hand = cls.__new__(cls)
+        hand.__counts = counts
+        hand.__state = state
+        hand.__keys = keys
+        hand.__entries = None
+        return hand
+
+    @classmethod
+    def frozen(cls, *cards: Consts.CardType) -> Hand:
+        """:returns a Hand that cannot be changed, its non empty slots are precompiled so that checking or
+        moving it against other hands only touches those slots (used for constant hands, e.g. Consts.COSTS)"""
+        hand = cls(*cards)
+        hand.__entries = tuple((idx, amount) for idx, amount in enumerate(hand.__counts) if amount)
+        return hand
+
+    def __slots_of(self):
+        """:returns (slot, amount) pairs covering every card in the hand"""
+        return self.__entries or enumerate(self.__counts)
+
+    def __before_change(self) -> None:
+        if self.__entries is not None:
+            raise ValueError('cannot change a frozen hand')
+        if self.__state is not None:
+            self.__state.record(self.__counts)
+
+    def __rehash(self, idx: int, old: int) -> None:
+        """updates the state's hash after the count of slot idx changed from old"""
+        keys = self.__keys
+        if keys is not None:
+            row = keys[idx]
+            self.__state.zobrist ^= row[old] ^ row[self.__counts[idx]]
+
+    def counts(self) -> array:
+        """:returns the count vector backing this hand, indexed by Consts.CARD_INDEX"""
+        return self.__counts
+
+    def count(self, card: Consts.CardType) -> int:
+        """:returns the number of cards of the given type in the hand"""
+        return self.__counts[Consts.CARD_INDEX[card]]
 
     def insert(self, cards: Hand) -> None:
         """Add cards (as a hand object) to this hand"""
-        for card in cards:
-            self.__cards[card] += 1
+        self.__before_change()
+        counts = self.__counts
+        for idx, amount in cards.__slots_of():
+            if amount:
+                counts[idx] += amount
+                self.__rehash(idx, counts[idx] - amount)
 
     def remove(self, cards: Hand) -> None:
         """Remove cards (as a hand object) from this hand. Raises ValueError
         if not enough cards are present"""
-        for card, amount in cards.__cards.items():
-            num_in_hand = self.__cards[card]
-            if num_in_hand < amount:
+        counts = self.__counts
+        for idx, amount in cards.__slots_of():
+            if counts[idx] < amount:
                 raise ValueError(
-                    f'{num_in_hand} {card} cards in hand, tried to remove '
+                    f'{counts[idx]} {Consts.CARD_TYPES[idx]} cards in hand, tried to remove '
                     f'{amount}')
-            self.__cards[card] -= amount
+        self.__before_change()
+        for idx, amount in cards.__slots_of():
+            if amount:
+                counts[idx] -= amount
+                self.__rehash(idx, counts[idx] + amount)
 
     def remove_as_much(self, cards: Hand) -> Hand:
         """
-
-        :param cards:
-        :return:
+        removes every card of the given hand that is present in this hand
+        :param cards: the cards to remove
+        :return: the cards that were actually removed
         """
         removed = Hand()
-        for card in cards:
-            single_hand = Hand(card)
-            if self.contains(single_hand):
-                self.remove(single_hand)
-                removed.insert(single_hand)
+        self.__before_change()
+        counts = self.__counts
+        for idx, amount in cards.__slots_of():
+            taken = min(amount, counts[idx])
+            if taken > 0:
+                counts[idx] -= taken
+                removed.__counts[idx] = taken
+                self.__rehash(idx, counts[idx] + taken)
         return removed
 
     def remove_by_type(self, card_type: Consts.CardType) -> Hand:
         """
-
-        :param card_type:
-        :return:
+        removes all cards of the given type from the hand
+        :param card_type: the card type to remove
+        :return: the removed cards
         """
-        num_type = self.__cards[card_type]
-        hand_to_remove = Hand(*[card_type] * num_type)
+        hand_to_remove = self.cards_of_type(card_type)
         self.remove(hand_to_remove)
         return hand_to_remove
 
+    def clear(self) -> None:
+        """removes all cards from the hand"""
+        self.__before_change()
+        old_counts = self.__counts[:]
+        self.__counts[:] = EMPTY_COUNTS
+        for idx, old in enumerate(old_counts):
+            self.__rehash(idx, old)
+
     def contains(self, hand: Hand) -> bool:
         """
         :return: True if the current cards bundle contains
         the given "Hand" object, else: False
         """
-        for card, amount in hand.__cards.items():
-            if self.__cards[card] < amount:
+        counts = self.__counts
+        for idx, amount in hand.__slots_of():
+            if counts[idx] < amount:
                 return False
         return True
 
@@ -83,25 +156,37 @@ class Hand:
         """
         :return: the number of cards the "Hand" object holds
         """
-        return sum(self.__cards.values())
+        return sum(self.__counts)
 
     def cards_of_type(self, card: Consts.CardType) -> Hand:
-        return Hand(*(c for c in self if card == c))
+        hand = Hand()
+        idx = Consts.CARD_INDEX[card]
+        hand.__counts[idx] = self.__counts[idx]
+        return hand
 
     def cards_of_class(self, ctype: Type[Consts.CardType]) -> Hand:
         """return iterator of cards in hand that correspond to class ctype (
         i.e. ctype == DevType)"""
-        return Hand(*(card for card in self if isinstance(card, ctype)))
+        hand = Hand()
+        start, end = Consts.CARD_CLASS_SLOTS[ctype]
+        hand.__counts[start:end] = self.__counts[start:end]
+        return hand
 
-    def remove_random_card(self) -> Hand:
+    def remove_random_card(self, rng: Random = None) -> Hand:
         """
-        removes a random card from the hand
+        removes a random card from the hand, every card is equally likely (so every card type by its count)
+        :param rng: the random stream to draw from, the global one if not given
         :return: the removed card
         """
-        deck = [card for card in self]
-        if not deck:
+        total = self.size()
+        if not total:
             raise ValueError('cannot remove card, no cards left')
-        to_remove = Hand(choice(deck))
+        pick = rng.randrange(total) if rng else randrange(total)
+        for idx, count in enumerate(self.__counts):
+            if pick < count:
+                break
+            pick -= count
+        to_remove = Hand(Consts.CARD_TYPES[idx])
         self.remove(to_remove)
         return to_remove
 
@@ -111,27 +196,52 @@ class Hand:
         keys: resources, values: occurences
         :return:
         """
-        return self.__cards
-
+        return defaultdict(int, {Consts.CARD_TYPES[idx]: amount
+                                 for idx, amount in enumerate(self.__counts) if amount})
 
     def get_cards_types(self):
         """
         :return: the types of cards the current Hand has
         """
-        return set(self.resources())
+        start, end = Consts.CARD_CLASS_SLOTS[Consts.ResourceType]
+        return {Consts.CARD_TYPES[idx] for idx in range(start, end) if self.__counts[idx]}
 
     def __iter__(self) -> Union[Consts.DevType, Consts.ResourceType]:
         """returns iterator that iterates over every card type in the hand"""
-        for card, count in self.__cards.items():
+        for idx, count in enumerate(self.__counts):
             for _ in range(count):
-                yield card
+                yield Consts.CARD_TYPES[idx]
+
+    def __contains__(self, card: Consts.CardType) -> bool:
+        return self.__counts[Consts.CARD_INDEX[card]] > 0
+
+    def __copy__(self) -> Hand:
+        """copies are plain hands, neither frozen nor bound to a game state"""
+        hand = Hand()
+        hand.__counts[:] = self.__counts
+        return hand
+
+    def __deepcopy__(self, memo) -> Hand:
+        return self.__copy__()
 
     def __str__(self) -> str:
         """a printable representation of the hand"""
         return f'{[str(card) for card in self]}'
 
     def __len__(self) -> int:
-        return sum(1 for _ in self)
+        return self.size()
 
     def __eq__(self, other: Hand) -> bool:
-        return other.contains(self) and self.contains(other)
+        return self.__counts == other.__counts
+
+    def __hash__(self) -> int:
+        """frozen hands are hashable (by their cards), other hands may change and cannot be hashed"""
+        if self.__entries is None:
+            raise TypeError('unhashable type: a Hand that is not frozen')
+        return hash(self.__entries)
+
+    def key(self) -> tuple:
+        """:returns a hashable key of the cards in the hand, as (slot, amount) pairs of its non empty slots"""
+        if self.__entries is not None:
+            return self.__entries
+        return tuple((idx, amount) for idx, amount in enumerate(self.__counts) if amount)
@@ -1,9 +1,151 @@
+from __future__ import annotations
 import GameSession
 import Player
+import Moves
 import GameConstants as Consts
 import Dice
-from copy import deepcopy
+import numpy as np
+from typing import List, Union
 from itertools import combinations
+import TranspositionTable
+
+
+class FeatureContext:
+    """
+    the primitives heuristics are computed from (VP, road length, hand counts, probability and expectation scores),
+    for one player in one state. every primitive is computed once, on first use, and read by all the heuristics
+    evaluated with the context. contexts of the other players of the state (see of()) share the same primitives
+    """
+
+    def __init__(self, session: GameSession.GameSession, player: Player.Player, cache: dict = None):
+        for p in session.players():
+            if p == player:
+                player = p
+                break
+        self.__session = session
+        self.__player = player
+        self.__key = player.get_id()
+        self.__cache = {} if cache is None else cache
+
+    def session(self) -> GameSession.GameSession:
+        return self.__session
+
+    def player(self) -> Player.Player:
+        """:returns the player of the context, as found in the context's state"""
+        return self.__player
+
+    def of(self, player: Player.Player) -> FeatureContext:
+        """:returns the context of another player of the same state, sharing this context's primitives"""
+        return FeatureContext(self.__session, player, self.__cache)
+
+    def __cached(self, name: str, compute):
+        key = (name, self.__key)
+        cache = self.__cache
+        if key not in cache:
+            cache[key] = compute()
+        return cache[key]
+
+    def vp(self) -> int:
+        return self.__cached('vp', self.__player.vp)
+
+    def road_len(self) -> int:
+        return self.__cached('road_len', lambda: self.__session.board().road_len(self.__player))
+
+    def resource_counts(self):
+        """:returns the resource hand of the player as a count vector (see Consts.CARD_INDEX), do not modify"""
+        return self.__cached('resource_counts', lambda: self.__player.resource_hand().counts())
+
+    def hand_size(self) -> int:
+        return self.__cached('hand_size', lambda: sum(self.resource_counts()))
+
+    def probability_score(self) -> float:
+        return self.__cached('probability_score', lambda: self.__session.board().probability_score(self.__player))
+
+    def expectation_score(self) -> float:
+        return self.__cached('expectation_score', lambda: self.__session.board().expectation_score(self.__player))
+
+    def potential_probability_score(self) -> float:
+        return self.__cached('potential_probability_score',
+                             lambda: self.__session.potential_probability_score(self.__player))
+
+    def winner(self) -> Union[Player.Player, None]:
+        """:returns the winner of the state, None if the game is not over (see GameSession.winner)"""
+        key = ('winner', None)
+        cache = self.__cache
+        if key not in cache:
+            contexts = [self.of(p) for p in self.__session.players()]
+            game_over = any(ctx.vp() >= Consts.WINNING_VP for ctx in contexts)
+            cache[key] = max(contexts, key=lambda ctx: ctx.vp()).player() if game_over else None
+        return cache[key]
+
+    # after move primitives #
+
+    def counts_after(self, move: Moves.Move):
+        """
+        :returns the resource count vector of the player after the given move of theirs, None if it cannot be known
+        without making the move (e.g. a card is stolen at random). do not modify
+        """
+        return self.__cached(('counts_after', id(move)), lambda: _counts_after(self, move))
+
+    def vp_delta(self, move: Moves.Move) -> Union[int, None]:
+        """
+        :returns the VP the player gains by the given move of theirs, None if it cannot be known without making the
+        move or if the move changes the VP of another player as well (e.g. it takes a title from them)
+        """
+        if _keeps_board(move):
+            return None if isinstance(move, Moves.BuyDevMove) else 0  # a bought dev card may be a VP card
+        builds = _paid_build(move)
+        if builds == Consts.PurchasableType.CITY:
+            return Consts.VP_CITY - Consts.VP_SETTLEMENT
+        if builds == Consts.PurchasableType.SETTLEMENT:
+            return Consts.VP_SETTLEMENT
+        if isinstance(move, Moves.UseKnightDevMove):
+            if move.robber_activated():
+                return 0
+            army_size = self.__player.army_size() + 1
+            largest_army_player = self.__session.largest_army_player()
+            if largest_army_player is None:
+                return Consts.VP_LARGEST_ARMY if army_size >= Consts.MIN_LARGEST_ARMY_SIZE else 0
+            if largest_army_player == self.__player or army_size <= largest_army_player.army_size():
+                return 0
+        return None
+
+
+def _keeps_board(move: Moves.Move) -> bool:
+    """:returns True iff the given move only moves cards between hands and decks"""
+    return isinstance(move, (Moves.TradeMove, Moves.BuyDevMove, Moves.ThrowMove, Moves.UseYopDevMove,
+                             Moves.UseMonopolyDevMove))
+
+
+def _paid_build(move: Moves.Move) -> Union[Consts.PurchasableType, None]:
+    """:returns the type built by the given move if it is a build the player pays for, None otherwise"""
+    if isinstance(move, Moves.BuildMove) and not move.is_free():
+        return move.builds()
+    return None
+
+
+def _counts_after(ctx: FeatureContext, move: Moves.Move):
+    counts = list(ctx.resource_counts())
+    if isinstance(move, Moves.TradeMove):
+        changes = ((move.gives(), -1), (move.gets(), 1))
+    elif isinstance(move, Moves.ThrowMove):
+        changes = ((move.throws(), -1),)
+    elif isinstance(move, Moves.BuyDevMove):
+        changes = ((Consts.COSTS[Consts.PurchasableType.DEV_CARD], -1),)
+    elif _paid_build(move) is not None:
+        changes = ((Consts.COSTS[move.builds()], -1),)
+    elif isinstance(move, Moves.UseYopDevMove):
+        changes = ((move.resources(), 1),)
+    elif isinstance(move, Moves.UseMonopolyDevMove):
+        idx = Consts.CARD_INDEX[move.resource()]
+        counts[idx] += sum(ctx.of(p).resource_counts()[idx] for p in ctx.session().players() if p != ctx.player())
+        return counts
+    else:  # passing, knights (steal at random) and free road building (the roads are chosen inside the move)
+        return None
+    for hand, sign in changes:
+        for idx, amount in enumerate(hand.counts()):
+            counts[idx] += sign * amount
+    return counts
 
 
 class Heuristic:
@@ -13,15 +155,73 @@ class Heuristic:
     def __init__(self, normalization: float = 1):
         self.norm = normalization
 
-    def _calc(self, session: GameSession, player: Player) -> float:
+    def _calc(self, ctx: FeatureContext) -> float:
         raise NotImplemented
 
     def value(self, session: GameSession, player: Player) -> float:
-        for p in session.players():
-            if p == player:
-                player = p
-                break
-        return self._calc(session, player) * self.norm
+        return self.evaluate(FeatureContext(session, player))
+
+    def evaluate(self, ctx: FeatureContext) -> float:
+        """:returns the value of the context's player in the context's state"""
+        return self._calc(ctx) * self.norm
+
+    # move deltas #
+
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        """:returns the change of _calc by the given move of the context's player, None if not supported"""
+        return None
+
+    def delta(self, session: GameSession, move: Moves.Move) -> Union[float, None]:
+        """
+        :returns the change the given move makes to the value of the player making it, computed without making the
+        move. None if the heuristic cannot tell the change of that move without making it
+        """
+        return self.evaluate_delta(FeatureContext(session, move.player()), move)
+
+    def evaluate_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        """:returns the change of the context player's value by the given move of theirs, None if not supported"""
+        delta = self._calc_delta(ctx, move)
+        return None if delta is None else delta * self.norm
+
+    # batches #
+
+    def features(self, session: GameSession, player: Player) -> List[float]:
+        """:returns the feature row of the given state that combine() turns into its value, by default the value"""
+        return self.evaluate_features(FeatureContext(session, player))
+
+    def evaluate_features(self, ctx: FeatureContext) -> List[float]:
+        """:returns the feature row of the context's state, see features()"""
+        return [self.evaluate(ctx)]
+
+    def feature_deltas(self, ctx: FeatureContext, move: Moves.Move) -> Union[List[float], None]:
+        """:returns the change of the feature row by the given move of the context's player, None if not supported"""
+        delta = self.evaluate_delta(ctx, move)
+        return None if delta is None else [delta]
+
+    def combine(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """:returns the values of a (states x features) matrix of feature rows"""
+        return feature_matrix[:, 0]
+
+    def values(self, sessions: List[GameSession], player: Player) -> np.ndarray:
+        """:returns an array of the values of the given player in each of the given states"""
+        return self.combine(np.array([self.features(session, player) for session in sessions], dtype=float))
+
+
+class HandHeuristic(Heuristic):
+    """
+    a superior class of heuristics computed from the player's resource count vector alone, their change by a move is
+    computed from the count vector the move leaves the player with
+    """
+
+    def _calc_counts(self, counts) -> float:
+        raise NotImplemented
+
+    def _calc(self, ctx: FeatureContext) -> float:
+        return self._calc_counts(ctx.resource_counts())
+
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        counts = ctx.counts_after(move)
+        return None if counts is None else self._calc_counts(counts) - self._calc(ctx)
 
 
 class VictoryPoints(Heuristic):
@@ -30,8 +230,11 @@ class VictoryPoints(Heuristic):
     def __init__(self, normalization: float = 1 / Consts.WINNING_VP):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        return player.vp()
+    def _calc(self, ctx: FeatureContext) -> float:
+        return ctx.vp()
+
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        return ctx.vp_delta(move)
 
 
 class Harbors(Heuristic):
@@ -40,19 +243,38 @@ class Harbors(Heuristic):
     def __init__(self, normalization: float = 1 / len(Consts.HARBOR_NODES.values())):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        return len(player.harbors())
+    def _calc(self, ctx: FeatureContext) -> float:
+        return len(ctx.player().harbors())
+
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        builds = _paid_build(move)
+        if builds == Consts.PurchasableType.SETTLEMENT:
+            return 1 if any(move.at() in locations for locations in Consts.HARBOR_NODES.values()) else 0
+        return 0 if _keeps_board(move) or builds is not None else None
 
 
 class GameWon(Heuristic):
     """A Heuristic based on winner of the game"""
     INF = 100000
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        if session.winner() is not None:
-            return GameWon.INF if session.winner() == player else -GameWon.INF
+    def _calc(self, ctx: FeatureContext) -> float:
+        winner = ctx.winner()
+        if winner is not None:
+            return GameWon.INF if winner == ctx.player() else -GameWon.INF
         return 0
 
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        vp_delta = ctx.vp_delta(move)
+        if not vp_delta:
+            return vp_delta
+        player = ctx.player()
+        vps = [(ctx.of(p).vp() + vp_delta if p == player else ctx.of(p).vp(), p) for p in ctx.session().players()]
+        if any(vp >= Consts.WINNING_VP for vp, _ in vps):
+            value = GameWon.INF if max(vps, key=lambda vp_p: vp_p[0])[1] == player else -GameWon.INF
+        else:
+            value = 0
+        return value - self._calc(ctx)
+
 
 class Roads(Heuristic):
     """A Heuristic based on the number of Harbors owned"""
@@ -60,8 +282,14 @@ class Roads(Heuristic):
     def __init__(self, normalization: float = 1 / Consts.MAX_ROADS_PER_PLAYER):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        return player.num_roads()
+    def _calc(self, ctx: FeatureContext) -> float:
+        return ctx.player().num_roads()
+
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        builds = _paid_build(move)
+        if builds is not None:
+            return 1 if builds == Consts.PurchasableType.ROAD else 0
+        return 0 if _keeps_board(move) else None
 
 
 class Settlements(Heuristic):
@@ -70,18 +298,24 @@ class Settlements(Heuristic):
     def __init__(self, normalization: float = 1 / Consts.MAX_SETTLEMENTS_PER_PLAYER):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        return player.num_settlements()
+    def _calc(self, ctx: FeatureContext) -> float:
+        return ctx.player().num_settlements()
+
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        builds = _paid_build(move)
+        if builds is not None:
+            return {Consts.PurchasableType.SETTLEMENT: 1, Consts.PurchasableType.CITY: -1}.get(builds, 0)
+        return 0 if _keeps_board(move) else None
 
 
-class AvoidThrow(Heuristic):
+class AvoidThrow(HandHeuristic):
     """A Heuristic based on avoiding large hands"""
 
     def __init__(self, normalization: float = 1 / (Consts.MAX_CARDS_IN_HAND + 1)):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        res_size = player.resource_hand().size()
+    def _calc_counts(self, counts) -> float:
+        res_size = sum(counts)
         if res_size > Consts.MAX_CARDS_IN_HAND:
             return Consts.MAX_CARDS_IN_HAND - res_size
         return 0
@@ -93,8 +327,14 @@ class Cities(Heuristic):
     def __init__(self, normalization: float = 1 / Consts.MAX_CITIES_PER_PLAYER):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        return player.num_cities()
+    def _calc(self, ctx: FeatureContext) -> float:
+        return ctx.player().num_cities()
+
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        builds = _paid_build(move)
+        if builds is not None:
+            return 1 if builds == Consts.PurchasableType.CITY else 0
+        return 0 if _keeps_board(move) else None
 
 
 class DevCards(Heuristic):
@@ -103,19 +343,26 @@ class DevCards(Heuristic):
     def __init__(self, normalization: float = 1 / (Consts.NUM_DEVS + 1)):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
+    def _calc(self, ctx: FeatureContext) -> float:
+        player = ctx.player()
         return player.dev_hand().size() + 2 * player.used_dev_hand().size()
 
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        if isinstance(move, Moves.BuyDevMove):
+            return 1
+        if isinstance(move, Moves.UseDevMove):  # a card moves from the hand to the used cards
+            return 0 if isinstance(move, Moves.UseKnightDevMove) and move.robber_activated() else 1
+        return 0 if isinstance(move, (Moves.TradeMove, Moves.ThrowMove, Moves.BuildMove)) else None
+
 
-class ResourceDiversity(Heuristic):
+class ResourceDiversity(HandHeuristic):
     """A Heuristic based on preferring diversified hands"""
 
     def __init__(self, normalization: float = 1 / len(Consts.YIELDING_RESOURCES)):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        num_types = len(set([card for card in player.resource_hand()]))
-        return num_types
+    def _calc_counts(self, counts) -> float:
+        return sum(1 for count in counts if count)
 
 
 class BuildInGoodPlaces(Heuristic):
@@ -124,12 +371,24 @@ class BuildInGoodPlaces(Heuristic):
     def __init__(self, normalization: float = 1 / 227.5):  # 227.5 is the bound
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        board = session.board()
+    def _calc(self, ctx: FeatureContext) -> float:
+        return self.__score(ctx.session().board(), ctx.player().settlement_nodes())
+
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        builds = _paid_build(move)
+        nodes = ctx.player().settlement_nodes()
+        if builds == Consts.PurchasableType.SETTLEMENT:
+            return self.__score(ctx.session().board(), list(nodes) + [move.at()]) - self._calc(ctx)
+        if builds == Consts.PurchasableType.CITY:
+            return self.__score(ctx.session().board(), [node for node in nodes if node != move.at()]) - self._calc(ctx)
+        return 0 if _keeps_board(move) or builds is not None else None
+
+    @staticmethod
+    def __score(board, nodes: List[int]) -> float:
         tiles_types = set()
         num_tiles = 0
         tiles_prob = 0
-        for node in player.settlement_nodes():
+        for node in nodes:
             for tile in board.get_adj_tile_ids_to_node(node):
                 num_tiles += 1
                 tiles_types.add(board.hexes()[tile].resource())
@@ -137,27 +396,29 @@ class BuildInGoodPlaces(Heuristic):
         return num_tiles * len(tiles_types) * tiles_prob
 
 
-class EnoughResources(Heuristic):
+class EnoughResources(HandHeuristic):
     """A Heuristic based on preferring hands that can buy many Purchasables"""
 
     def __init__(self, normalization: float = 1 / 3):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        hand = player.resource_hand()
+    def _calc_counts(self, counts) -> float:
+        def contains(cost):
+            return all(counts[idx] >= amount for idx, amount in enumerate(cost.counts()))
+
         road_score = 0.5
         settle_score = 1
         city_score = 1.5
         dev_card_score = 1
         score = 0
 
-        if hand.contains(Consts.COSTS[Consts.PurchasableType.ROAD]):
+        if contains(Consts.COSTS[Consts.PurchasableType.ROAD]):
             score += road_score
-        if hand.contains(Consts.COSTS[Consts.PurchasableType.SETTLEMENT]):
+        if contains(Consts.COSTS[Consts.PurchasableType.SETTLEMENT]):
             score += settle_score
-        if hand.contains(Consts.COSTS[Consts.PurchasableType.CITY]):
+        if contains(Consts.COSTS[Consts.PurchasableType.CITY]):
             score += city_score
-        if hand.contains(Consts.COSTS[Consts.PurchasableType.DEV_CARD]):
+        if contains(Consts.COSTS[Consts.PurchasableType.DEV_CARD]):
             score += dev_card_score
 
         return score
@@ -171,38 +432,59 @@ class PreferResourcesPerStage(Heuristic):
     def __init__(self, normalization: float = 1 / 150):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
+    def _calc(self, ctx: FeatureContext) -> float:
+        return self.__score(ctx.resource_counts(), self.__num_buildings(ctx.player()))
+
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        counts = ctx.counts_after(move)
+        if counts is None:
+            return None
+        num_buildings = self.__num_buildings(ctx.player())
+        if _paid_build(move) in (Consts.PurchasableType.ROAD, Consts.PurchasableType.SETTLEMENT):  # not a city,
+            num_buildings += 1  # which replaces a settlement
+        return self.__score(counts, num_buildings) - self._calc(ctx)
+
+    @staticmethod
+    def __num_buildings(player: Player.Player) -> int:
+        return player.num_roads() + player.num_settlements() + player.num_cities()
+
+    @staticmethod
+    def __score(counts, num_buildings: int) -> float:
         # resources:
-        __num_forest = player.resource_hand().cards_of_type(Consts.ResourceType.FOREST).size()
-        __num_bricks = player.resource_hand().cards_of_type(Consts.ResourceType.BRICK).size()
-        __num_sheep = player.resource_hand().cards_of_type(Consts.ResourceType.SHEEP).size()
-        __num_wheat = player.resource_hand().cards_of_type(Consts.ResourceType.WHEAT).size()
-        __num_ore = player.resource_hand().cards_of_type(Consts.ResourceType.ORE).size()
-
-        # buildings:
-        __num_roads = player.num_roads()
-        __num_cities = player.num_cities()
-        __num_settles = player.num_settlements()
-        __num_buildings = __num_roads + __num_settles + __num_cities
+        __num_forest = counts[Consts.CARD_INDEX[Consts.ResourceType.FOREST]]
+        __num_bricks = counts[Consts.CARD_INDEX[Consts.ResourceType.BRICK]]
+        __num_sheep = counts[Consts.CARD_INDEX[Consts.ResourceType.SHEEP]]
+        __num_wheat = counts[Consts.CARD_INDEX[Consts.ResourceType.WHEAT]]
+        __num_ore = counts[Consts.CARD_INDEX[Consts.ResourceType.ORE]]
 
         __calc_score = (100 * (0.8 * __num_forest +
                                1.2 * __num_bricks +
                                0.3 * __num_sheep +
                                0.3 * __num_wheat) /
-                        (__num_buildings * (1 +
-                                            0.75 * __num_sheep +
-                                            0.75 * __num_wheat +
-                                            1.5 * __num_ore)))
+                        (num_buildings * (1 +
+                                          0.75 * __num_sheep +
+                                          0.75 * __num_wheat +
+                                          1.5 * __num_ore)))
         return __calc_score
 
 
 class Probability(Heuristic):
     """A Heuristic based on board probabilities and buildable placements"""
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        return sum((session.board().probability_score(player),
-                    session.board().expectation_score(player),
-                    session.potential_probability_score(player)))
+    def _calc(self, ctx: FeatureContext) -> float:
+        return sum((ctx.probability_score(),
+                    ctx.expectation_score(),
+                    ctx.potential_probability_score()))
+
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        if _keeps_board(move):
+            return 0
+        if _paid_build(move) == Consts.PurchasableType.CITY:  # the tiles of the node already roll for the player
+            board = ctx.session().board()
+            return sum(Dice.PROBABILITIES.get(board.hexes()[tile].token(), 0) *
+                       (Consts.NUM_RESOURCES_PER_CITY - Consts.NUM_RESOURCES_PER_SETTLEMENT)
+                       for tile in board.get_adj_tile_ids_to_node(move.at()))
+        return None  # a settlement or a road changes the nodes the player can build on
 
 
 class LongestRoad(Heuristic):
@@ -211,8 +493,13 @@ class LongestRoad(Heuristic):
     def __init__(self, normalization: float = 1 / Consts.MAX_ROADS_PER_PLAYER):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        return session.board().road_len(player)
+    def _calc(self, ctx: FeatureContext) -> float:
+        return ctx.road_len()
+
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        builds = _paid_build(move)
+        return 0 if _keeps_board(move) or builds in (Consts.PurchasableType.SETTLEMENT, Consts.PurchasableType.CITY) \
+            else None
 
 
 class OpponentScore(Heuristic):
@@ -224,27 +511,31 @@ class OpponentScore(Heuristic):
         self.hand_size = HandSize()
         self.road = LongestRoad()
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        max_vp_player = max([p for p in session.players() if p != player], key=lambda p: p.vp())
-        opp_score = (self.hand_size.value(session, max_vp_player) +
-                     10 * self.vp.value(session, max_vp_player) +
-                     1.5 * self.road.value(session, max_vp_player))
+    def _calc(self, ctx: FeatureContext) -> float:
+        player = ctx.player()
+        opp_contexts = [ctx.of(p) for p in ctx.session().players() if p != player]
+        max_vp_opp = max(opp_contexts, key=lambda opp: opp.vp())
+        opp_score = (self.hand_size.evaluate(max_vp_opp) +
+                     10 * self.vp.evaluate(max_vp_opp) +
+                     1.5 * self.road.evaluate(max_vp_opp))
         return (1 / opp_score) if opp_score != 0 else 0
 
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        # moves that leave the opponents' hands, VP and roads as they are #
+        if isinstance(move, Moves.UseMonopolyDevMove):
+            return None
+        return 0 if _keeps_board(move) or _paid_build(move) == Consts.PurchasableType.CITY else None
 
-class CanBuy(Heuristic):
+
+class CanBuy(HandHeuristic):
     """A Heuristic based on Purchasable buying power"""
 
     def __init__(self, normalization: float = 1 / 15):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
+    def _calc_counts(self, counts) -> float:
         num_affordable = 0
-        my_hand = player.resource_hand()
-        contained = False
         for purchasable, cost in Consts.COSTS.items():
-            if my_hand.contains(cost):
-                contained = True
             if purchasable == Consts.PurchasableType.SETTLEMENT:
                 reward = 1
             elif purchasable == Consts.PurchasableType.CITY:
@@ -252,13 +543,16 @@ class CanBuy(Heuristic):
             else:
                 reward = 0.5
             partial = reward / cost.size()
-            my_hand_cards = [c for c in my_hand]
-            for card in cost:
-                if card in my_hand_cards:
-                    num_affordable += partial
-            cost_copy = deepcopy(cost)
-            cost_copy.insert(cost)
-            if my_hand.contains(cost_copy):
+            can_buy_twice = True
+            for idx, amount in enumerate(cost.counts()):
+                if not amount:
+                    continue
+                if counts[idx]:  # every card of the cost the hand holds a card of the type of
+                    for _ in range(amount):
+                        num_affordable += partial
+                if counts[idx] < 2 * amount:
+                    can_buy_twice = False
+            if can_buy_twice:
                 num_affordable += 2 * reward
 
         # if contained:
@@ -279,50 +573,78 @@ class CanBuy(Heuristic):
         return num_affordable
 
 
-class HandSize(Heuristic):
+class HandSize(HandHeuristic):
     """A Heuristic based on preferring large hands up to threshold"""
 
     def __init__(self, normalization: float = 1 / Consts.MAX_CARDS_IN_HAND):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        return min(player.resource_hand_size(), Consts.MAX_CARDS_IN_HAND)
+    def _calc_counts(self, counts) -> float:
+        return min(sum(counts), Consts.MAX_CARDS_IN_HAND)
 
 
-class HandDiversity(Heuristic):
+class HandDiversity(HandHeuristic):
     """A Heuristic based on preferring diverse hands"""
 
     def __init__(self, normalization: float = 1 / len(Consts.YIELDING_RESOURCES)):
         super().__init__(normalization)
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        num_unique_resources = 0
-        for resource in Consts.ResourceType:
-            if player.resource_hand().cards_of_type(resource).size() > 0:
-                num_unique_resources += 1
-        return num_unique_resources
+    def _calc_counts(self, counts) -> float:
+        return sum(1 for count in counts if count)
 
 
-class Everything(Heuristic):
-    """A Heuristic based on multiple sub-heuristics"""
-    def __init__(self, normalization=1, weights=(1, 30, 1.5, 1, 0.1, 0.1, 2.5, 1, 1)):
+class WeightedSum(Heuristic):
+    """A Heuristic based on multiple sub-heuristics, a weighted sum of their values.
+    the sub-heuristics of a state are all evaluated over one FeatureContext"""
+
+    def __init__(self, heuristics: tuple, weights: tuple, normalization=1):
         super().__init__(normalization)
-        self.heuristics = (Probability(),
-                           VictoryPoints(),
-                           LongestRoad(),
-                           GameWon(),
-                           HandSize(),
-                           HandDiversity(),
-                           DevCards(),
-                           CanBuy(),
-                           OpponentScore())
+        self.heuristics = heuristics
         self.weights = weights
+        self.__weights = np.array(weights, dtype=float) * normalization
 
-    def _calc(self, session: GameSession, player: Player) -> float:
-        return sum(h.value(session, player) * w for h, w in zip(self.heuristics, self.weights))
+    def _calc(self, ctx: FeatureContext) -> float:
+        return sum(h.evaluate(ctx) * w for h, w in zip(self.heuristics, self.weights))
 
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        deltas = self.feature_deltas(ctx, move)
+        return None if deltas is None else sum(delta * w for delta, w in zip(deltas, self.weights))
 
-class Main(Heuristic):
+    def evaluate_features(self, ctx: FeatureContext) -> List[float]:
+        """:returns the (normalized) values of the sub-heuristics"""
+        return [h.evaluate(ctx) for h in self.heuristics]
+
+    def feature_deltas(self, ctx: FeatureContext, move: Moves.Move) -> Union[List[float], None]:
+        """:returns the changes of the sub-heuristic values, None unless all the sub-heuristics support the move"""
+        deltas = []
+        for h in self.heuristics:
+            delta = h.evaluate_delta(ctx, move)
+            if delta is None:
+                return None
+            deltas.append(delta)
+        return deltas
+
+    def combine(self, feature_matrix: np.ndarray) -> np.ndarray:
+        """weighs the sub-heuristic values of all states with a single dot product"""
+        return feature_matrix @ self.__weights
+
+
+class Everything(WeightedSum):
+    """A Heuristic based on multiple sub-heuristics"""
+    def __init__(self, normalization=1, weights=(1, 30, 1.5, 1, 0.1, 0.1, 2.5, 1, 1)):
+        super().__init__((Probability(),
+                          VictoryPoints(),
+                          LongestRoad(),
+                          GameWon(),
+                          HandSize(),
+                          HandDiversity(),
+                          DevCards(),
+                          CanBuy(),
+                          OpponentScore()),
+                         weights, normalization)
+
+
+class Main(WeightedSum):
     """A Heuristic based on multiple sub-heuristics"""
     VP_WEIGHT = 2  # victory points heuristic weight
     PREFER_RESOURCES_WEIGHT = 0.2
@@ -349,23 +671,19 @@ class Main(Heuristic):
                                                  GAME_WON_WEIGHT,
                                                  ENOUGH_RES_TO_BUY_WEIGHT,
                                                  AVOID_THROW_WEIGHT)):
-        super().__init__(normalization)
-        self.heuristics = (VictoryPoints(),
-                           Harbors(),
-                           PreferResourcesPerStage(),
-                           Roads(),
-                           Settlements(),
-                           Cities(),
-                           ResourceDiversity(),
-                           BuildInGoodPlaces(),
-                           DevCards(),
-                           GameWon(),
-                           EnoughResources(),
-                           AvoidThrow())
-        self.weights = weights
-
-    def _calc(self, session: GameSession, player: Player) -> float:
-        return sum(h.value(session, player) * w for h, w in zip(self.heuristics, self.weights))
+        super().__init__((VictoryPoints(),
+                          Harbors(),
+                          PreferResourcesPerStage(),
+                          Roads(),
+                          Settlements(),
+                          Cities(),
+                          ResourceDiversity(),
+                          BuildInGoodPlaces(),
+                          DevCards(),
+                          GameWon(),
+                          EnoughResources(),
+                          AvoidThrow()),
+                         weights, normalization)
 
 
 class BuilderCharacteristic(Main):
@@ -452,3 +770,30 @@ def find_sim_player(session: GameSession, player: Player) -> Player:
     for sim_player in session.players():
         if sim_player.get_id() == player.get_id():
             return sim_player
+
+
+class CachedHeuristic(Heuristic):
+    """
+    A Heuristic that looks up the values of another heuristic in a transposition table before computing them,
+    keyed by the state hash and the evaluated player. states reached through different move orders (e.g. trading
+    then building or the other way around) are evaluated once. any agent that takes a heuristic can be given one
+    """
+
+    def __init__(self, heuristic: Heuristic, table: TranspositionTable.TranspositionTable = None):
+        super().__init__()
+        self.heuristic = heuristic
+        self.table = TranspositionTable.TranspositionTable() if table is None else table
+
+    def value(self, session: GameSession, player: Player) -> float:
+        key = (session.state_hash(), player.turn_idx())
+        value = self.table.get(key)
+        if value is None:
+            value = self.heuristic.value(session, player)
+            self.table.put(key, value)
+        return value
+
+    def evaluate(self, ctx: FeatureContext) -> float:
+        return self.value(ctx.session(), ctx.player())
+
+    def _calc_delta(self, ctx: FeatureContext, move: Moves.Move) -> Union[float, None]:
+        return self.heuristic.evaluate_delta(ctx, move)
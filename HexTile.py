@@ -1,4 +1,5 @@
 import GameConstants as Consts
+import Topology
 import hexgrid
 from typing import List
 
@@ -31,13 +32,13 @@ def colorify(st):
 
 class HexTile:
     """
-    Class represents a tile in the hexgrid (board)
+    Class represents a tile in the hexgrid (board).
+    tiles are static and shared between clones of a game, the robber position is kept by the Board
     """
-    def __init__(self, hex_id: int, resource: Consts.ResourceType, token: int, has_robber: bool = False):
+    def __init__(self, hex_id: int, resource: Consts.ResourceType, token: int):
         self.__hex_id = hex_id
         self.__resource = resource
         self.__token = token
-        self.__has_robber = has_robber
 
     def resource(self) -> Consts.ResourceType:
         return self.__resource
@@ -50,25 +51,19 @@ class HexTile:
         return hexgrid.tile_id_to_coord(self.__hex_id + 1)
 
     def edges(self) -> List[int]:
-        """:returns list of this tile's edge coordinates"""
-        return hexgrid.edges_touching_tile(self.__hex_id + 1)
+        """:returns list of this tile's edge coordinates (a shared list, do not modify)"""
+        return Topology.TILE_EDGES_BY_ID[self.__hex_id]
 
     def nodes(self) -> List[int]:
-        """:returns list of this tile's node coordinates"""
-        return hexgrid.nodes_touching_tile(self.__hex_id + 1)
+        """:returns list of this tile's node coordinates (a shared list, do not modify)"""
+        return Topology.TILE_NODES_BY_ID[self.__hex_id]
 
     def token(self) -> int:
         return self.__token if self.__token is not None else ''
 
-    def has_robber(self) -> bool:
-        return self.__has_robber
-
-    def set_robber(self, val: bool) -> None:
-        self.__has_robber = val
-
     def info(self) -> str:
         return f'[HEX] resource = {self.__resource:>8}, ' \
-               f'hex_id = {hex(self.__hex_id):>5}, token = {self.__token:2}, robber ? {self.__has_robber}'
+               f'hex_id = {hex(self.__hex_id):>5}, token = {self.__token:2}'
 
     def __str__(self):
         return colorify(self.__resource)
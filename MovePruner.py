@@ -0,0 +1,122 @@
+from __future__ import annotations
+from enum import Enum
+from typing import List, Dict
+import GameSession
+import Player
+import Moves
+
+"""A Module removing the equivalent and dominated moves a game generates, before its agents get to choose"""
+
+
+class PruningRule(Enum):
+    """Enum representing the pruning rules, the removed moves are counted per rule"""
+    DOMINATED_TRADES = 0  # trades giving more for the same cards, or giving away the cards they get
+    IDLE_KNIGHTS = 1  # robber placements that take from no one, all but one
+    IDLE_MONOPOLIES = 2  # monopolies of resources no opponent holds, all but one
+
+    def __str__(self):
+        return self.name
+
+
+class MovePruner:
+    """
+    Class shrinking the moves generated for a player to one move per class of equivalent moves, without the moves
+    another generated move dominates:
+    - a trade is dropped if another trade gets the same cards for fewer cards of the ones it gives (e.g. a 4:1 bank
+      trade when a 2:1 harbor trade of the same resources is offered), or if it gives away the very cards it gets
+    - of the knight moves that take from no one, a single one is kept, on a hex with no buildings if there is one
+      (so that the robber does not block the player's own production)
+    - of the monopolies of resources no opponent holds, a single one is kept
+    counts the moves it was given and the moves it removed
+    """
+
+    def __init__(self):
+        self.__num_generated = 0
+        self.__num_removed = {rule: 0 for rule in PruningRule}
+
+    def prune(self, moves: List[Moves.Move], session: GameSession.GameSession,
+              player: Player.Player) -> List[Moves.Move]:
+        """:returns the given moves of the player without the equivalent and dominated ones, in the same order"""
+        self.__num_generated += len(moves)
+
+        # the moves the rules look at are gathered in a single pass #
+        trades, idle_knights, monopolies = [], [], []
+        for m_idx, move in enumerate(moves):
+            if isinstance(move, Moves.TradeMove):
+                trades.append(m_idx)
+            elif isinstance(move, Moves.UseKnightDevMove):
+                if move.take_from() is None:
+                    idle_knights.append(m_idx)
+            elif isinstance(move, Moves.UseMonopolyDevMove):
+                monopolies.append(m_idx)
+
+        removed = []
+        if trades:
+            removed.extend(self.__dominated_trades(moves, trades))
+        if len(idle_knights) > 1:
+            removed.extend(self.__idle_knights(moves, idle_knights, session))
+        if len(monopolies) > 1:
+            removed.extend(self.__idle_monopolies(moves, monopolies, session, player))
+        if not removed:
+            return moves
+        removed = set(removed)
+        return [move for m_idx, move in enumerate(moves) if m_idx not in removed]
+
+    def __dominated_trades(self, moves: List[Moves.Move], trades: List[int]) -> List[int]:
+        trades_by_gets = {}
+        for m_idx in trades:
+            trades_by_gets.setdefault(tuple(moves[m_idx].gets().counts()), []).append(m_idx)
+
+        removed = []
+        for same_gets in trades_by_gets.values():
+            for m_idx in same_gets:
+                gives = moves[m_idx].gives()
+                if gives.contains(moves[m_idx].gets()) or \
+                        any(gives.size() > moves[other].gives().size() and gives.contains(moves[other].gives())
+                            for other in same_gets):
+                    removed.append(m_idx)
+        self.__num_removed[PruningRule.DOMINATED_TRADES] += len(removed)
+        return removed
+
+    def __idle_knights(self, moves: List[Moves.Move], idle_knights: List[int],
+                       session: GameSession.GameSession) -> List[int]:
+        board = session.board()
+        kept = idle_knights[0]
+        for m_idx in idle_knights:
+            if all(board.node_owner(node) is None for node in board.hexes()[moves[m_idx].hex_id()].nodes()):
+                kept = m_idx
+                break
+        removed = [m_idx for m_idx in idle_knights if m_idx != kept]
+        self.__num_removed[PruningRule.IDLE_KNIGHTS] += len(removed)
+        return removed
+
+    def __idle_monopolies(self, moves: List[Moves.Move], monopolies: List[int], session: GameSession.GameSession,
+                          player: Player.Player) -> List[int]:
+        opponents = [opp for opp in session.players() if opp != player]
+        idle = [m_idx for m_idx in monopolies
+                if not any(opp.resource_hand().count(moves[m_idx].resource()) for opp in opponents)]
+        removed = idle[1:]
+        self.__num_removed[PruningRule.IDLE_MONOPOLIES] += len(removed)
+        return removed
+
+    def num_generated(self) -> int:
+        """:returns the number of moves given to the pruner"""
+        return self.__num_generated
+
+    def num_removed(self, rule: PruningRule = None) -> int:
+        """:returns the number of moves removed by the given rule, by all of them if not given"""
+        if rule is None:
+            return sum(self.__num_removed.values())
+        return self.__num_removed[rule]
+
+    def as_dict(self) -> Dict:
+        """:returns the counts as plain data, e.g. to be saved as JSON"""
+        return {'generated': self.__num_generated,
+                'removed': {str(rule): count for rule, count in self.__num_removed.items()}}
+
+    def __str__(self) -> str:
+        generated = self.__num_generated
+        removed = self.num_removed()
+        share = removed / generated if generated else 0
+        rules = ', '.join(f'{rule} {count}' for rule, count in self.__num_removed.items())
+        return f'[PRUNER] removed {removed} of {generated} generated moves ({share:.1%}): {rules}'
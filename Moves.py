@@ -20,14 +20,22 @@ class MoveType(Enum):
 
 
 class Move:
-    """Class representing a possible action that a player can perform in Catan"""
-    def __init__(self, player: Player, mtype: MoveType):
+    """
+    Class representing a possible action that a player can perform in Catan.
+    moves are immutable, and are identified (compared and hashed) by a compact key: the id of the player making the
+    move, the move type and the move parameters. the hands a move holds are expected to be frozen (see Hand.frozen)
+    """
+    __slots__ = ('__player', '__type', '__key', '__hash')
+
+    def __init__(self, player: Player, mtype: MoveType, *params):
         self.__player = player
         self.__type = mtype
+        self.__key = (player.get_id(), mtype) + params
+        self.__hash = hash(self.__key)
 
-    def set_player(self, player: Player) -> None:
-        """sets the player making the move"""
-        self.__player = player
+    def key(self) -> tuple:
+        """:returns the key identifying the move, (player id, move type, *move parameters)"""
+        return self.__key
 
     def player(self) -> Player:
         """:returns the id of the player making the move"""
@@ -45,13 +53,18 @@ class Move:
         return str(self.__type)
 
     def __eq__(self, other):
-        return isinstance(other, Move) and self.player() == other.player() and self.get_type() == other.get_type()
+        return self is other or (isinstance(other, Move) and self.__key == other.__key)
+
+    def __hash__(self) -> int:
+        return self.__hash
 
 
 class TradeMove(Move):
     """A Move that trades cards with the main deck"""
+    __slots__ = ('__cards_out', '__cards_in')
+
     def __init__(self, player: Player, cards_out: Hand, cards_in: Hand):
-        super().__init__(player, MoveType.TRADE)
+        super().__init__(player, MoveType.TRADE, cards_out.key(), cards_in.key())
         self.__cards_out = cards_out
         self.__cards_in = cards_in
 
@@ -68,20 +81,21 @@ class TradeMove(Move):
         return f'[MOVE] player = {self.player()}, ' \
                f'type = {self.get_type().name}, gives = {self.gives()}, gets = {self.gets()}'
 
-    def __eq__(self, other):
-        return isinstance(other, TradeMove) and self.gives() == other.gives() and self.gets() == other.gets()
-
 
 class BuyDevMove(Move):
     """A Move that buys a development card"""
+    __slots__ = ()
+
     def __init__(self, player: Player):
         super().__init__(player, MoveType.BUY_DEV)
 
 
 class UseDevMove(Move):
     """A Move that uses a development card"""
-    def __init__(self, player: Player, dtype: Consts.DevType):
-        super().__init__(player, MoveType.USE_DEV)
+    __slots__ = ('__dev_to_use',)
+
+    def __init__(self, player: Player, dtype: Consts.DevType, *params):
+        super().__init__(player, MoveType.USE_DEV, dtype, *params)
         self.__dev_to_use = dtype
 
     def uses(self) -> Consts.DevType:
@@ -92,50 +106,49 @@ class UseDevMove(Move):
         """:returns an informative string about this Use Dev card move"""
         return f'[MOVE] player = {self.player()}, type = {self.get_type().name}, uses = {self.uses().name}'
 
-    def __eq__(self, other):
-        return isinstance(other, UseDevMove) and self.player() == other.player() and self.uses() == other.uses()
-
 
 class UseRoadBuildingDevMove(UseDevMove):
     """A Move that uses a Road Building Development Card"""
+    __slots__ = ()
+
     def __init__(self, player: Player):
         super().__init__(player, Consts.DevType.ROAD_BUILDING)
 
 
 class UseYopDevMove(UseDevMove):
     """A Move that uses a Year of Plenty Development Card"""
+    __slots__ = ('__resources',)
+
     def __init__(self, player: Player, *resources: Consts.ResourceType):
-        super().__init__(player, Consts.DevType.YEAR_OF_PLENTY)
-        self.__resources = Hand.Hand(*resources)
         assert len(resources) == Consts.YOP_NUM_RESOURCES
+        hand = Hand.Hand.frozen(*resources)
+        super().__init__(player, Consts.DevType.YEAR_OF_PLENTY, hand.key())
+        self.__resources = hand
 
     def resources(self) -> Hand:
         return self.__resources
 
-    def __eq__(self, other):
-        return isinstance(other, UseYopDevMove) and self.player() == other.player() and \
-               self.resources() == other.resources()
-
 
 class UseMonopolyDevMove(UseDevMove):
     """A Move that uses a Monopoly Development Card"""
+    __slots__ = ('__resource',)
+
     def __init__(self, player: Player, resource: Consts.ResourceType):
-        super().__init__(player, Consts.DevType.MONOPOLY)
+        super().__init__(player, Consts.DevType.MONOPOLY, resource)
         self.__resource = resource
 
     def resource(self) -> Consts.ResourceType:
         return self.__resource
 
-    def __eq__(self, other):
-        return isinstance(other, UseDevMove) and self.player() == other.player() and \
-               self.resource() == other.resource()
-
 
 class UseKnightDevMove(UseDevMove):
     """A Move that uses a Knight Development Card / displaces the Robber when activated"""
+    __slots__ = ('__hex_id', '__opp', '__robber')
+
     def __init__(self, player: Player, hex_id: int, opp: Union[Player, None],
                  robber_activated: bool = False):
-        super().__init__(player, Consts.DevType.KNIGHT)
+        super().__init__(player, Consts.DevType.KNIGHT, hex_id, None if opp is None else opp.get_id(),
+                         robber_activated)
         self.__hex_id = hex_id
         self.__opp = opp
         self.__robber = robber_activated
@@ -158,16 +171,13 @@ class UseKnightDevMove(UseDevMove):
                f'type = {self.get_type().name}, ' \
                f'places robber at hex = {self.hex_id()}, takes card from = {self.take_from()}'
 
-    def __eq__(self, other):
-        return isinstance(other, UseKnightDevMove) and self.player() == other.player() and \
-               self.hex_id() == other.hex_id() and self.take_from() == other.take_from() and \
-               self.robber_activated() == other.robber_activated()
-
 
 class ThrowMove(Move):
     """A Move that throws a card from the player's hand"""
+    __slots__ = ('__hand',)
+
     def __init__(self, player: Player, hand: Hand):
-        super().__init__(player, MoveType.THROW)
+        super().__init__(player, MoveType.THROW, hand.key())
         self.__hand = hand
 
     def throws(self) -> Hand:
@@ -178,15 +188,13 @@ class ThrowMove(Move):
         """:returns an informative string about this throw move"""
         return f'[MOVE] player = {self.player()}, type = {self.get_type()}, throws = {self.throws()}'
 
-    def __eq__(self, other):
-        return isinstance(other, ThrowMove) and self.player() == other.player() and \
-               self.throws() == other.throws()
-
 
 class BuildMove(Move):
     """A Move that builds a Buildable on the board"""
+    __slots__ = ('__to_build', '__loc', '__is_free')
+
     def __init__(self, player: Player, btype: Consts.PurchasableType, location: int, free: bool = False):
-        super().__init__(player, MoveType.BUILD)
+        super().__init__(player, MoveType.BUILD, btype, location, free)
         self.__to_build = btype
         self.__loc = location
         self.__is_free = free
@@ -207,7 +215,3 @@ class BuildMove(Move):
         """:returns an informative string about this build move"""
         return f'[MOVE] player = {self.player()}, ' \
                f'type = {self.get_type().name}, builds = {self.builds().name}, at = {hex(self.at())}'
-
-    def __eq__(self, other):
-        return isinstance(other, BuildMove) and self.player() == other.player() and \
-               self.builds() == other.builds() and self.at() == other.at() and self.is_free() == other.is_free()
@@ -0,0 +1,83 @@
+from __future__ import annotations
+from typing import List, Any
+from multiprocessing import Pool, current_process
+import pickle
+import os
+
+"""A Module spreading the evaluation work of a search agent's decision over a pool of worker processes"""
+
+DEFAULT_NUM_WORKERS = os.cpu_count() or 1
+DEFAULT_MIN_TASKS = 16  # fewer tasks are evaluated in process, shipping the state would cost more than it saves
+
+
+def _evaluate_chunk(chunk) -> List[Any]:
+    """runs in a worker, evaluates a chunk of the tasks of a decision on the worker's copy of the state"""
+    payload, tasks, seed = chunk
+    agent, state, player, moves = pickle.loads(payload)
+    # every chunk draws from streams of its own, so that chunks do not repeat each other's playouts #
+    agent.seed(seed)
+    state.reseed(seed)
+    return agent.evaluate_tasks(state, player, moves, tasks)
+
+
+class ParallelEvaluator:
+    """
+    Class evaluating the tasks of an agent's decision (e.g. the indices of the moves to rate, or one per playout)
+    with the agent's evaluate_tasks(), spread over a persistent pool of worker processes.
+    the agent, state, player and moves are serialized once per decision, and every worker gets a single chunk of
+    the tasks. decisions with less than min_tasks tasks are evaluated in process.
+    the pool is started on first use, and is not copied with the agents holding the evaluator - copies (e.g. the
+    ones the workers get) evaluate in process
+    """
+
+    def __init__(self, workers: int = DEFAULT_NUM_WORKERS, min_tasks: int = DEFAULT_MIN_TASKS):
+        self.__workers = workers
+        self.__min_tasks = min_tasks
+        self.__pool = None
+
+    def workers(self) -> int:
+        return self.__workers
+
+    def map(self, agent, state, player, moves: list, tasks: list) -> List[Any]:
+        """:returns agent.evaluate_tasks(state, player, moves, tasks), evaluated in parallel if worthwhile"""
+        if self.__workers <= 1 or len(tasks) < self.__min_tasks or current_process().daemon:
+            return agent.evaluate_tasks(state, player, moves, tasks)
+
+        payload = pickle.dumps((agent, state, player, moves), pickle.HIGHEST_PROTOCOL)
+        # tasks are dealt round robin, so that runs of similar tasks (e.g. trade moves) are spread over the workers #
+        num_chunks = min(self.__workers, len(tasks))
+        positions = [range(c_idx, len(tasks), num_chunks) for c_idx in range(num_chunks)]
+        chunks = [(payload, [tasks[t_idx] for t_idx in chunk_positions], agent.rng().getrandbits(64))
+                  for chunk_positions in positions]
+
+        results = [None] * len(tasks)
+        for chunk_positions, chunk_results in zip(positions, self.__get_pool().map(_evaluate_chunk, chunks, 1)):
+            for t_idx, result in zip(chunk_positions, chunk_results):
+                results[t_idx] = result
+        return results
+
+    def close(self) -> None:
+        """stops the worker processes, a later parallel evaluation starts new ones"""
+        if self.__pool is not None:
+            self.__pool.terminate()
+            self.__pool = None
+
+    def __get_pool(self) -> Pool:
+        if self.__pool is None:
+            self.__pool = Pool(self.__workers)
+        return self.__pool
+
+    def __enter__(self) -> ParallelEvaluator:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict:
+        return {'min_tasks': self.__min_tasks}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(1, state['min_tasks'])
+
+
+SERIAL = ParallelEvaluator(workers=1)  # the evaluator of agents not given one, evaluates every decision in process
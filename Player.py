@@ -4,6 +4,7 @@ import Buildable
 import Hand
 import Moves
 import GameConstants as Consts
+import GameState
 import GameSession
 import Agent
 
@@ -11,7 +12,8 @@ import Agent
 class Player:
     """
     Class represents a player in the game,
-    and holds the info of the current player
+    and holds the info of the current player.
+    the player's data is a view over its row in a GameState, until a game binds it the player gets a state of its own
     """
     ID_GEN = 0
 
@@ -19,16 +21,37 @@ class Player:
         self.__agent = agent
         self.__id = self.__gen_id()
         self.__name = self.__gen_name(name)
-        self.__resources_hand = Hand.Hand()
-        self.__devs_hand = Hand.Hand()
-        self.__used_devs = Hand.Hand()
-        self.__settlement_nodes = []
-        self.__city_nodes = []
-        self.__road_edges = []
-        self.__has_longest_road = False
-        self.__has_largest_army = False
-        self.__longest_road_len = 0
-        self.__harbors = set()
+        self.bind(GameState.GameState(1), 0)
+
+    def bind(self, state: GameState.GameState, idx: int) -> None:
+        """
+        makes this player a view over the given state
+        :param state: the game state holding the player's data
+        :param idx: the player's index in the game's turn order
+        :return: None
+        """
+        self.__state = state
+        self.__idx = idx
+        self.__resources_hand = Hand.Hand.wrap(state.res_hands[idx], state, GameState.RES_HAND_KEYS[idx])
+        self.__devs_hand = Hand.Hand.wrap(state.dev_hands[idx], state, GameState.DEV_HAND_KEYS[idx])
+        self.__used_devs = Hand.Hand.wrap(state.used_devs[idx], state, GameState.USED_DEVS_KEYS[idx])
+
+    def bound_to(self, state: GameState.GameState) -> Player:
+        """
+        :return: the same player (id, name and agent) viewed over another state, e.g. a clone of its game's state
+        """
+        player = Player.__new__(Player)
+        player.__agent = self.__agent
+        player.__id = self.__id
+        player.__name = self.__name
+        player.bind(state, self.__idx)
+        return player
+
+    def turn_idx(self) -> int:
+        """
+        :return: this player's index in the game's turn order (and in the state buffers)
+        """
+        return self.__idx
 
     def vp(self) -> int:
         """
@@ -42,8 +65,7 @@ class Player:
         vp += self.num_settlements() * Consts.VP_SETTLEMENT
         vp += self.num_cities() * Consts.VP_CITY
         vp += self.num_roads() * Consts.VP_ROAD  # just in case
-        vp += len([dev_card for dev_card in self.__devs_hand if
-                   dev_card == Consts.DevType.VP]) * Consts.VP_DEV_CARD
+        vp += self.__devs_hand.count(Consts.DevType.VP) * Consts.VP_DEV_CARD
         return vp
 
     def used_dev_hand(self) -> Hand:
@@ -66,7 +88,9 @@ class Player:
          the node of the settlements to be removed
         :return: None
         """
-        self.settlement_nodes().remove(node)
+        settlements = self.settlement_nodes()
+        self.__state.record(settlements)
+        settlements.remove(node)
 
     def harbor_resources(self) -> List[Consts.ResourceType]:
         """
@@ -84,20 +108,20 @@ class Player:
         """
         :return: the nodes in which the player has settlements
         """
-        return self.__settlement_nodes
+        return self.__state.settlements[self.__idx]
 
     def city_nodes(self) -> List[int]:
         """
         :return: the nodes in which the player has cities
 
         """
-        return self.__city_nodes
+        return self.__state.cities[self.__idx]
 
     def road_edges(self) -> List[int]:
         """
         :return: the edges in which the player has road
         """
-        return self.__road_edges
+        return self.__state.roads[self.__idx]
 
     def get_id(self) -> int:
         """
@@ -109,13 +133,13 @@ class Player:
         """
         :return: True iff player currently has the longest road
         """
-        return self.__has_longest_road
+        return self.__state.longest_road_owner == self.__idx
 
     def has_largest_army(self) -> bool:
         """
         :return: True iff player currently has the largest army
         """
-        return self.__has_largest_army
+        return self.__state.largest_army_owner == self.__idx
 
     def resource_hand(self) -> Hand.Hand:
         """
@@ -133,7 +157,7 @@ class Player:
         """
         :return: current number of settlements player has on the board (0-5)
         """
-        num_settles = len(self.__settlement_nodes)
+        num_settles = len(self.settlement_nodes())
         assert 0 <= num_settles <= Consts.MAX_SETTLEMENTS_PER_PLAYER
         return num_settles
 
@@ -141,7 +165,7 @@ class Player:
         """
         :return: current number of cities player has on the board (0-4)
         """
-        num_cities = len(self.__city_nodes)
+        num_cities = len(self.city_nodes())
         assert 0 <= num_cities <= Consts.MAX_CITIES_PER_PLAYER
         return num_cities
 
@@ -162,7 +186,7 @@ class Player:
         """
         :return: current number of roads player has on the board (0-15)
         """
-        num_roads = len(self.__road_edges)
+        num_roads = len(self.road_edges())
         assert 0 <= num_roads <= Consts.MAX_ROADS_PER_PLAYER
         return num_roads
 
@@ -170,20 +194,19 @@ class Player:
         """
         :return: number of knights played by player
         """
-        return sum(1 for dev_card in self.__used_devs if
-                   dev_card == Consts.DevType.KNIGHT)
+        return self.__used_devs.count(Consts.DevType.KNIGHT)
 
     def resource_hand_size(self) -> int:
         """
         :return: number of resource cards player is holding
         """
-        return len(self.__resources_hand)
+        return self.__resources_hand.size()
 
     def dev_hand_size(self) -> int:
         """
         :return: number of development cards player is holding
         """
-        return len(self.__devs_hand)
+        return self.__devs_hand.size()
 
     def __gen_name(self, name: str) -> str:
         if name is None:
@@ -204,23 +227,29 @@ class Player:
                f'[PLAYER {self}] vp = {self.vp()}\n' \
                f'[PLAYER {self}] agent = {type(self.agent())}\n' \
                f'[PLAYER {self}] settlements = ' \
-               f'{[hex(s) for s in self.__settlement_nodes]}\n' \
+               f'{[hex(s) for s in self.settlement_nodes()]}\n' \
                f'[PLAYER {self}] cities = ' \
-               f'{[hex(c) for c in self.__city_nodes]}\n' \
+               f'{[hex(c) for c in self.city_nodes()]}\n' \
                f'[PLAYER {self}] roads = ' \
-               f'{[hex(r) for r in self.__road_edges]}\n' \
-               f'[PLAYER {self}] longest road = {self.__has_longest_road}\n' \
-               f'[PLAYER {self}] largest army = {self.__has_largest_army}\n' \
+               f'{[hex(r) for r in self.road_edges()]}\n' \
+               f'[PLAYER {self}] longest road = {self.has_longest_road()}\n' \
+               f'[PLAYER {self}] largest army = {self.has_largest_army()}\n' \
                f'[PLAYER {self}] resources = {self.resource_hand()}\n' \
                f'[PLAYER {self}] devs = {self.__devs_hand}\n' \
                f'[PLAYER {self}] devs_used = {self.__used_devs}\n'
 
     # modifiers #
     def set_longest_road(self, val: bool) -> None:
-        self.__has_longest_road = val
+        if val:
+            self.__state.longest_road_owner = self.__idx
+        elif self.has_longest_road():
+            self.__state.longest_road_owner = GameState.NO_PLAYER
 
     def set_largest_army(self, val: bool) -> None:
-        self.__has_largest_army = val
+        if val:
+            self.__state.largest_army_owner = self.__idx
+        elif self.has_largest_army():
+            self.__state.largest_army_owner = GameState.NO_PLAYER
 
     def use_dev(self, dtype: Consts.DevType) -> None:
         """
@@ -264,13 +293,14 @@ class Player:
         """
         btype = buildable.type()
         if btype == Consts.PurchasableType.SETTLEMENT:
-            buildable_coords = self.__settlement_nodes
+            buildable_coords = self.settlement_nodes()
         elif btype == Consts.PurchasableType.CITY:
-            # self.__settlement_nodes.remove(buildable.coord())   # city
+            # self.settlement_nodes().remove(buildable.coord())   # city
             # replaces existing settlement
-            buildable_coords = self.__city_nodes
+            buildable_coords = self.city_nodes()
         else:
-            buildable_coords = self.__road_edges
+            buildable_coords = self.road_edges()
+        self.__state.record(buildable_coords)
         buildable_coords.append(buildable.coord())
 
     # agent interface #
@@ -0,0 +1,69 @@
+from __future__ import annotations
+from enum import Enum
+from typing import Dict
+import Player
+
+"""A Module containing the per phase timing statistics a profiled game collects"""
+
+
+class ProfiledPhase(Enum):
+    """Enum representing the parts of a game's flow that are timed when profiling"""
+    MOVE_GENERATION = 0
+    APPLY_MOVE = 1
+    DISTRIBUTION = 2
+    CLONE = 3  # the copy of the game given to an agent before every decision
+    DECISION = 4
+
+    def __str__(self):
+        return self.name
+
+
+class PhaseStats:
+    """Class holding the call counts and total wall time of every profiled phase, decisions are also kept per player"""
+
+    def __init__(self):
+        self.__calls = {phase: 0 for phase in ProfiledPhase}
+        self.__seconds = {phase: 0.0 for phase in ProfiledPhase}
+        self.__player_calls = {}
+        self.__player_seconds = {}
+
+    def add(self, phase: ProfiledPhase, seconds: float, player: Player.Player = None) -> None:
+        """adds a call of the given phase that took the given time, decisions are attributed to the deciding player"""
+        self.__calls[phase] += 1
+        self.__seconds[phase] += seconds
+        if player is not None:
+            name = str(player)
+            self.__player_calls[name] = self.__player_calls.get(name, 0) + 1
+            self.__player_seconds[name] = self.__player_seconds.get(name, 0.0) + seconds
+
+    def calls(self, phase: ProfiledPhase) -> int:
+        """:returns the number of times the phase ran"""
+        return self.__calls[phase]
+
+    def seconds(self, phase: ProfiledPhase) -> float:
+        """:returns the total wall time spent in the phase"""
+        return self.__seconds[phase]
+
+    def decision_calls(self) -> Dict[str, int]:
+        """:returns a {player name: number of decisions} dictionary"""
+        return dict(self.__player_calls)
+
+    def decision_seconds(self) -> Dict[str, float]:
+        """:returns a {player name: total decision time} dictionary"""
+        return dict(self.__player_seconds)
+
+    def as_dict(self) -> Dict:
+        """:returns the statistics as plain data, e.g. to be saved as JSON"""
+        return {'phases': {str(phase): {'calls': self.__calls[phase], 'seconds': self.__seconds[phase]}
+                           for phase in ProfiledPhase},
+                'decisions': {name: {'calls': self.__player_calls[name], 'seconds': self.__player_seconds[name]}
+                              for name in self.__player_calls}}
+
+    def __str__(self) -> str:
+        lines = ['{:<20} {:>8} {:>10} {:>12}'.format('phase', 'calls', 'seconds', 'ms / call')]
+        rows = [(str(phase), self.__calls[phase], self.__seconds[phase]) for phase in ProfiledPhase]
+        rows += [(f'  {name}', self.__player_calls[name], self.__player_seconds[name]) for name in self.__player_calls]
+        for name, calls, seconds in rows:
+            lines.append('{:<20} {:>8} {:>10.3f} {:>12.4f}'.format(name, calls, seconds,
+                                                                   1000 * seconds / calls if calls else 0))
+        return '\n'.join(lines)
@@ -0,0 +1,66 @@
+import hexgrid
+import GameConstants as Consts
+
+"""
+A Module holding the static topology of the board, computed once at import.
+Nodes and edges get compact indices (0..53 / 0..71) and tiles use their hex id (0..18),
+adjacency is kept as dense tables of those indices, with coordinate keyed views for code that works with coords
+"""
+
+NODE_COORDS = sorted(hexgrid.legal_node_coords())
+EDGE_COORDS = sorted(hexgrid.legal_edge_coords())
+NODE_IDX = {coord: idx for idx, coord in enumerate(NODE_COORDS)}
+EDGE_IDX = {coord: idx for idx, coord in enumerate(EDGE_COORDS)}
+NUM_NODES = len(NODE_COORDS)
+NUM_EDGES = len(EDGE_COORDS)
+NUM_TILES = Consts.NUM_HEXES
+
+
+def _build_tables():
+    edge_nodes = [tuple(sorted(NODE_IDX[node] for node in hexgrid.nodes_touching_edge(coord)))
+                  for coord in EDGE_COORDS]
+    tile_nodes = [tuple(NODE_IDX[node] for node in hexgrid.nodes_touching_tile(tile_id + 1))
+                  for tile_id in range(NUM_TILES)]  # hexgrid tile ids are 1-indexed
+    tile_edges = [tuple(EDGE_IDX[edge] for edge in hexgrid.edges_touching_tile(tile_id + 1))
+                  for tile_id in range(NUM_TILES)]
+
+    node_nodes = [[] for _ in range(NUM_NODES)]
+    node_edges = [[] for _ in range(NUM_NODES)]
+    for edge, (node1, node2) in enumerate(edge_nodes):
+        node_nodes[node1].append(node2)
+        node_nodes[node2].append(node1)
+        node_edges[node1].append(edge)
+        node_edges[node2].append(edge)
+    node_tiles = [[] for _ in range(NUM_NODES)]
+    for tile_id, nodes in enumerate(tile_nodes):
+        for node in nodes:
+            node_tiles[node].append(tile_id)
+
+    return (tuple(edge_nodes), tuple(tile_nodes), tuple(tile_edges),
+            tuple(tuple(nodes) for nodes in node_nodes), tuple(tuple(edges) for edges in node_edges),
+            tuple(tuple(tiles) for tiles in node_tiles))
+
+
+# index tables #
+EDGE_NODES, TILE_NODES, TILE_EDGES, NODE_NODES, NODE_EDGES, NODE_TILES = _build_tables()
+
+# coordinate views of the same tables #
+NODE_NODES_BY_COORD = {NODE_COORDS[node]: [NODE_COORDS[adj] for adj in NODE_NODES[node]] for node in range(NUM_NODES)}
+NODE_EDGES_BY_COORD = {NODE_COORDS[node]: [EDGE_COORDS[adj] for adj in NODE_EDGES[node]] for node in range(NUM_NODES)}
+NODE_TILES_BY_COORD = {NODE_COORDS[node]: list(NODE_TILES[node]) for node in range(NUM_NODES)}
+EDGE_NODES_BY_COORD = {EDGE_COORDS[edge]: [NODE_COORDS[node] for node in EDGE_NODES[edge]] for edge in range(NUM_EDGES)}
+TILE_NODES_BY_ID = [[NODE_COORDS[node] for node in TILE_NODES[tile_id]] for tile_id in range(NUM_TILES)]
+TILE_EDGES_BY_ID = [[EDGE_COORDS[edge] for edge in TILE_EDGES[tile_id]] for tile_id in range(NUM_TILES)]
+
+# bit masks over the same indices, for sets of nodes / edges kept as ints #
+ALL_NODES_MASK = (1 << NUM_NODES) - 1
+NODE_BLOCK_MASK = tuple((1 << node) | sum(1 << adj for adj in NODE_NODES[node])
+                        for node in range(NUM_NODES))  # a node and its neighbours, the distance rule
+
+
+def bits(mask: int):
+    """iterates over the indices set in the given bit mask, in ascending order"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from typing import Hashable, Union
+
+"""A Module containing a bounded cache of values computed for game states, keyed by state hash"""
+
+DEFAULT_CAPACITY = 100000
+
+
+class TranspositionTable:
+    """
+    Class representing an LRU bounded cache of values keyed by state (e.g. a state hash and the evaluated player),
+    counting its hits and misses. once full, the least recently used entry is dropped for every new one
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        assert capacity > 0
+        self.__capacity = capacity
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, key: Hashable) -> Union[float, None]:
+        """:returns the value stored for the key, None if there is none"""
+        value = self.__entries.get(key)
+        if value is None:
+            self.__misses += 1
+        else:
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: float) -> None:
+        """stores a value for the key, dropping the least recently used entry if the table is full"""
+        entries = self.__entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.__capacity:
+            entries.popitem(last=False)
+
+    def capacity(self) -> int:
+        return self.__capacity
+
+    def hits(self) -> int:
+        return self.__hits
+
+    def misses(self) -> int:
+        return self.__misses
+
+    def hit_rate(self) -> float:
+        """:returns the fraction of lookups that found a value"""
+        lookups = self.__hits + self.__misses
+        return self.__hits / lookups if lookups else 0
+
+    def clear(self) -> None:
+        """drops all entries and resets the counters"""
+        self.__entries.clear()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __str__(self) -> str:
+        return f'[TRANSPOSITION TABLE] {len(self)} / {self.__capacity} entries, {self.__hits} hits, ' \
+               f'{self.__misses} misses ({self.hit_rate():.1%} hit rate)'
@@ -1,10 +1,16 @@
 import GameSession
-from typing import List
+from typing import List, Dict, Tuple
 from random import sample
+from multiprocessing import Pool
 import Player
 import Agent
 import Heuristics
 import argparse
+import random
+import json
+import csv
+import os
+import time
 
 DEFAULT_NUM_PLAYERS = 4
 RANDOM_AGENT = 'random'
@@ -13,6 +19,7 @@ HUMAN_AGENT = 'human'
 PROBABILITY_AGENT = 'prob'
 MONTECARLO_AGENT = 'monte'
 GENETIC_AGENT = 'genetic'
+UCT_AGENT = 'uct'
 # gen 19 #
 GENETIC2_WEIGHTS = (0.77197979,  # probability      19.8%
                     0.8782323,   # VP               22.5%
@@ -41,10 +48,14 @@ AGENTS = {
     HUMAN_AGENT: Agent.HumanAgent(),
     PROBABILITY_AGENT: Agent.ProbabilityAgent(),
     MONTECARLO_AGENT: Agent.MonteCarloAgent(Heuristics.Everything()),
-    GENETIC_AGENT: Agent.MonteCarloAgent(Heuristics.Everything(weights=GENETIC2_WEIGHTS))
+    GENETIC_AGENT: Agent.MonteCarloAgent(Heuristics.Everything(weights=GENETIC2_WEIGHTS)),
+    UCT_AGENT: Agent.UCTAgent(Heuristics.Everything())
 }
 DEFAULT_AGENTS = [RANDOM_AGENT]
 PLAYER_NAMES = ['Roy', 'Boaz', 'Oriane', 'Amoss']
+DEFAULT_NUM_WORKERS = os.cpu_count() or 1
+DEFAULT_SEED = 0
+REPORT_FIELDS = ['agent', 'seats', 'wins', 'win_rate', 'avg_vp', 'avg_game_length']
 
 
 def get_args() -> argparse.Namespace:
@@ -68,6 +79,40 @@ def get_args() -> argparse.Namespace:
         default=DEFAULT_NUM_PLAYERS,
         help='Number of players to play this round of Catan'
     )
+    parser.add_argument(
+        '-games',
+        type=int,
+        default=0,
+        help='Number of games to play as a tournament - if not specified, a single game is played on the console'
+    )
+    parser.add_argument(
+        '-workers',
+        type=int,
+        default=DEFAULT_NUM_WORKERS,
+        help='Number of processes the tournament games are spread over'
+    )
+    parser.add_argument(
+        '-seed',
+        type=int,
+        default=DEFAULT_SEED,
+        help='Base seed of the tournament, game i is played with seed + i (so line-ups compared with the same seed '
+             'play on the same boards with the same dice)'
+    )
+    parser.add_argument(
+        '-rotate',
+        action='store_true',
+        help='Rotate the agents line-up by one seat every tournament game'
+    )
+    parser.add_argument(
+        '-report',
+        metavar="REPORT_PATH",
+        help='Path of the tournament report, written as CSV if it ends with .csv and as JSON otherwise'
+    )
+    parser.add_argument(
+        '-prune',
+        action='store_true',
+        help='Remove equivalent and dominated moves (e.g. dominated trades) before the agents choose'
+    )
     return parser.parse_args()
 
 
@@ -75,19 +120,122 @@ def init_players(num_players: int, *agent_types: str) -> List[Player.Player]:
     players = []
     p_names = sample(PLAYER_NAMES, num_players)
 
-    for p_idx in range(num_players):
-        agent_type = agent_types[p_idx] if p_idx < len(agent_types) else agent_types[-1]
+    for p_idx, agent_type in enumerate(line_up(num_players, agent_types)):
         agent = AGENTS[agent_type]
         players.append(Player.Player(agent, name=p_names[p_idx]))
 
     return players
 
 
+def line_up(num_players: int, agent_types: List[str], game_idx: int = 0, rotate: bool = False) -> List[str]:
+    """:returns the agent type of every seat in a game, optionally rotated by one seat per game"""
+    seats = [agent_types[p_idx] if p_idx < len(agent_types) else agent_types[-1] for p_idx in range(num_players)]
+    if rotate:
+        shift = game_idx % num_players
+        seats = seats[shift:] + seats[:shift]
+    return seats
+
+
+def play_game(game: Tuple[int, int, List[str], bool]) -> Dict:
+    """plays a single headless tournament game, :returns its result as a dict"""
+    game_idx, game_seed, seats, prune = game
+    random.seed(game_seed)
+    players = init_players(len(seats), *seats)
+    for agent_type in set(seats):
+        AGENTS[agent_type].seed(f'{game_seed}/{agent_type}')
+    catan_session = GameSession.GameSession(*players, sinks=[], seed=game_seed, prune=prune)
+    start = time.perf_counter()
+    catan_session.run_game()
+    result = {'game': game_idx,
+              'seed': game_seed,
+              'seats': seats,
+              'vps': [player.vp() for player in players],
+              'winner': players.index(catan_session.winner()),
+              'turns': catan_session.num_turns_played(),
+              'seconds': time.perf_counter() - start}
+    if prune:
+        result['pruning'] = catan_session.pruner().as_dict()
+    return result
+
+
+def aggregate(results: List[Dict]) -> List[Dict]:
+    """:returns the per agent summary of the given game results"""
+    stats = {}
+    for result in results:
+        for seat, agent_type in enumerate(result['seats']):
+            agent_stats = stats.setdefault(agent_type, {'agent': agent_type, 'seats': 0, 'wins': 0,
+                                                        'vp': 0, 'turns': 0})
+            agent_stats['seats'] += 1
+            agent_stats['wins'] += seat == result['winner']
+            agent_stats['vp'] += result['vps'][seat]
+            agent_stats['turns'] += result['turns']
+
+    summary = []
+    for agent_stats in stats.values():
+        seats = agent_stats['seats']
+        summary.append({'agent': agent_stats['agent'],
+                        'seats': seats,
+                        'wins': agent_stats['wins'],
+                        'win_rate': agent_stats['wins'] / seats,
+                        'avg_vp': agent_stats['vp'] / seats,
+                        'avg_game_length': agent_stats['turns'] / seats})
+    return sorted(summary, key=lambda row: row['win_rate'], reverse=True)
+
+
+def write_report(path: str, summary: List[Dict], results: List[Dict]) -> None:
+    """writes the tournament report, the per agent summary as CSV, or the summary and every game as JSON"""
+    with open(path, 'w', newline='') as report:
+        if path.endswith('.csv'):
+            writer = csv.DictWriter(report, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(summary)
+        else:
+            json.dump({'agents': summary, 'games': results}, report, indent=2)
+
+
+def tournament(num_games: int, num_players: int = DEFAULT_NUM_PLAYERS, agents: List[str] = DEFAULT_AGENTS,
+               workers: int = DEFAULT_NUM_WORKERS, base_seed: int = DEFAULT_SEED, rotate: bool = False,
+               report: str = None, prune: bool = False) -> List[Dict]:
+    """
+    plays num_games headless games spread over a pool of worker processes.
+    game i is played with seed base_seed + i, so a tournament is reproducible regardless of the number of workers
+    :returns the per agent summary (win rate, average VP and average game length)
+    """
+    assert HUMAN_AGENT not in agents, 'tournament games are played headless'
+    games = [(game_idx, base_seed + game_idx, line_up(num_players, agents, game_idx, rotate), prune)
+             for game_idx in range(num_games)]
+    if workers > 1:
+        with Pool(min(workers, num_games)) as pool:
+            results = list(pool.imap_unordered(play_game, games))
+    else:
+        results = [play_game(game) for game in games]
+    results.sort(key=lambda result: result['game'])
+
+    summary = aggregate(results)
+    print('[TOURNAMENT] {} games, {} players'.format(num_games, num_players))
+    for row in summary:
+        print('{agent:>10}: win rate {win_rate:6.1%}  avg VP {avg_vp:5.2f}  '
+              'avg game length {avg_game_length:6.1f}  ({seats} seats)'.format(**row))
+    if prune:
+        generated = sum(result['pruning']['generated'] for result in results)
+        removed = sum(sum(result['pruning']['removed'].values()) for result in results)
+        print(f'[TOURNAMENT] pruning removed {removed} of {generated} generated moves')
+    if report:
+        write_report(report, summary, results)
+    return summary
+
+
 def main(log: str = None, num_players: int = DEFAULT_NUM_PLAYERS, agents: List[str] = DEFAULT_AGENTS,
-         **kwargs) -> None:
+         games: int = 0, workers: int = DEFAULT_NUM_WORKERS, seed: int = DEFAULT_SEED, rotate: bool = False,
+         report: str = None, prune: bool = False, **kwargs) -> None:
+    if games:
+        tournament(games, num_players, agents, workers, seed, rotate, report, prune)
+        return
     players = init_players(num_players, *agents)
-    catan_session = GameSession.GameSession(log, *players)
+    catan_session = GameSession.GameSession(*players, prune=prune)
     catan_session.run_game()
+    if prune:
+        print(catan_session.pruner())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,97 @@
+import GameSession
+import unittest
+from random import Random
+import GameConstants as Consts
+import Player
+import Moves
+import Agent
+import Hand
+import ActionSpace
+
+SEED = 0
+NUM_DECISIONS = 300  # decisions played through by the action tests
+
+
+def first_main_phase_position() -> GameSession.GameSession:
+    """:returns a seeded game advanced by random moves to its first main phase decision"""
+    rng = Random(SEED)
+    agent = Agent.RandomAgent(rng)
+    players = [Player.Player(agent, name=f'P{p_idx}') for p_idx in range(3)]
+    session = GameSession.GameSession(*players, sinks=[], seed=SEED)
+    moves = session.simulate_game()
+    while not any(move.get_type() == Moves.MoveType.PASS for move in moves):  # only the main phase can pass
+        moves = session.simulate_game(rng.choice(moves))
+    return session
+
+
+class TestYearOfPlenty(unittest.TestCase):
+
+    def test_picks_are_paid_by_the_bank(self):
+        session = first_main_phase_position()
+        session.current_player().dev_hand().insert(Hand.Hand(Consts.DevType.YEAR_OF_PLENTY))
+        session._GameSession__res_deck.remove_by_type(Consts.ResourceType.ORE)  # the bank runs out of ore
+
+        picks = [move.resources() for move in session.generate_moves() if isinstance(move, Moves.UseYopDevMove)]
+        self.assertTrue(picks)
+        for pick in picks:
+            self.assertEqual(pick.count(Consts.ResourceType.ORE), 0)
+
+
+class TestActions(unittest.TestCase):
+    """the legal action mask is made from the state, and step applies actions without moves, so both must agree with
+    the moves the game generates and plays"""
+
+    def play(self, check) -> None:
+        """plays NUM_DECISIONS random decisions of seeded games by action, calling check(session, mask) before each"""
+        for seed in range(3):
+            agent = Agent.RandomAgent(Random(seed))
+            players = [Player.Player(agent, name=f'P{p_idx}') for p_idx in range(3)]
+            session = GameSession.GameSession(*players, sinks=[], seed=seed)
+            session.simulate_game()
+            mask = session.legal_action_mask()
+            for _ in range(NUM_DECISIONS):
+                if not mask.any():  # the game is over
+                    break
+                check(session, mask)
+                mask = session.step(agent.choose_action(mask, session.current_player(), session))
+
+    def test_mask_matches_moves(self):
+        def check(session, mask):
+            action_ids = [ActionSpace.action_id(move) for move in session.possible_moves()]
+            self.assertEqual(mask.nonzero()[0].tolist(), sorted(action_ids))
+        self.play(check)
+
+    def test_step_plays_like_simulate_game(self):
+        def check(session, mask):
+            agents = [player.agent() for player in session.players()]
+            for action_id in mask.nonzero()[0].tolist():
+                by_step, by_move = session.clone(), session.clone()
+                # the agents choose the roads of a road building card, so both copies choose from the same stream #
+                rng_states = [agent.rng().getstate() for agent in agents]
+                by_step.reseed(1)
+                by_step.step(action_id)
+                for agent, rng_state in zip(agents, rng_states):
+                    agent.rng().setstate(rng_state)
+                by_move.reseed(1)
+                by_move.simulate_game(by_move.action_move(action_id))
+                self.assertEqual(by_step.state_hash(), by_move.state_hash())
+                self.assertEqual([str(move) for move in by_step.possible_moves()],
+                                 [str(move) for move in by_move.possible_moves()])
+        self.play(check)
+
+    def test_free_roads_are_not_paid(self):
+        session = first_main_phase_position()
+        player = session.current_player()
+        road = session._GameSession__get_possible_build_road_moves(player, free=True)[0]
+        num_cards = player.resource_hand().size()
+        session.simulate_game(road)  # as searches simulate the roads of a road building card
+        self.assertEqual(player.resource_hand().size(), num_cards)
+
+    def test_illegal_action(self):
+        session = first_main_phase_position()
+        illegal = int((~session.legal_action_mask()).nonzero()[0][0])
+        self.assertRaises(ValueError, session.step, illegal)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import GameSession
+import pickle
+import unittest
+from random import Random
+import Player
+import Moves
+import Agent
+import Heuristics
+import ParallelEvaluator
+
+SEED = 0
+NUM_OPENING_MOVES = 60  # random moves played before the evaluated decision
+MIN_MOVES = 8  # moves of the evaluated decision, so that its playouts break ties
+
+
+def main_phase_position() -> GameSession.GameSession:
+    """:returns a seeded game advanced by random moves to a main phase decision of at least MIN_MOVES moves"""
+    rng = Random(SEED)
+    agent = Agent.RandomAgent(rng)  # the players choose too, e.g. the roads of a road building card
+    players = [Player.Player(agent, name=f'P{p_idx}') for p_idx in range(3)]
+    session = GameSession.GameSession(*players, sinks=[], seed=SEED)
+    moves = session.simulate_game()
+    for _ in range(NUM_OPENING_MOVES):
+        moves = session.simulate_game(rng.choice(moves))
+    # only the main phase can pass #
+    while len(moves) < MIN_MOVES or not any(move.get_type() == Moves.MoveType.PASS for move in moves):
+        moves = session.simulate_game(rng.choice(moves))
+    return session
+
+
+class TestWorkerSeeding(unittest.TestCase):
+    """a worker evaluates its chunk of a decision after seeding the agent, so the chunk's results must only depend
+    on the seed it was given"""
+
+    def evaluate_chunk(self, agent: Agent.Agent, seed: int) -> list:
+        session = main_phase_position()
+        moves = session.possible_moves()
+        payload = pickle.dumps((agent, session, session.current_player(), moves), pickle.HIGHEST_PROTOCOL)
+        return ParallelEvaluator._evaluate_chunk((payload, list(range(len(moves))), seed))
+
+    def test_same_seed_same_results(self):
+        # agents built apart start from different streams, their rollout policies included #
+        first = Agent.MonteCarloAgent(Heuristics.Everything(), rollout_policy=Agent.RolloutAgent())
+        second = Agent.MonteCarloAgent(Heuristics.Everything(), rollout_policy=Agent.RolloutAgent())
+        self.assertEqual(self.evaluate_chunk(first, 1), self.evaluate_chunk(second, 1))
+
+    def test_seed_reaches_rollout_policy(self):
+        for make_agent in (lambda policy: Agent.MonteCarloAgent(Heuristics.Everything(), rollout_policy=policy),
+                           lambda policy: Agent.UCTAgent(Heuristics.Everything(), rollout_policy=policy)):
+            policies = [Agent.RolloutAgent(), Agent.RolloutAgent()]
+            for policy in policies:
+                make_agent(policy).seed(1)
+            self.assertEqual(policies[0].rng().getstate(), policies[1].rng().getstate())
+
+
+if __name__ == '__main__':
+    unittest.main()